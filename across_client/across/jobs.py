@@ -0,0 +1,309 @@
+"""
+Server-side jobs for long running ACROSS API computations.
+
+Rather than holding an HTTP connection open while e.g. a long Ephem or
+Visibility is computed, the query can be submitted as a job. The API then
+replies immediately with a `JobSchema`, and the job is polled until its
+result is ready::
+
+    from across_client.swift.ephem import SwiftEphem
+
+    future = SwiftEphem(begin="2024-01-01", length=365, deferred=True).submit_job()
+    ephem = future.result()  # or `await future`
+
+Job handles are `concurrent.futures.Future`s, so also work with
+`concurrent.futures.wait` and `as_completed`. All outstanding jobs are polled
+by one background thread, with the interval for each job backing off while
+it runs, and jobs of the same type polled together with a single `Jobs`
+query.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, List, Optional
+
+from ..base import codec, hooks
+from ..base.common import ACROSSBase
+from .schema import ACROSSAPIJobsGetSchema, ACROSSAPIJobsSchema, JobGetSchema, JobSchema
+
+# Job statuses reported by the API once a job has finished
+DONE_STATUSES = ["complete", "completed", "done", "finished", "success"]
+FAILED_STATUSES = ["failed", "error", "expired"]
+
+# Polling interval bounds and backoff factor
+MIN_INTERVAL = 0.5
+MAX_INTERVAL = 30.0
+BACKOFF = 1.5
+
+
+class JobError(RuntimeError):
+    """Raised by a job handle when its job fails on the server."""
+
+
+class Job(ACROSSBase):
+    """
+    Status, and once finished result, of an ACROSS API job.
+
+    Parameters
+    ----------
+    jobnumber : Optional[int]
+        Number of the job.
+
+    Attributes
+    ----------
+    reqtype : str
+        API name of the job's request, e.g. "Ephem".
+    status : Optional[str]
+        Status of the job.
+    result : Optional[str]
+        JSON encoded result of the job, once complete.
+    expires : datetime
+        When the job and its result expire.
+    """
+
+    # Type hints
+    jobnumber: Optional[int]
+    status: Optional[str] = None
+    result: Optional[str] = None
+
+    _mission = "ACROSS"
+    _api_name = "Job"
+    _schema = JobSchema
+    _get_schema = JobGetSchema
+
+    def __init__(self, jobnumber: Optional[int] = None, **kwargs):
+        self.jobnumber = jobnumber
+        for k, a in kwargs.items():
+            setattr(self, k, a)
+
+
+class Jobs(ACROSSBase):
+    """
+    All the jobs of a given request type for a user, used to poll many jobs
+    with a single request.
+
+    Parameters
+    ----------
+    reqtype : str
+        API name of the jobs' requests, e.g. "Ephem".
+    username : str, optional
+        Username that submitted the jobs, by default "anonymous".
+    unexpired_only : bool, optional
+        Only return unexpired jobs, by default True.
+
+    Attributes
+    ----------
+    entries : list
+        The jobs, as `JobSchema`.
+    """
+
+    _mission = "ACROSS"
+    _api_name = "Jobs"
+    _schema = ACROSSAPIJobsSchema
+    _get_schema = ACROSSAPIJobsGetSchema
+
+    def __init__(self, reqtype: str, username: str = "anonymous", **kwargs):
+        self.reqtype = reqtype
+        self.username = username
+        self.begin = None
+        self.end = None
+        self.unexpired_only = True
+        self.entries = []
+        for k, a in kwargs.items():
+            setattr(self, k, a)
+
+
+class JobFuture(Future):
+    """
+    Handle for a submitted job, resolving to the API object its result is
+    loaded into.
+
+    Parameters
+    ----------
+    obj : ACROSSBase
+        API object the job was submitted for.
+    job : Optional[JobSchema]
+        Job as returned on submission, or None if the result was returned
+        straight away.
+    """
+
+    def __init__(self, obj: ACROSSBase, job: Optional[JobSchema] = None):
+        super().__init__()
+        self.obj = obj
+        self.job = job
+        self._interval = MIN_INTERVAL
+        self._due = time.monotonic() + MIN_INTERVAL
+
+    @property
+    def jobnumber(self) -> Optional[int]:
+        return self.job.jobnumber if self.job is not None else None
+
+    @property
+    def status(self) -> Optional[str]:
+        """Last status of the job reported by the API."""
+        return self.job.status if self.job is not None else None
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+    def _update(self, job: JobSchema) -> bool:
+        """Record a polled job status, finishing the future if the job has
+        finished. Returns True once the future is done."""
+        self.job = job
+        if self.done():
+            return True
+        status = (job.status or "").lower()
+        if status in FAILED_STATUSES:
+            self.set_exception(JobError(f"Job {job.jobnumber} {status}."))
+        elif status in DONE_STATUSES:
+            if job.result is None:
+                # Batch listings may leave out results, so fetch this job
+                full = Job(job.jobnumber)
+                if full.get():
+                    job = self.job = full.schema
+            if job.result is None:
+                self.set_exception(JobError(f"Job {job.jobnumber} has no result."))
+                return True
+            try:
+                self.obj._load(job.result)
+            except Exception as e:
+                self.set_exception(e)
+            else:
+                self.set_result(self.obj)
+        else:
+            # Still running, so back off
+            self._interval = min(self._interval * BACKOFF, MAX_INTERVAL)
+            self._due = time.monotonic() + self._interval
+            return False
+        return True
+
+
+class JobPoller:
+    """
+    Background thread polling all outstanding jobs.
+
+    Jobs due for polling are grouped by request type and user. Groups of one
+    job are polled with a `Job` query, and larger groups with a single `Jobs`
+    query.
+    """
+
+    def __init__(self):
+        self.futures: List[JobFuture] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, future: JobFuture):
+        """Start polling a job."""
+        with self._cond:
+            self.futures.append(future)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="across-job-poller", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self.futures = [f for f in self.futures if not f.done()]
+                if not self.futures:
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                wait = min(f._due for f in self.futures) - now
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                # Also poll jobs due within half their interval, so that more
+                # jobs are polled together
+                due = [f for f in self.futures if f._due - f._interval / 2 <= now]
+            self.poll(due)
+
+    def poll(self, futures: List[JobFuture]):
+        """Poll the status of some jobs, finishing any that are done."""
+        groups: dict = {}
+        for future in futures:
+            if future.job is None:
+                # Resolved on submission, so never polled
+                continue
+            key = (future.job.reqtype, getattr(future.obj, "username", "anonymous"))
+            groups.setdefault(key, []).append(future)
+
+        for (reqtype, username), group in groups.items():
+            try:
+                if len(group) == 1:
+                    job = Job(group[0].jobnumber)
+                    statuses = {job.jobnumber: job.schema} if job.get() else {}
+                else:
+                    jobs = Jobs(reqtype, username)
+                    jobs.get()
+                    statuses = {entry.jobnumber: entry for entry in jobs.entries}
+            except Exception as e:
+                for future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future in group:
+                try:
+                    if future.jobnumber in statuses:
+                        future._update(statuses[future.jobnumber])
+                    else:
+                        future.set_exception(
+                            JobError(f"Job {future.jobnumber} not found.")
+                        )
+                except InvalidStateError:
+                    # Cancelled while being polled
+                    pass
+
+
+# Poller shared by all jobs
+POLLER = JobPoller()
+
+
+def submit_job(obj: ACROSSBase) -> JobFuture:
+    """
+    Submit the GET of an API object as a server-side job.
+
+    Parameters
+    ----------
+    obj : ACROSSBase
+        API object, with its GET parameters set.
+
+    Returns
+    -------
+    JobFuture
+        Handle for the job, resolving to `obj` with the result loaded.
+
+    Raises
+    ------
+    ValueError
+        If the GET parameters of `obj` don't validate.
+    HTTPError
+        If the job submission fails.
+    """
+    if not obj.validate_get():
+        raise ValueError(f"Invalid parameters for {obj._api_name}.")
+    response = _submit(obj)
+    if "jobnumber" not in response:
+        # The API computed the result straight away
+        obj._load(response)
+        future = JobFuture(obj)
+        future.set_result(obj)
+        return future
+    job = JobSchema.model_validate(response)
+    future = JobFuture(obj, job)
+    if not future._update(job):
+        POLLER.add(future)
+    return future
+
+
+@hooks.traced("GET")
+def _submit(obj: ACROSSBase) -> Any:
+    """Send a job submission request, returning the decoded response."""
+    params = {key: value for key, value in obj._get_schema.model_validate(obj)}
+    req = obj._request("GET", obj.api_url(params), params={**params, "job": True})
+    req.raise_for_status()
+    return codec.CODEC.loads(req.content)
@@ -1,8 +1,28 @@
-from typing import Optional
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
 
+from ..base import resilience
+from ..base.cache import DiskCache, LRUCache
 from ..base.common import ACROSSBase
 from .schema import ResolveGetSchema, ResolveSchema
 
+# Process-wide cache of resolved names. Set the ACROSS_RESOLVE_CACHE
+# environment variable to the path of a database file to persist it.
+RESOLVE_CACHE = LRUCache(
+    maxsize=4096,
+    backing=(
+        DiskCache(os.environ["ACROSS_RESOLVE_CACHE"])
+        if os.environ.get("ACROSS_RESOLVE_CACHE")
+        else None
+    ),
+)
+
+# Lookups in progress, so concurrent requests for the same name share one
+_pending: dict = {}
+_pending_lock = threading.Lock()
+
 
 class Resolve(ACROSSBase):
     """
@@ -30,6 +50,7 @@ class Resolve(ACROSSBase):
     _api_name = "Resolve"
     _schema = ResolveSchema
     _get_schema = ResolveGetSchema
+    _cache_ttl = 86400.0
 
     def __init__(self, name: Optional[str] = None, **kwargs):
         self.name = name
@@ -64,11 +85,132 @@ class ACROSSResolveName:
             Target name that can be resolved by the Resolve class
         """
         self._name = targname
+        # Deferred queries resolve their target name when they are fetched
+        if getattr(self, "_deferred", False):
+            return
         if hasattr(self, "ra") is False or self.ra is None:
-            r = Resolve(name=targname)
-            r.get()
-            self.ra = r.ra
-            self.dec = r.dec
+            r = resolve_many([targname])[targname]
+            self.ra = r.ra if r is not None else None
+            self.dec = r.dec if r is not None else None
+
+
+def set_resolve_cache(
+    path: Optional[str] = None, maxsize: int = 4096, ttl: Optional[float] = None
+) -> LRUCache:
+    """Replace the process-wide cache of resolved names.
+
+    Parameters
+    ----------
+    path : Optional[str], optional
+        Path of a database file to persist resolved names in, by default None
+        (in-memory only).
+    maxsize : int, optional
+        Maximum number of names held in memory, by default 4096.
+    ttl : Optional[float], optional
+        Time in seconds after which names are resolved again, by default None
+        (never).
+
+    Returns
+    -------
+    LRUCache
+        The new cache.
+    """
+    global RESOLVE_CACHE
+    backing = DiskCache(path, ttl=ttl) if path is not None else None
+    RESOLVE_CACHE = LRUCache(maxsize=maxsize, ttl=ttl, backing=backing)
+    return RESOLVE_CACHE
+
+
+def _cache_key(name: str) -> str:
+    """Normalize a target name for caching."""
+    return " ".join(name.split()).lower()
+
+
+def _fetch(name: str) -> Optional[Resolve]:
+    """Resolve a name with the ACROSS API and cache the result. Concurrent
+    calls for the same name share a single API call.
+
+    Parameters
+    ----------
+    name : str
+        Target name.
+
+    Returns
+    -------
+    Optional[Resolve]
+        Resolve object with the coordinates of the target, or None if the
+        name could not be resolved.
+    """
+    key = _cache_key(name)
+    with _pending_lock:
+        leader = _pending.get(key)
+        if leader is None:
+            future: Future = Future()
+            _pending[key] = future
+    if leader is not None:
+        return leader.result()
+
+    try:
+        cached = RESOLVE_CACHE.get(key)
+        if cached is not None:
+            r: Optional[Resolve] = Resolve(name=name, **cached)
+        else:
+            r = Resolve(name=name)
+            if r.get():
+                RESOLVE_CACHE.set(
+                    key, {"ra": r.ra, "dec": r.dec, "resolver": r.resolver}
+                )
+            else:
+                r = None
+        future.set_result(r)
+        return r
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _pending_lock:
+            _pending.pop(key, None)
+
+
+def resolve_many(names: Iterable[str], max_workers: int = 8) -> dict:
+    """Resolve many target names to coordinates. Names that are not already
+    cached are resolved concurrently.
+
+    Parameters
+    ----------
+    names : Iterable[str]
+        Target names that can be resolved by the Resolve class
+    max_workers : int, optional
+        Maximum number of concurrent API calls, by default 8.
+
+    Returns
+    -------
+    dict
+        Resolve objects with the coordinates of each target, keyed by name.
+        Names that could not be resolved map to None.
+    """
+    results: dict = {}
+    uncached: dict = {}
+    for name in names:
+        cached = RESOLVE_CACHE.get(_cache_key(name))
+        if cached is not None:
+            results[name] = Resolve(name=name, **cached)
+        else:
+            uncached.setdefault(_cache_key(name), []).append(name)
+
+    if len(uncached) == 1:
+        fetched = [_fetch(*[same[0] for same in uncached.values()])]
+    elif len(uncached) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(uncached))) as e:
+            fetch = resilience.within_deadline(_fetch)
+            fetched = list(e.map(fetch, [same[0] for same in uncached.values()]))
+    else:
+        fetched = []
+
+    for same, r in zip(uncached.values(), fetched):
+        for name in same:
+            results[name] = r
+    return results
 
 
 def resolve(name: str) -> Resolve:
@@ -84,6 +226,5 @@ def resolve(name: str) -> Resolve:
     Resolve
         A Resolve object with the coordinates of the target
     """
-    r = Resolve(name=name)
-    r.get()
-    return r
+    r = resolve_many([name])[name]
+    return r if r is not None else Resolve(name=name)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import model_validator
 
@@ -52,6 +52,18 @@ class JobSchema(BaseSchema):
     status: Optional[str] = None
 
 
+class JobGetSchema(BaseSchema):
+    """Schema defines required parameters for getting a Job"""
+
+    jobnumber: int
+
+
+class ACROSSAPIJobsSchema(BaseSchema):
+    """Schema for a list of ACROSSAPIJobs"""
+
+    entries: List[JobSchema]
+
+
 class UserArgSchema(BaseSchema):
     username: Optional[str] = "anonymous"
     api_key: Optional[str] = None
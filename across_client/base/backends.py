@@ -0,0 +1,677 @@
+"""
+Shared caches of ACROSS API GET responses.
+
+GET responses of API classes with a `_cache_ttl`, such as `Visibility`, `SAA`
+and `Resolve`, are stored in a cache backend, so that identical queries made
+by any process sharing the backend are only sent to the API once until they
+expire. Three backends are provided:
+
+- MemoryBackend: In-process least-recently-used cache.
+- DiskBackend: SQLite database, shared by the processes of a host.
+- RedisBackend: Redis, or any server speaking its protocol, shared by the
+  processes of many hosts.
+
+Keys are derived from the mission, API name, API URL and validated GET
+parameters, so are the same in every process. Values are the response body,
+compressed, after a binary header recording the format version, the version
+of the API class's schema and when the value was stored. Values stored for a
+different version of the schema are treated as misses.
+
+Choose a backend by setting the ACROSS_CACHE environment variable to
+"memory", the path of a database file or a "redis://" URL, or with
+`set_cache_backend`::
+
+    from across_client.base.backends import set_cache_backend
+
+    set_cache_backend("redis://cache.example.org:6379/0")
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import warnings
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Tuple, Type, Union
+from urllib.parse import unquote, urlparse
+
+from pydantic import BaseModel
+
+from .. import constants
+
+# Header of cached values: magic, format version, flags, schema version and
+# the UNIX time the value was stored
+_HEADER = struct.Struct(">2sBB8sd")
+MAGIC = b"AC"
+FORMAT_VERSION = 1
+
+# Header flag set if the body is zlib compressed
+_COMPRESSED = 1
+
+# Bodies smaller than this many bytes are stored uncompressed
+COMPRESS_MIN = 512
+
+# Largest response body cached, in bytes
+MAX_BODY = 16 << 20
+
+# Prefix of all cache keys
+KEY_PREFIX = "across:"
+
+# Serving mode: seconds past their time-to-live that cached responses are
+# still served, while being refreshed in the background (stale-while-
+# revalidate), and when the API can't be reached (stale-if-error). See
+# `set_serving_mode`.
+STALE_WHILE_REVALIDATE = float(os.environ.get("ACROSS_STALE_WHILE_REVALIDATE", 0))
+STALE_IF_ERROR = float(os.environ.get("ACROSS_STALE_IF_ERROR", 0))
+
+# Seconds to wait before reconnecting to a Redis server that couldn't be
+# reached, rather than slowing every request down with connection attempts
+REDIS_RETRY_AFTER = 30.0
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+
+@dataclass(frozen=True)
+class Freshness:
+    """
+    How fresh the results of a GET are.
+
+    Attributes
+    ----------
+    source : str
+        Where the results came from: "api", "revalidated" (the API confirmed
+        the results of the last identical GET are unchanged), "cache",
+        "stale" (a cached response past its time-to-live, being refreshed in
+        the background) or "offline" (a cached response past its
+        time-to-live, as the API could not be reached).
+    fetched : float
+        UNIX time the response was fetched from the API.
+    ttl : Optional[float]
+        Time-to-live of the response in seconds, if cached.
+    """
+
+    source: str
+    fetched: float
+    ttl: Optional[float] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the response was fetched from the API."""
+        return time.time() - self.fetched
+
+    @property
+    def stale(self) -> bool:
+        """Is the response past its time-to-live?"""
+        return self.ttl is not None and self.age > self.ttl
+
+
+# Errors of unavailable or failing backends, which are treated as misses
+ERRORS = (OSError, sqlite3.Error, RedisError)
+
+
+@lru_cache(maxsize=None)
+def schema_version(schema: Type[BaseModel]) -> bytes:
+    """
+    Version of a schema, changing whenever its fields, or the fields of
+    schemas nested in it, do.
+
+    Parameters
+    ----------
+    schema : Type[BaseModel]
+        Pydantic model class.
+
+    Returns
+    -------
+    bytes
+        8 byte fingerprint of the schema.
+    """
+    try:
+        definition: Any = schema.model_json_schema()
+    except Exception:
+        # Fields without a JSON schema, so fall back to their types
+        definition = [f"{k}: {v.annotation!r}" for k, v in schema.model_fields.items()]
+    encoded = json.dumps(
+        [schema.__module__, schema.__qualname__, definition], sort_keys=True
+    ).encode()
+    return hashlib.sha1(encoded).digest()[:8]
+
+
+def cache_key(mission: str, api_name: str, params: dict) -> str:
+    """
+    Key of a GET request, the same in every process.
+
+    Parameters
+    ----------
+    mission : str
+        Mission of the API class.
+    api_name : str
+        API name, e.g. "Visibility".
+    params : dict
+        GET parameters, as JSON compatible values.
+
+    Returns
+    -------
+    str
+        Key, e.g. "across:swift:visibility:<hash of the parameters>".
+    """
+    canonical = json.dumps(
+        [constants.API_URL, params], sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+    digest = hashlib.sha256(canonical).hexdigest()[:32]
+    return f"{KEY_PREFIX}{mission.lower()}:{api_name.lower()}:{digest}"
+
+
+def pack(body: bytes, version: bytes) -> bytes:
+    """
+    Encode a response body as a cached value.
+
+    Parameters
+    ----------
+    body : bytes
+        Response body.
+    version : bytes
+        Version of the schema of the response, from `schema_version`.
+
+    Returns
+    -------
+    bytes
+        The cached value.
+    """
+    flags = 0
+    if len(body) >= COMPRESS_MIN:
+        body = zlib.compress(body, 6)
+        flags |= _COMPRESSED
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags, version, time.time()) + body
+
+
+def unpack(value: bytes, version: bytes) -> Optional[Tuple[bytes, float]]:
+    """
+    Decode a cached value.
+
+    Parameters
+    ----------
+    value : bytes
+        The cached value.
+    version : bytes
+        Version of the schema expected, from `schema_version`.
+
+    Returns
+    -------
+    Optional[Tuple[bytes, float]]
+        The response body and the UNIX time it was stored, or None if the
+        value is of another format or schema version, or corrupt.
+    """
+    if len(value) < _HEADER.size:
+        return None
+    magic, format_version, flags, stored_version, stored = _HEADER.unpack_from(value)
+    if (magic, format_version, stored_version) != (MAGIC, FORMAT_VERSION, version):
+        return None
+    body = value[_HEADER.size :]
+    if flags & _COMPRESSED:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            return None
+    return body, stored
+
+
+class CacheBackend(ABC):
+    """
+    Interface of response cache backends, storing bytes values under string
+    keys. Backends must implement all the methods.
+
+    Methods
+    -------
+    get(key)
+        Return the value for a key, or None if not cached or expired.
+    set(key, value, ttl)
+        Cache a value under a key.
+    delete(key)
+        Remove a key from the cache.
+    clear()
+        Remove all entries from the cache.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value for `key`, or None if not cached or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """Cache `value` under `key`, expiring after `ttl` seconds if given."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove `key` from the cache."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries from the cache."""
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Thread-safe in-process least-recently-used cache.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Maximum total size of the values held, by default 64 MB.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            value, expires = self._data[key]
+            if expires is not None and expires <= time.time():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, expires)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _pop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskBackend(CacheBackend):
+    """
+    Cache stored in an SQLite database, safe to share between threads and
+    processes.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the SQLite database file. Parent directories are created if
+        needed.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB, expires REAL)"
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, value, expires),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache stored in a Redis server, shared by every process using it.
+
+    Speaks the Redis protocol (RESP) directly, using one connection per
+    thread, so needs no Redis client library.
+
+    Parameters
+    ----------
+    url : str, optional
+        Server URL, "redis://[[username]:password@]host[:port][/db]", by
+        default "redis://127.0.0.1:6379/0".
+    timeout : float, optional
+        Connection and reply timeout in seconds, by default 1.
+    """
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", timeout: float = 1.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL {url!r}.")
+        self.url = url
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.strip("/") or 0)
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.timeout = timeout
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl is None:
+            self.command("SET", key, value)
+        else:
+            self.command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.command("DEL", key)
+
+    def clear(self):
+        """Remove all ACROSS API responses from the cache. Other keys in the
+        database are left alone."""
+        cursor = b"0"
+        while True:
+            cursor, keys = self.command(
+                "SCAN", cursor, "MATCH", f"{KEY_PREFIX}*", "COUNT", 1000
+            )
+            if keys:
+                self.command("DEL", *keys)
+            if cursor == b"0":
+                return
+
+    def command(self, *args) -> Any:
+        """
+        Send a command to the server, returning its reply.
+
+        Raises
+        ------
+        RedisError
+            If the server replies with an error.
+        OSError
+            If the server can't be reached.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                return self._send(conn, args)
+            except OSError:
+                # The server may have closed an idle connection, so reconnect
+                # and try again
+                self._close()
+        if time.monotonic() < self._down_until:
+            raise ConnectionError(f"Redis server {self.host}:{self.port} unavailable.")
+        try:
+            conn = self._local.conn = self._connect()
+        except OSError:
+            self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+            raise
+        try:
+            return self._send(conn, args)
+        except OSError:
+            self._close()
+            raise
+
+    def _connect(self) -> tuple:
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        try:
+            if self.password is not None:
+                auth = [self.username] if self.username else []
+                self._send(conn, ("AUTH", *auth, self.password))
+            if self.db:
+                self._send(conn, ("SELECT", self.db))
+        except BaseException:
+            sock.close()
+            raise
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def _send(self, conn: tuple, args: tuple) -> Any:
+        conn[0].sendall(encode_command(args))
+        return read_reply(conn[1])
+
+
+def encode_command(args: tuple) -> bytes:
+    """Encode a Redis command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = b"%d" % arg
+        parts += [b"$%d\r\n" % len(arg), arg, b"\r\n"]
+    return b"".join(parts)
+
+
+def read_reply(stream: Any) -> Any:
+    """
+    Read a RESP reply from a binary stream.
+
+    Returns
+    -------
+    Any
+        bytes for simple and bulk strings, int for integers, list for arrays,
+        or None for null replies.
+
+    Raises
+    ------
+    RedisError
+        If the reply is an error.
+    """
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the Redis server.")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise RedisError(rest.decode(errors="replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection closed by the Redis server.")
+        return data[:-2]
+    if kind == b"*":
+        length = int(rest)
+        return None if length < 0 else [read_reply(stream) for _ in range(length)]
+    raise RedisError(f"Unexpected reply {line!r}.")
+
+
+def open_backend(url: str) -> CacheBackend:
+    """
+    Open a cache backend.
+
+    Parameters
+    ----------
+    url : str
+        "memory" for an in-process cache, a "redis://" URL, or the path of a
+        database file.
+
+    Returns
+    -------
+    CacheBackend
+        The backend.
+    """
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    return DiskBackend(url)
+
+
+# Backend in use, if any, opened on first use
+_backend: Optional[CacheBackend] = None
+_backend_url: Optional[str] = os.environ.get("ACROSS_CACHE") or None
+
+
+def set_cache_backend(
+    backend: Union[str, CacheBackend, None] = None
+) -> Optional[CacheBackend]:
+    """
+    Change the backend GET responses are cached in.
+
+    Parameters
+    ----------
+    backend : Union[str, CacheBackend, None], optional
+        The backend, or a URL to open with `open_backend`, by default None (no
+        caching).
+
+    Returns
+    -------
+    Optional[CacheBackend]
+        The backend, if any.
+    """
+    global _backend, _backend_url
+    if isinstance(backend, CacheBackend):
+        _backend, _backend_url = backend, None
+    else:
+        _backend, _backend_url = None, backend
+    return cache_backend()
+
+
+def set_serving_mode(stale_while_revalidate: float = 0.0, stale_if_error: float = 0.0):
+    """
+    Serve cached responses past their time-to-live.
+
+    Parameters
+    ----------
+    stale_while_revalidate : float, optional
+        Seconds past their time-to-live that cached responses are served
+        straight away, while being refreshed in the background, by default 0.
+    stale_if_error : float, optional
+        Seconds past their time-to-live that cached responses are served if
+        the API can't be reached or fails with a server error, by default 0.
+    """
+    global STALE_WHILE_REVALIDATE, STALE_IF_ERROR
+    STALE_WHILE_REVALIDATE = stale_while_revalidate
+    STALE_IF_ERROR = stale_if_error
+
+
+def cache_backend() -> Optional[CacheBackend]:
+    """The response cache backend, if enabled and usable."""
+    global _backend, _backend_url
+    if _backend is None and _backend_url:
+        try:
+            _backend = open_backend(_backend_url)
+        except (OSError, sqlite3.Error) as e:
+            warnings.warn(f"Response cache {_backend_url!r} unavailable: {e}")
+            _backend_url = None
+    return _backend
+
+
+def load(key: str, schema: type) -> Optional[Tuple[bytes, float]]:
+    """
+    Look up a cached response.
+
+    Parameters
+    ----------
+    key : str
+        Key of the request, from `cache_key`.
+    schema : type
+        Schema of the response.
+
+    Returns
+    -------
+    Optional[Tuple[bytes, float]]
+        The response body and the UNIX time it was stored, or None on a miss
+        or if the backend failed.
+    """
+    backend = cache_backend()
+    if backend is None:
+        return None
+    try:
+        value = backend.get(key)
+    except ERRORS as e:
+        warnings.warn(f"Response cache lookup failed: {e}")
+        return None
+    return unpack(value, schema_version(schema)) if value is not None else None
+
+
+def store(
+    key: str,
+    schema: type,
+    body: bytes,
+    ttl: Optional[float] = None,
+    keep: float = 0.0,
+):
+    """
+    Cache a response body. Bodies larger than `MAX_BODY` are not cached.
+
+    Parameters
+    ----------
+    key : str
+        Key of the request, from `cache_key`.
+    schema : type
+        Schema of the response.
+    body : bytes
+        Response body.
+    ttl : Optional[float], optional
+        Time-to-live of the response in seconds, by default None (no expiry).
+        The response is kept for longer if stale responses are served (see
+        `set_serving_mode`).
+    keep : float, optional
+        Seconds to keep the response past its time-to-live, e.g. so it can be
+        revalidated, by default 0.
+    """
+    backend = cache_backend()
+    if backend is None or len(body) > MAX_BODY:
+        return
+    if ttl is not None:
+        ttl += max(STALE_WHILE_REVALIDATE, STALE_IF_ERROR, keep)
+    try:
+        backend.set(key, pack(body, schema_version(schema)), ttl)
+    except ERRORS as e:
+        warnings.warn(f"Response cache update failed: {e}")
@@ -0,0 +1,247 @@
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Type
+
+import requests
+
+from . import codec, hooks, resilience
+from .schema import BaseSchema
+
+
+@dataclass
+class Chunk:
+    """
+    A chunk of the entries of a bulk upload.
+
+    Attributes
+    ----------
+    index : int
+        Position of the chunk in the upload.
+    start : int
+        Index of the first entry in the chunk.
+    stop : int
+        Index after the last entry in the chunk.
+    ok : Optional[bool]
+        Was the chunk uploaded? None if not yet attempted.
+    error : Optional[str]
+        Error from the last failed attempt, if any.
+    attempts : int
+        Number of times the chunk has been sent.
+    bytes_sent : int
+        Size of the last (compressed) request body sent.
+    duration : float
+        Duration of the last attempt in seconds.
+    """
+
+    index: int
+    start: int
+    stop: int
+    ok: Optional[bool] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    bytes_sent: int = 0
+    duration: float = 0.0
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+class BulkUpload:
+    """
+    Progress of a chunked bulk upload, used to retry failed chunks.
+
+    Parameters
+    ----------
+    obj : ACROSSBulkPut
+        API object whose entries are uploaded.
+    chunks : List[Chunk]
+        The chunks of the upload.
+    compress : bool
+        Are request bodies gzip compressed?
+    payload : tuple
+        PUT query parameters, and the entries encoded as JSON.
+    """
+
+    def __init__(
+        self, obj: "ACROSSBulkPut", chunks: List[Chunk], compress: bool, payload: tuple
+    ):
+        self.obj = obj
+        self.chunks = chunks
+        self.compress = compress
+        self.payload = payload
+
+    def __repr__(self) -> str:
+        return (
+            f"BulkUpload({len(self.chunks)} chunks, {len(self.succeeded)} ok, "
+            f"{len(self.failed)} failed)"
+        )
+
+    @property
+    def ok(self) -> bool:
+        """Were all the chunks uploaded?"""
+        return all(chunk.ok for chunk in self.chunks)
+
+    @property
+    def succeeded(self) -> List[Chunk]:
+        """Chunks that have been uploaded."""
+        return [chunk for chunk in self.chunks if chunk.ok]
+
+    @property
+    def failed(self) -> List[Chunk]:
+        """Chunks that have not been uploaded."""
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    def run(
+        self,
+        max_workers: int = 4,
+        progress: Optional[Callable[[Chunk, int, int], Any]] = None,
+    ) -> "BulkUpload":
+        """
+        Upload the chunks that have not been uploaded yet.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Maximum number of chunks sent at once, by default 4.
+        progress : Optional[Callable[[Chunk, int, int], Any]], optional
+            Called after each chunk is attempted, with the chunk, the number
+            of chunks attempted so far and the number being sent.
+
+        Returns
+        -------
+        BulkUpload
+            This upload.
+        """
+        pending = self.failed
+        if not pending:
+            return self
+        params, entries = self.payload
+        send = resilience.within_deadline(self._send)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as e:
+            futures = [e.submit(send, chunk, params, entries) for chunk in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                if progress is not None:
+                    progress(future.result(), done, len(pending))
+        return self
+
+    def retry(self, **kwargs) -> "BulkUpload":
+        """Re-send only the failed chunks. Takes the same arguments as
+        `run`."""
+        return self.run(**kwargs)
+
+    def _send(self, chunk: Chunk, params: dict, entries: list) -> Chunk:
+        body = codec.CODEC.dumps({"entries": entries[chunk.start : chunk.stop]})
+        headers = {"Content-Type": "application/json"}
+        if self.compress:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        chunk.attempts += 1
+        chunk.bytes_sent = len(body)
+        start = time.perf_counter()
+        try:
+            self.obj._put_chunk(params, body, headers)
+            chunk.ok, chunk.error = True, None
+        except Exception as e:
+            chunk.ok, chunk.error = False, f"{type(e).__name__}: {e}"
+        chunk.duration = time.perf_counter() - start
+        return chunk
+
+
+class ACROSSBulkPut:
+    """
+    Mixin for API classes that upload `entries` with a PUT, adding chunked,
+    compressed and concurrent uploads of large numbers of entries.
+
+    Methods
+    -------
+    bulk_put(chunk_size, max_bytes, max_workers, compress, progress)
+        Upload the entries in chunks.
+    """
+
+    # Provided by ACROSSBase
+    entries: list
+    _put_schema: Type[BaseSchema]
+    _request: Callable[..., requests.Response]
+    api_url: Callable[..., str]
+
+    def _bulk_payload(self) -> tuple:
+        """Validated PUT query parameters, and entries encoded as JSON."""
+        validated = self._put_schema.model_validate(self)
+        params = {key: value for key, value in validated if key != "entries"}
+        entries = validated.model_dump(include={"entries"}, mode="json")["entries"]
+        return params, entries
+
+    @hooks.traced("PUT")
+    def _put_chunk(self, params: dict, body: bytes, headers: dict):
+        """PUT one chunk of entries, raising an exception if it fails."""
+        record = hooks.current()
+        if record is not None:
+            record.lap("validate")
+        req = self._request(
+            "PUT", self.api_url(params), params=params, data=body, headers=headers
+        )
+        if req.status_code != 201:
+            req.raise_for_status()
+            raise ValueError(f"Unexpected response status {req.status_code}.")
+
+    def bulk_put(
+        self,
+        chunk_size: int = 1000,
+        max_bytes: Optional[int] = None,
+        max_workers: int = 4,
+        compress: bool = True,
+        progress: Optional[Callable[[Chunk, int, int], Any]] = None,
+    ) -> BulkUpload:
+        """
+        Upload the entries in chunks, sent concurrently.
+
+        Unlike `put`, the entries returned by the API are not loaded back
+        into this object.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Maximum number of entries per chunk, by default 1000.
+        max_bytes : Optional[int], optional
+            Maximum size of the uncompressed JSON of the entries in a chunk,
+            by default no limit. A single entry larger than this is sent in a
+            chunk on its own.
+        max_workers : int, optional
+            Maximum number of chunks sent at once, by default 4.
+        compress : bool, optional
+            gzip compress the request bodies, by default True.
+        progress : Optional[Callable[[Chunk, int, int], Any]], optional
+            Called after each chunk is attempted, with the chunk, the number
+            of chunks attempted so far and the total number of chunks.
+
+        Returns
+        -------
+        BulkUpload
+            The upload. Check `ok`, and call `retry()` to re-send any chunks
+            that failed.
+
+        Raises
+        ------
+        ValidationError
+            If the PUT parameters or entries don't validate.
+        """
+        params, entries = self._bulk_payload()
+        chunks: List[Chunk] = []
+        start = size = 0
+        for i, entry in enumerate(entries):
+            entry_size = (
+                len(codec.CODEC.dumps(entry)) + 1 if max_bytes is not None else 0
+            )
+            if i > start and (
+                i - start >= chunk_size
+                or (max_bytes is not None and size + entry_size > max_bytes)
+            ):
+                chunks.append(Chunk(len(chunks), start, i))
+                start, size = i, 0
+            size += entry_size
+        if len(entries) > start:
+            chunks.append(Chunk(len(chunks), start, len(entries)))
+        upload = BulkUpload(self, chunks, compress, (params, entries))
+        return upload.run(max_workers=max_workers, progress=progress)
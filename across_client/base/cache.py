@@ -0,0 +1,156 @@
+"""
+Caches used by the ACROSS API client.
+
+- LRUCache: Thread-safe in-memory least-recently-used cache, optionally
+  backed by a persistent cache.
+- DiskCache: Persistent cache stored in an SQLite database, safe to share
+  between threads and processes.
+
+Both caches support an optional time-to-live for entries, and store any
+JSON serializable value.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Sentinel for cache misses, so that None can be cached
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory least-recently-used cache.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries held in memory, by default 1024.
+    ttl : Optional[float], optional
+        Time-to-live of entries in seconds, by default None (no expiry).
+    backing : Optional[DiskCache], optional
+        Persistent cache that misses fall through to, and that new entries are
+        written through to, by default None.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        backing: Optional["DiskCache"] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backing = backing
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for `key`, or `default` if not cached or expired."""
+        with self._lock:
+            if key in self._data:
+                value, expires = self._data[key]
+                if expires is None or expires > time.time():
+                    self._data.move_to_end(key)
+                    return value
+                del self._data[key]
+        if self.backing is not None:
+            value = self.backing.get(key, MISSING)
+            if value is not MISSING:
+                self._store(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any):
+        """Cache `value` under `key`, writing through to any backing cache."""
+        self._store(key, value)
+        if self.backing is not None:
+            self.backing.set(key, value)
+
+    def _store(self, key: str, value: Any):
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """Remove `key` from the cache and any backing cache."""
+        with self._lock:
+            self._data.pop(key, None)
+        if self.backing is not None:
+            self.backing.delete(key)
+
+    def clear(self):
+        """Empty the in-memory cache. Any backing cache is left untouched."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    Persistent cache stored in an SQLite database.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the SQLite database file. Parent directories are created if
+        needed.
+    ttl : Optional[float], optional
+        Time-to-live of entries in seconds, by default None (no expiry).
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for `key`, or `default` if not cached or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        """Cache `value` under `key`."""
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), expires),
+            )
+
+    def delete(self, key: str):
+        """Remove `key` from the cache."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, MISSING) is not MISSING
@@ -0,0 +1,116 @@
+"""
+JSON codecs used to encode request bodies and decode responses.
+
+The fastest available codec is used by default: `orjson` if it is installed,
+or else the standard library `json` module. Responses are validated straight
+from their raw bytes by pydantic where possible, so most are only parsed
+once. The codec can be changed with `set_codec`::
+
+    from across_client.base import codec
+
+    codec.set_codec("json")
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime, time
+from typing import Any, Type, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+try:
+    import orjson  # type: ignore
+
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+
+def _default(obj: Any) -> Any:
+    """Encode objects that JSON can't represent the way `orjson` does, so
+    that both codecs give the same JSON: NumPy arrays and scalars as their
+    values, datetimes in ISO format, dataclasses as objects, and anything
+    else as a string."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+class JSONCodec:
+    """Codec using the standard library `json` module."""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as compact UTF-8 JSON. Objects that JSON can't
+        represent are encoded as by `orjson`, e.g. datetimes as ISO format
+        strings and NumPy arrays as lists."""
+        return json.dumps(
+            obj, default=_default, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+
+    def validate(self, schema: Type[BaseModel], data: Union[bytes, str]) -> BaseModel:
+        """Decode and validate JSON with a schema, in a single pass."""
+        return schema.model_validate_json(data)
+
+    def dump(self, model: BaseModel, **kwargs) -> bytes:
+        """Encode a validated schema as JSON, with arguments as for
+        `model_dump`."""
+        return model.model_dump_json(**kwargs).encode()
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using `orjson`."""
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Available codecs, by name
+CODECS = {"json": JSONCodec}
+if HAVE_ORJSON:
+    CODECS["orjson"] = OrjsonCodec
+
+# Codec in use
+CODEC: JSONCodec = OrjsonCodec() if HAVE_ORJSON else JSONCodec()
+
+
+def set_codec(codec: Union[str, JSONCodec]) -> JSONCodec:
+    """Change the codec used for all ACROSS API requests.
+
+    Parameters
+    ----------
+    codec : Union[str, JSONCodec]
+        Codec, or the name of an available codec ("json" or "orjson").
+
+    Returns
+    -------
+    JSONCodec
+        The codec now in use.
+
+    Raises
+    ------
+    ValueError
+        If the named codec is not available.
+    """
+    global CODEC
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"JSON codec '{codec}' is not available.")
+        codec = CODECS[codec]()
+    CODEC = codec
+    return CODEC
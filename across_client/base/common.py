@@ -1,13 +1,129 @@
+import threading
+import time
 import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
 from pathlib import PosixPath
-from typing import Any, Type
+from typing import Any, Callable, Dict, Optional, Type, Union, cast, get_args
 
 import requests
+from pydantic import TypeAdapter
 
-from ..constants import API_URL
+from .. import constants
 from ..functions import tablefy
+from . import backends, codec, hooks, jsonstream, ratelimit, resilience
+from .cache import LRUCache
 from .schema import BaseSchema
 
+# Headers for requests with a JSON body
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Maximum number of recent GETs kept for revalidation, and the largest
+# response body kept in memory for one, so at most 32 MiB are held
+REVALIDATE_MAX = 128
+REVALIDATE_MAX_BODY = 256 << 10
+
+# Maximum number of threads making hedged requests
+HEDGE_WORKERS = 32
+
+# Per-thread HTTP sessions, so connections are reused between requests
+_local = threading.local()
+
+# Validators (ETag and Last-Modified) of recent GETs whose responses had
+# them, and the response body unless it is in the response cache, by class
+# name and query, to revalidate with conditional GETs
+_revalidate = LRUCache(maxsize=REVALIDATE_MAX)
+
+# GETs in progress, as the making thread and a future resolving to the object
+# fetched (or None if the GET failed), by class and query, so that identical
+# concurrent GETs share one request
+_in_flight: dict = {}
+_in_flight_lock = threading.Lock()
+
+# Keys of cached responses being refreshed in the background
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+# Threads making hedged requests, created when first needed
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """HTTP session for the current thread.
+
+    Returns
+    -------
+    requests.Session
+        Session used for all ACROSS API requests made by this thread.
+    """
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+        _local.session.headers["Accept-Encoding"] = jsonstream.ACCEPT_ENCODING
+    return _local.session
+
+
+def hedged(
+    send: Callable[[], requests.Response],
+    delay: float,
+    record: Optional[hooks.RequestRecord] = None,
+) -> requests.Response:
+    """
+    Make a request, sending it again if there is no response after `delay`
+    seconds, and return whichever response arrives first.
+
+    Parameters
+    ----------
+    send : Callable[[], requests.Response]
+        Makes the request. Called in worker threads.
+    delay : float
+        Seconds to wait before sending the request again.
+    record : Optional[hooks.RequestRecord], optional
+        Record of the request, marked as hedged if it is sent again.
+
+    Returns
+    -------
+    requests.Response
+        The first response, or if both requests fail, the last error is
+        raised.
+    """
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=HEDGE_WORKERS, thread_name_prefix="across-hedge"
+            )
+        executor = _hedge_executor
+    primary = executor.submit(send)
+    if wait([primary], timeout=delay).done:
+        return primary.result()
+
+    if record is not None:
+        record.hedged = True
+    pending = {primary, executor.submit(send)}
+    while True:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        succeeded = [future for future in done if future.exception() is None]
+        if succeeded or not pending:
+            first = (succeeded or list(done))[0]
+            # Close the slower response, freeing its connection
+            for future in pending | done - {first}:
+                future.add_done_callback(_close_response)
+            return first.result()
+
+
+def _close_response(future: Future):
+    """Close the response of a request that lost a hedge."""
+    if future.exception() is None:
+        future.result().close()
+
+
+@lru_cache(maxsize=None)
+def field_adapter(schema: Type[BaseSchema], name: str) -> TypeAdapter:
+    """Validator for a single field of a schema."""
+    return TypeAdapter(schema.model_fields[name].annotation)
+
 
 class ACROSSBase:
     """
@@ -27,6 +143,16 @@ class ACROSSBase:
     _mission: str
     _api_name: str = __name__
 
+    # Compact collection class to store returned entries in, if any
+    _entries_collection: Optional[Type] = None
+
+    # Time-to-live in seconds of GET responses in the response cache backend,
+    # if one is enabled (see `backends`), or None to not cache them
+    _cache_ttl: Optional[float] = None
+
+    # How fresh the results of the last GET are
+    freshness: Optional[backends.Freshness] = None
+
     def __getitem__(self, i):
         return self.entries[i]
 
@@ -41,8 +167,8 @@ class ACROSSBase:
         """
         # If arguments has `id` in it, then put this in the path
         if "id" in argdict.keys() and argdict["id"] is not None:
-            return f"{API_URL}{self._mission.lower()}/{self._api_name.lower()}/{argdict['id']}"
-        return f"{API_URL}{self._mission.lower()}/{self._api_name.lower()}"
+            return f"{constants.API_URL}{self._mission.lower()}/{self._api_name.lower()}/{argdict['id']}"
+        return f"{constants.API_URL}{self._mission.lower()}/{self._api_name.lower()}"
 
     @property
     def schema(self) -> Any:
@@ -81,6 +207,7 @@ class ACROSSBase:
             if hasattr(self, k) and v is not None:
                 setattr(self, k, v)
 
+    @hooks.traced("GET")
     def get(self) -> bool:
         """
         Perform a 'GET' submission to ACROSS API. Used for fetching
@@ -96,26 +223,236 @@ class ACROSSBase:
         HTTPError
             Raised if GET doesn't return a 200 response.
         """
+        record = hooks.current()
         if self.validate_get():
             # Create an array of parameters from the schema
-            get_params = {
-                key: value for key, value in self._get_schema.model_validate(self)
-            }
-            # Do the GET request
-            req = requests.get(self.api_url(get_params), params=get_params, timeout=60)
-            if req.status_code == 200:
-                # Parse, validate and record values from returned API JSON
-                for k, v in self._schema.model_validate(req.json()):
-                    setattr(self, k, v)
-                return True
-            elif req.status_code == 404:
-                """Handle 404 errors gracefully, by issuing a warning"""
-                warnings.warn(req.json()["detail"])
-            else:
-                # Raise an exception if the HTML response was not 200
-                req.raise_for_status()
+            validated = self._get_schema.model_validate(self)
+            get_params = {key: value for key, value in validated}
+            key = backends.cache_key(
+                self._mission, self._api_name, validated.model_dump(mode="json")
+            )
+            if record is not None:
+                record.lap("validate")
+
+            # Share the GET with an identical one already in flight, if any
+            flight = (type(self), key)
+            with _in_flight_lock:
+                leader = _in_flight.get(flight)
+                if leader is None:
+                    future: Future = Future()
+                    _in_flight[flight] = (threading.get_ident(), future)
+            if leader is not None:
+                if leader[0] == threading.get_ident():
+                    # Made while loading the GET in flight, so can't wait for it
+                    return self._get(get_params, key)
+                if record is not None:
+                    record.coalesced = True
+                try:
+                    shared = leader[1].result(timeout=resilience.remaining())
+                except FutureTimeoutError:
+                    raise resilience.DeadlineExceeded(
+                        f"Deadline passed waiting for {self._api_name} GET."
+                    )
+                return self._share(shared)
+
+            try:
+                fetched = self._get(get_params, key)
+                future.set_result(self if fetched else None)
+                return fetched
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _in_flight_lock:
+                    del _in_flight[flight]
+        return False
+
+    def _get(self, get_params: dict, key: str) -> bool:
+        """
+        Fetch the response to a GET, from the response cache if possible, and
+        load it.
+
+        Parameters
+        ----------
+        get_params : dict
+            Validated GET parameters.
+        key : str
+            Key of the query, from `backends.cache_key`.
+
+        Returns
+        -------
+        bool
+            Was the get successful?
+        """
+        record = hooks.current()
+        ttl = self._cache_ttl
+        cache_key: Optional[str] = key
+        if ttl is None or backends.cache_backend() is None:
+            cache_key = None
+        cached = stored = None
+        if cache_key is not None and ttl is not None:
+            # Load the response from the cache, if it's there
+            cached = stored = backends.load(cache_key, self._schema)
+            if record is not None:
+                record.cache = "miss" if cached is None else "hit"
+            if cached is not None:
+                age = time.time() - cached[1]
+                if age <= ttl:
+                    self._load_cached(cached, "cache")
+                    return True
+                if age <= ttl + backends.STALE_WHILE_REVALIDATE:
+                    # Serve the stale response now, and refresh it for later
+                    self._load_cached(cached, "stale")
+                    self._refresh(get_params, cache_key)
+                    return True
+                if record is not None:
+                    record.cache = "miss"
+                if age > ttl + backends.STALE_IF_ERROR:
+                    cached = None
+        # Ask for the response only if it changed since the last identical
+        # GET, if the API gave validators for it
+        revalidate_key = f"{type(self).__module__}.{type(self).__qualname__}|{key}"
+        previous = _revalidate.get(revalidate_key)
+        # Body to reload if the response is unchanged, kept with the
+        # validators or in the response cache
+        reuse: Optional[bytes] = None
+        if previous is not None:
+            reuse = previous[2]
+            if reuse is None and stored is not None:
+                reuse = stored[0]
+        headers = {}
+        if previous is not None and reuse is not None:
+            etag, modified, _ = previous
+            if etag is not None:
+                headers["If-None-Match"] = etag
+            if modified is not None:
+                headers["If-Modified-Since"] = modified
+        # Do the GET request, streaming the response so that large
+        # responses can be decoded as they arrive
+        try:
+            req = self._request(
+                "GET",
+                self.api_url(get_params),
+                params=get_params,
+                headers=headers,
+                stream=True,
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            if cached is None:
+                raise
+            # The API can't be reached, so serve the stale response
+            self._load_cached(cached, "offline")
+            return True
+        if req.status_code == 304 and reuse is not None:
+            # Unchanged, so reload the body fetched last time. Reading the
+            # empty body returns the connection to the pool
+            req.content
+            if record is not None:
+                record.cache = "revalidated"
+            self._load(reuse)
+            if cache_key is not None and ttl is not None:
+                # Confirmed fresh, so cache it for another time-to-live
+                backends.store(cache_key, self._schema, reuse, ttl, keep=ttl)
+            self.freshness = backends.Freshness(
+                "revalidated", time.time(), ttl if cache_key is not None else None
+            )
+            return True
+        if req.status_code == 200:
+            validators = req.headers.get("ETag"), req.headers.get("Last-Modified")
+            revalidate = validators != (None, None)
+            # Parse, validate and record values from returned API JSON
+            body = self._load_response(req, keep=cache_key is not None or revalidate)
+            if body is not None and cache_key is not None and ttl is not None:
+                # Kept for another time-to-live if it can be revalidated
+                keep = ttl if revalidate else 0.0
+                backends.store(cache_key, self._schema, body, ttl, keep=keep)
+            if revalidate and body is not None:
+                if cache_key is not None:
+                    # Reloaded from the response cache
+                    _revalidate.set(revalidate_key, (*validators, None))
+                elif len(body) <= REVALIDATE_MAX_BODY:
+                    _revalidate.set(revalidate_key, (*validators, body))
+            self.freshness = backends.Freshness(
+                "api", time.time(), self._cache_ttl if body is not None else None
+            )
+            return True
+        elif cached is not None and req.status_code >= 500:
+            # The API is failing, so serve the stale response
+            req.close()
+            self._load_cached(cached, "offline")
+            return True
+        elif req.status_code == 404:
+            """Handle 404 errors gracefully, by issuing a warning"""
+            warnings.warn(req.json()["detail"])
+        else:
+            # Raise an exception if the HTML response was not 200
+            req.raise_for_status()
         return False
 
+    def _load_cached(self, cached: tuple, source: str):
+        """Load a response from the response cache, recording where it came
+        from in `freshness`."""
+        record = hooks.current()
+        if record is not None and source != "cache":
+            record.cache = "stale"
+        self._load(cached[0])
+        self.freshness = backends.Freshness(source, cached[1], self._cache_ttl)
+
+    def _refresh(self, get_params: dict, key: str):
+        """Refresh a cached response in a background thread, unless it is
+        already being refreshed."""
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+        threading.Thread(
+            target=self._fetch_to_cache,
+            args=(get_params, key),
+            name="across-cache-refresh",
+            daemon=True,
+        ).start()
+
+    @hooks.traced("GET")
+    def _fetch_to_cache(self, get_params: dict, key: str):
+        """Fetch a GET response and store it in the response cache, without
+        loading it."""
+        try:
+            req = self._request("GET", self.api_url(get_params), params=get_params)
+            if req.status_code == 200:
+                # Only cache valid responses
+                codec.CODEC.validate(self._schema, req.content)
+                backends.store(key, self._schema, req.content, self._cache_ttl)
+        except Exception as e:
+            warnings.warn(f"Refreshing cached {self._api_name} failed: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    def _results(self) -> dict:
+        """Values of the fields of the schema, e.g. to share with identical
+        queries."""
+        results = {}
+        for key in self._schema.model_fields:
+            if hasattr(self, key):
+                value = getattr(self, key)
+                results[key] = list(value) if type(value) is list else value
+        return results
+
+    def _restore(self, results: dict):
+        """Record the values of the fields of the schema, from `_results`."""
+        for key, value in results.items():
+            setattr(self, key, list(value) if type(value) is list else value)
+
+    def _share(self, leader: Optional["ACROSSBase"]) -> bool:
+        """Record the results of an identical GET made by `leader`, or None
+        if it failed. Returns True if it succeeded."""
+        if leader is None:
+            return False
+        self._restore(leader._results())
+        self.freshness = leader.freshness
+        return True
+
+    @hooks.traced("DELETE")
     def delete(self) -> bool:
         """
         Perform a 'GET' submission to ACROSS API. Used for fetching
@@ -131,25 +468,26 @@ class ACROSSBase:
         HTTPError
             Raised if GET doesn't return a 200 response.
         """
+        record = hooks.current()
         if self.validate_del():
             # Create an array of parameters from the schema
             del_params = {
                 key: value for key, value in self._del_schema.model_validate(self)
             }
+            if record is not None:
+                record.lap("validate")
             # Do the DELETE request
-            req = requests.delete(
-                self.api_url(del_params), params=del_params, timeout=60
-            )
+            req = self._request("DELETE", self.api_url(del_params), params=del_params)
             if req.status_code == 200:
                 # Parse, validate and record values from returned API JSON
-                for k, v in self._schema.model_validate(req.json()):
-                    setattr(self, k, v)
+                self._load(req.content)
                 return True
             else:
                 # Raise an exception if the HTML response was not 200
                 req.raise_for_status()
         return False
 
+    @hooks.traced("PUT")
     def put(self, payload={}) -> bool:
         """
         Perform a 'PUT' submission to ACROSS API. Used for pushing/replacing
@@ -165,6 +503,7 @@ class ACROSSBase:
         HTTPError
             Raised if PUT doesn't return a 201 response.
         """
+        record = hooks.current()
         if self.validate_put():
             # Other non-file parameters
             put_params = {
@@ -180,24 +519,22 @@ class ACROSSBase:
 
             # Extract any entries data, and upload this as JSON
             if hasattr(self, "entries") and len(self.entries) > 0:
-                jsdata = self._put_schema.model_validate(self).model_dump(
-                    include={"entries"}, mode="json"
+                body = codec.CODEC.dump(
+                    self._put_schema.model_validate(self), include={"entries"}
                 )
             # Or else pass any specific payload
             else:
-                jsdata = payload
+                body = codec.CODEC.dumps(payload)
+            if record is not None:
+                record.lap("validate")
 
             # Make PUT request
-            req = requests.put(
-                api_url,
-                params=put_params,
-                json=jsdata,
-                timeout=60,
+            req = self._request(
+                "PUT", api_url, params=put_params, data=body, headers=JSON_HEADERS
             )
             if req.status_code == 201:
                 # Parse, validate and record values from returned API JSON
-                for k, v in self._schema.model_validate(req.json()):
-                    setattr(self, k, v)
+                self._load(req.content)
                 return True
             elif req.status_code == 503:
                 print("ERROR: ", req.status_code, "Service Unavailable for ", req.url)
@@ -206,6 +543,7 @@ class ACROSSBase:
                 req.raise_for_status()
         return False
 
+    @hooks.traced("POST")
     def post(self) -> bool:
         """
         Perform a 'PUT' submission to ACROSS API. Used for pushing/replacing
@@ -221,6 +559,7 @@ class ACROSSBase:
         HTTPError
             Raised if POST doesn't return a 201 response.
         """
+        record = hooks.current()
         if self.validate_post():
             # Extract any files out of the arguments
             files = {
@@ -246,33 +585,32 @@ class ACROSSBase:
 
             # Extract any entries data, and upload this as JSON
             if hasattr(self, "entries") and len(self.entries) > 0:
-                jsdata = self._post_schema.model_validate(self).model_dump(
-                    include={"entries"}, mode="json"
+                body = codec.CODEC.dump(
+                    self._post_schema.model_validate(self), include={"entries"}
                 )
             else:
-                jsdata = {}
+                body = b"{}"
+            if record is not None:
+                record.lap("validate")
 
             if files == {}:
                 # If there are no files, we can upload self.entries as JSON data
-                req = requests.post(
+                req = self._request(
+                    "POST",
                     self.api_url(post_params),
                     params=post_params,
-                    json=jsdata,
-                    timeout=60,
+                    data=body,
+                    headers=JSON_HEADERS,
                 )
             else:
                 # Otherwise we need to use multipart/form-data for files, and pass the other parameters as query parameters
-                req = requests.post(
-                    self.api_url(post_params),
-                    params=post_params,
-                    files=files,
-                    timeout=60,
+                req = self._request(
+                    "POST", self.api_url(post_params), params=post_params, files=files
                 )
 
             if req.status_code == 201:
                 # Parse, validate and record values from returned API JSON
-                for k, v in self._schema.model_validate(req.json()):
-                    setattr(self, k, v)
+                self._load(req.content)
                 return True
             elif req.status_code == 200:
                 warnings.warn(req.json()["detail"])
@@ -282,6 +620,298 @@ class ACROSSBase:
                 req.raise_for_status()
         return False
 
+    def _headers(self, method: str) -> dict:
+        """
+        Extra HTTP headers to send with a request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+
+        Returns
+        -------
+        dict
+            Headers, by default none.
+        """
+        return {}
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Make an HTTP request to the ACROSS API, retrying transient failures
+        according to the endpoint's retry policy (see `resilience`), and
+        recording it if any request hooks are registered. Each attempt first
+        waits for the endpoint's rate limits (see `ratelimit`), which are held
+        until the response headers arrive, and times out by the current
+        deadline (see `resilience.deadline`). Slow GETs are hedged if the
+        policy says so.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        url : str
+            URL of the request.
+        **kwargs
+            Arguments passed to `requests.Session.request`.
+
+        Returns
+        -------
+        requests.Response
+            The response, with the body read.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the endpoint's circuit breaker is open.
+        DeadlineExceeded
+            If the request couldn't be completed before the current deadline.
+        """
+        headers = self._headers(method)
+        if headers:
+            kwargs["headers"] = {**headers, **kwargs.get("headers", {})}
+        policy = resilience.retry_policy(self._mission, self._api_name)
+        breaker = resilience.breaker(self._mission, self._api_name)
+        # Files may have been read by a failed attempt, so can't be resent
+        retryable = policy.retryable(method, kwargs.get("headers")) and (
+            "files" not in kwargs
+        )
+        latency = resilience.latency(self._mission, self._api_name)
+        record = hooks.current()
+        attempt = 0
+        while True:
+            trial = breaker.check(policy)
+            # Was the attempt's outcome recorded by the circuit breaker?
+            recorded = False
+            timeout = policy.timeout
+            try:
+                with ratelimit.limit(self._mission, self._api_name) as waited:
+                    if record is not None:
+                        record.add("queue", waited)
+                    left = resilience.remaining()
+                    if left is not None:
+                        if left <= 0:
+                            raise resilience.DeadlineExceeded(
+                                f"Deadline passed before {method} {url} was made."
+                            )
+                        timeout = min(timeout, left)
+                    hedge = None
+                    if policy.hedge and method == "GET" and retryable:
+                        hedge = latency.quantile(policy.hedge_quantile)
+                    start = time.perf_counter()
+                    req = self._send(method, url, timeout, hedge, **kwargs)
+                    if method == "GET":
+                        latency.observe(time.perf_counter() - start)
+            except resilience.DeadlineExceeded:
+                # Not the service's fault, so not counted by the breaker, but
+                # a trial is still freed below
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if isinstance(e, requests.Timeout) and timeout < policy.timeout:
+                    # Timed out by the deadline, rather than a slow service
+                    raise resilience.DeadlineExceeded(
+                        f"Deadline passed waiting for {method} {url}."
+                    ) from e
+                breaker.failure(policy)
+                recorded = True
+                if not retryable or attempt >= policy.retries:
+                    raise
+                delay = policy.delay(attempt)
+                if delay is None:
+                    raise
+            except Exception:
+                # e.g. a broken response body, or a failing request hook
+                breaker.failure(policy)
+                recorded = True
+                raise
+            else:
+                if req.status_code >= resilience.FAILURE_STATUS:
+                    breaker.failure(policy)
+                else:
+                    breaker.success()
+                recorded = True
+                if (
+                    not retryable
+                    or attempt >= policy.retries
+                    or req.status_code not in policy.statuses
+                ):
+                    return req
+                delay = policy.delay(attempt, req)
+                if delay is None:
+                    return req
+                # Read the error body, so the connection can be reused
+                req.content
+            finally:
+                if trial and not recorded:
+                    # Free the trial for another request, leaving the circuit
+                    # open
+                    breaker.abandon()
+            attempt += 1
+            if record is not None:
+                record.retries = attempt
+            time.sleep(delay)
+            if record is not None:
+                record.lap("backoff")
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        timeout: float,
+        hedge: Optional[float] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Make a single attempt at an HTTP request, timing out after
+        `timeout` seconds and hedged after `hedge` seconds if given, taking
+        the same other arguments as `_request`."""
+        stream = kwargs.pop("stream", False)
+        record = hooks.current()
+        if record is not None:
+            record.params_hash = hooks.params_hash(kwargs.get("params"))
+
+        def send() -> requests.Response:
+            # Stream the response if recorded, so the time to read the body
+            # can be measured
+            return session().request(
+                method,
+                url,
+                timeout=timeout,
+                stream=stream or record is not None,
+                **kwargs,
+            )
+
+        req = send() if hedge is None else hedged(send, hedge, record)
+        if record is None:
+            return req
+
+        record.url = req.url
+        record.status = req.status_code
+        body = req.request.body
+        if isinstance(body, (bytes, str)):
+            record.bytes_sent = len(body)
+        record.lap("connect")
+        if not stream:
+            record.bytes_received = len(req.content)
+            record.lap("transfer")
+        return req
+
+    def _load_response(
+        self, req: requests.Response, keep: bool = False
+    ) -> Optional[bytes]:
+        """
+        Load a response requested with `stream=True`. Large responses are
+        decoded incrementally as they arrive, with array fields validated in
+        batches, and others read whole and loaded with `_load`.
+
+        Parameters
+        ----------
+        req : requests.Response
+            The response, with its body not yet read.
+        keep : bool, optional
+            Return the response body, e.g. for caching, by default False.
+
+        Returns
+        -------
+        Optional[bytes]
+            The response body if `keep` is True, unless it was larger than
+            `backends.MAX_BODY`.
+        """
+        record = hooks.current()
+        if not jsonstream.streamable(req):
+            content = req.content
+            if record is not None:
+                record.bytes_received = len(content)
+                record.lap("transfer")
+            self._load(content)
+            return content if keep else None
+
+        validated = set()
+
+        def decode_array(name: str, data: bytes) -> list:
+            if name not in self._schema.model_fields or (
+                name == "entries" and self._entries_collection is not None
+            ):
+                # Validated when the entries collection is built
+                return codec.CODEC.loads(data)
+            validated.add(name)
+            return field_adapter(self._schema, name).validate_json(data)
+
+        # Keep a copy of the body while it is small enough to cache
+        chunks: Optional[list] = [] if keep else None
+        size = 0
+
+        def tee(chunk: bytes):
+            nonlocal chunks, size
+            if chunks is not None:
+                size += len(chunk)
+                chunks.append(chunk)
+                if size > backends.MAX_BODY:
+                    chunks = None
+
+        decoder = jsonstream.decode(req, decode_array, tee)
+        if record is not None:
+            # Transfer and decoding are interleaved, so are timed together
+            record.bytes_received = decoder.bytes_received
+            record.lap("transfer")
+        self._build(decoder.data, validated)
+        if record is not None:
+            record.lap("model_build")
+        return b"".join(chunks) if chunks is not None else None
+
+    def _load(self, data: Union[bytes, str, dict]):
+        """
+        Parse and validate data returned by the API, and record the values as
+        attributes of this class.
+
+        Parameters
+        ----------
+        data : Union[bytes, str, dict]
+            JSON returned by the API, either raw or decoded.
+        """
+        record = hooks.current()
+        if isinstance(data, (bytes, str)):
+            if self._entries_collection is None:
+                # Decode and validate in a single pass
+                for k, v in codec.CODEC.validate(self._schema, data):
+                    setattr(self, k, v)
+                if record is not None:
+                    record.lap("model_build")
+                return
+            data = codec.CODEC.loads(data)
+        if record is not None:
+            record.lap("decode")
+        self._build(cast(dict, data))
+        if record is not None:
+            record.lap("model_build")
+
+    def _build(self, data: dict, validated: set = set()):
+        """
+        Validate decoded API JSON, and record the values as attributes of
+        this class.
+
+        Parameters
+        ----------
+        data : dict
+            Decoded API JSON.
+        validated : set, optional
+            Names of fields whose values in `data` have already been
+            validated, by default none.
+        """
+        # Fields not validated again, but set directly from `data`
+        skip: Dict[str, list] = {k: [] for k in validated if k in data}
+        entries = None
+        collection = self._entries_collection
+        if collection is not None and "entries" in data:
+            # Store entries compactly, rather than as a list of schema objects
+            entries = data["entries"]
+            skip["entries"] = []
+        for k, v in self._schema.model_validate({**data, **skip}):
+            setattr(self, k, data[k] if k in skip else v)
+        if collection is not None and entries is not None:
+            self.entries = collection.from_entries(
+                entries, get_args(self._schema.model_fields["entries"].annotation)[0]
+            )
+
     def validate_get(self) -> bool:
         """Validate arguments for GET
 
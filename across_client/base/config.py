@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from .cache import DiskCache
+from .common import ACROSSBase
+from .schema import (
+    ConfigGetSchema,
+    ConfigSchema,
+    EphemConfigSchema,
+    InstrumentSchema,
+    MissionSchema,
+    TLEConfigSchema,
+    VisibilityConfigSchema,
+)
+
+# Mission configurations fetched by this process, keyed by mission
+_configs: dict = {}
+_configs_lock = threading.Lock()
+
+# Locks held while loading each mission's configuration, so concurrent loads
+# of one mission share a single fetch without blocking other missions
+_load_locks: dict = {}
+
+# Default time-to-live of configurations cached on disk, in seconds
+CONFIG_TTL = 86400.0
+
+# Persistent cache of mission configurations, opened on first use. Set the
+# ACROSS_CONFIG_CACHE environment variable to the path of a database file to
+# change where it is stored, or to an empty string to disable it.
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+_disk_cache_path: Optional[str] = os.environ.get(
+    "ACROSS_CONFIG_CACHE", "~/.cache/across_client/config.sqlite"
+)
+
+
+def set_config_cache(path: Optional[str] = None, ttl: float = CONFIG_TTL):
+    """Change the persistent cache of mission configurations.
+
+    Parameters
+    ----------
+    path : Optional[str], optional
+        Path of a database file to cache configurations in, by default None
+        (no persistent cache).
+    ttl : float, optional
+        Time in seconds after which configurations are fetched again, by
+        default `CONFIG_TTL` (one day).
+    """
+    global _disk_cache, _disk_cache_path, CONFIG_TTL
+    _disk_cache = None
+    _disk_cache_path = path
+    CONFIG_TTL = ttl
+
+
+def clear_config_cache():
+    """Forget all mission configurations, both in memory and on disk."""
+    with _configs_lock:
+        _configs.clear()
+        disk = _config_disk_cache()
+        if disk is not None:
+            disk.clear()
+
+
+def _config_disk_cache() -> Optional[DiskCache]:
+    """Persistent cache of mission configurations, if enabled and usable."""
+    global _disk_cache, _disk_cache_path
+    with _disk_cache_lock:
+        if _disk_cache is None and _disk_cache_path:
+            try:
+                _disk_cache = DiskCache(_disk_cache_path, ttl=CONFIG_TTL)
+            except (OSError, sqlite3.Error):
+                # e.g. read-only home directory, carry on without it
+                _disk_cache_path = None
+        return _disk_cache
+
+
+class ConfigBase(ACROSSBase):
+    """
+    Configuration of a mission, e.g. its instruments, and the parameters used
+    for its ephemeris, visibility and TLE calculations.
+
+    Configurations rarely change, so are only fetched once per process, and
+    are also cached on disk for `CONFIG_TTL` seconds (see `set_config_cache`).
+
+    Parameters
+    ----------
+    refresh : bool, optional
+        Fetch the configuration from the API, even if it is cached. Default is
+        False.
+
+    Attributes
+    ----------
+    mission : MissionSchema
+        Mission information.
+    instruments : List[InstrumentSchema]
+        Instruments on board the mission.
+    ephem : EphemConfigSchema
+        Ephemeris configuration.
+    visibility : VisibilityConfigSchema
+        Visibility configuration.
+    tle : TLEConfigSchema
+        TLE configuration.
+    """
+
+    # Type hints
+    mission: MissionSchema
+    instruments: List[InstrumentSchema]
+    ephem: EphemConfigSchema
+    visibility: VisibilityConfigSchema
+    tle: TLEConfigSchema
+
+    # API definitions
+    _mission = ""
+    _api_name = "Config"
+    _schema = ConfigSchema
+    _get_schema = ConfigGetSchema
+
+    def __init__(self, refresh: bool = False, **kwargs):
+        for k, a in kwargs.items():
+            setattr(self, k, a)
+        self._fetched = self.load(refresh)
+
+    def load(self, refresh: bool = False) -> bool:
+        """
+        Load the configuration, from the caches if possible.
+
+        Parameters
+        ----------
+        refresh : bool, optional
+            Fetch the configuration from the API, even if it is cached.
+            Default is False.
+
+        Returns
+        -------
+        bool
+            Was the configuration loaded?
+        """
+        key = self._mission.lower()
+        with _configs_lock:
+            lock = _load_locks.setdefault(key, threading.Lock())
+        with lock:
+            with _configs_lock:
+                config = None if refresh else _configs.get(key)
+            if config is None:
+                disk = _config_disk_cache()
+                cached = disk.get(key) if disk is not None and not refresh else None
+                if cached is not None:
+                    config = ConfigSchema.model_validate(cached)
+                elif self.get():
+                    config = self.schema
+                    if disk is not None:
+                        disk.set(key, config.model_dump(mode="json"))
+                else:
+                    return False
+                with _configs_lock:
+                    _configs[key] = config
+
+        # Share the validated configuration, so derived values such as
+        # instrument frequencies are only computed once per process
+        for k, v in config:
+            setattr(self, k, v)
+        return True
+
+    def instrument(self, shortname: str) -> Optional[InstrumentSchema]:
+        """
+        Look up an instrument by its short name.
+
+        Parameters
+        ----------
+        shortname : str
+            Short name of the instrument, e.g. "XRT". Case insensitive.
+
+        Returns
+        -------
+        Optional[InstrumentSchema]
+            The instrument, or None if the mission has no such instrument.
+        """
+        for instrument in self.instruments:
+            if instrument.shortname.lower() == shortname.lower():
+                return instrument
+        return None
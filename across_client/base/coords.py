@@ -1,5 +1,6 @@
 from typing import Optional, Union
 
+import numpy as np
 from astropy.coordinates import SkyCoord  # type: ignore
 from astropy.coordinates import Latitude, Longitude  # type: ignore
 from astropy.units import Quantity, deg  # type: ignore
@@ -48,3 +49,42 @@ class ACROSSSkyCoord:
         """Sets the ra and dec from a SkyCoord."""
         self.ra = coord.icrs.ra.deg
         self.dec = coord.icrs.dec.deg
+
+
+class ACROSSEntriesSkyCoord:
+    """
+    Mixin for API classes whose entries have `ra` and `dec`, e.g. plans,
+    observations, TOO requests and pointings, giving vectorized access to the
+    coordinates of all the entries at once.
+    """
+
+    entries: list
+
+    def _entries_radec(self) -> tuple:
+        """RA and Dec columns of the entries, with NaN for missing values."""
+        ra = np.array([entry.ra for entry in self.entries], dtype=float)
+        dec = np.array([entry.dec for entry in self.entries], dtype=float)
+        return ra, dec
+
+    @property
+    def entries_skycoord(self) -> Optional[SkyCoord]:
+        """Returns an array SkyCoord of the entries' coordinates.
+
+        Cached, and rebuilt only if the entries' coordinates have changed,
+        whether by replacing `entries`, adding, removing or replacing entries,
+        or changing an entry's `ra` or `dec` in place. Entries without
+        coordinates are NaN.
+        """
+        if not self.entries:
+            return None
+        ra, dec = self._entries_radec()
+        cached = self.__dict__.get("_entries_skycoord_cache")
+        if (
+            cached is not None
+            and np.array_equal(cached[0], ra, equal_nan=True)
+            and np.array_equal(cached[1], dec, equal_nan=True)
+        ):
+            return cached[2]
+        coord = SkyCoord(ra, dec, unit="deg")
+        self._entries_skycoord_cache = (ra, dec, coord)
+        return coord
@@ -0,0 +1,243 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Type, cast
+
+from ..across.jobs import JobFuture, submit_job
+from ..across.resolve import Resolve, resolve_many
+from . import resilience
+from .common import ACROSSBase
+from .schema import BaseSchema
+
+
+class ACROSSDeferred:
+    """
+    Mixin for GET only API classes, allowing the GET to be deferred.
+
+    When constructed with `deferred=True`, the class only records its
+    parameters. The GET is performed on first access of a result attribute
+    (e.g. `entries`), when `fetch()` is called, or for many queries at once
+    by `gather()`. Target names are also resolved at that point, rather than
+    on assignment, or when `ra` or `dec` is first accessed. Other attributes,
+    `parameters` and `repr()` never fetch anything.
+
+    Must come before `ACROSSBase` in the bases of a class, so that its
+    `parameters` and `__repr__` are used.
+
+    Methods
+    -------
+    fetch()
+        Perform the deferred GET, if it is still pending.
+    submit_job()
+        Perform the deferred GET as a server-side job.
+    """
+
+    _deferred: bool = False
+    _fetched: bool = False
+    _fetch_thread: Optional[int] = None
+
+    # Provided by ACROSSBase
+    _schema: Type[BaseSchema]
+    _get_schema: Type[BaseSchema]
+
+    def _defer(self, deferred: bool):
+        """Set up deferred mode. Called before any parameters are set."""
+        self._deferred = deferred
+        if deferred:
+            self._fetch_lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """Is a deferred GET still pending?"""
+        return self._deferred
+
+    def fetch(self) -> bool:
+        """
+        Perform the deferred GET, if it is still pending.
+
+        Returns
+        -------
+        bool
+            Was the GET successful?
+        """
+        if not self._deferred:
+            return self._fetched
+        with self._fetch_lock:
+            if self._deferred:
+                # Attributes read while fetching must not trigger a fetch
+                self._fetch_thread = threading.get_ident()
+                try:
+                    self._resolve_name()
+                    self._fetched = self.validate_get() and self.get()
+                finally:
+                    self._deferred = False
+                    self._fetch_thread = None
+        return self._fetched
+
+    def submit_job(self) -> JobFuture:
+        """
+        Submit the deferred GET as a server-side job, rather than waiting for
+        the result on an open connection. Useful for long computations.
+
+        Returns
+        -------
+        JobFuture
+            Handle for the job, resolving to this object once the result has
+            been loaded.
+        """
+        # Only mixed into ACROSSBase classes
+        obj = cast(ACROSSBase, self)
+        if not self._deferred:
+            future = submit_job(obj)
+        else:
+            with self._fetch_lock:
+                # Attributes read while submitting must not trigger a fetch
+                self._fetch_thread = threading.get_ident()
+                try:
+                    self._resolve_name()
+                    future = submit_job(obj)
+                    # The job now performs the GET
+                    self._deferred = False
+                finally:
+                    self._fetch_thread = None
+
+        def done(future: Future):
+            self._fetched = not future.cancelled() and future.exception() is None
+
+        future.add_done_callback(done)
+        return future
+
+    def _unresolved(self) -> bool:
+        """Is there a target name whose resolution was deferred? Checked
+        without triggering the resolution."""
+        return self.__dict__.get("ra") is None and "_name" in self.__dict__
+
+    def _resolve_name(self):
+        """Resolve the target name, if its resolution was deferred."""
+        if self._unresolved():
+            self._resolve(resolve_many([self._name])[self._name])
+
+    def _resolve(self, r: Optional[Resolve]):
+        """Set coordinates from a resolved target name."""
+        self.ra = r.ra if r is not None else None
+        self.dec = r.dec if r is not None else None
+
+    @property
+    def _result_fields(self) -> set:
+        """Fields of the results, other than the query parameters."""
+        return set(self._schema.model_fields) - set(self._get_schema.model_fields)
+
+    def _given(self) -> dict:
+        """Query parameters set so far, read without fetching or resolving
+        anything."""
+        given = {"name": self.__dict__.get("_name"), **vars(self)}
+        fields = dict.fromkeys(["name", *self._get_schema.model_fields])
+        return {k: given[k] for k in fields if given.get(k) is not None}
+
+    @property
+    def parameters(self) -> dict:
+        """
+        Return parameters as dict. Only the query parameters set so far, if
+        the GET is still pending.
+
+        Returns
+        -------
+        dict
+            Dictionary of parameters
+        """
+        if self.pending:
+            return self._given()
+        return vars(ACROSSBase)["parameters"].fget(self)
+
+    @parameters.setter
+    def parameters(self, params: dict):
+        vars(ACROSSBase)["parameters"].fset(self, params)
+
+    def __repr__(self) -> str:
+        if not self.pending:
+            return super().__repr__()
+        args = ",".join([f"{k}={v}" for k, v in self._given().items()])
+        return f"{self.__class__.__name__}({args},deferred=True)"
+
+    def __getattr__(self, name: str):
+        # Only called for attributes that are not set, e.g. the results of a
+        # pending GET, or the coordinates of a target name not resolved yet
+        if (
+            not name.startswith("_")
+            and self.__dict__.get("_deferred")
+            and self.__dict__.get("_fetch_thread") != threading.get_ident()
+        ):
+            if name in ("ra", "dec") and self._unresolved():
+                self._resolve_name()
+                return getattr(self, name)
+            if name in self._result_fields:
+                self.fetch()
+                return getattr(self, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+
+def _query_key(obj: ACROSSDeferred) -> str:
+    """Key identifying identical queries."""
+    params = obj._get_schema.model_validate(obj).model_dump(mode="json")
+    return json.dumps([type(obj).__name__, params], sort_keys=True)
+
+
+def gather(objs: Iterable[ACROSSDeferred], max_workers: int = 8) -> List[bool]:
+    """
+    Perform the pending GETs of many deferred API objects concurrently.
+
+    Target names are resolved in one batch, and identical queries are only
+    sent once, with their results shared between the objects.
+
+    Parameters
+    ----------
+    objs : Iterable[ACROSSDeferred]
+        API objects constructed with `deferred=True`.
+    max_workers : int, optional
+        Maximum number of concurrent API calls, by default 8.
+
+    Returns
+    -------
+    List[bool]
+        Whether the GET of each object was successful.
+    """
+    objs = list(objs)
+    pending = [obj for obj in objs if obj.pending]
+
+    # Resolve all the target names up front
+    named = [obj for obj in pending if obj._unresolved()]
+    if named:
+        resolved = resolve_many([obj._name for obj in named], max_workers)
+        for obj in named:
+            obj._resolve(resolved[obj._name])
+
+    # Group identical queries, so each is only fetched once
+    groups: dict = {}
+    for obj in pending:
+        try:
+            key = _query_key(obj)
+        except Exception:
+            # Parameters don't validate yet (e.g. unresolved name), fetch alone
+            key = str(id(obj))
+        groups.setdefault(key, []).append(obj)
+
+    leaders = [group[0] for group in groups.values()]
+    if leaders:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(leaders))) as e:
+            list(e.map(resilience.within_deadline(lambda obj: obj.fetch()), leaders))
+
+    for leader, *followers in groups.values():
+        for obj in followers:
+            with obj._fetch_lock:
+                if leader._fetched:
+                    for key in obj._schema.model_fields:
+                        if hasattr(leader, key):
+                            value = getattr(leader, key)
+                            setattr(
+                                obj, key, list(value) if type(value) is list else value
+                            )
+                obj._fetched = leader._fetched
+                obj._deferred = False
+    return [obj.fetch() for obj in objs]
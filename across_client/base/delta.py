@@ -0,0 +1,207 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple, Type
+
+from requests.exceptions import HTTPError
+
+from . import codec
+from .cache import DiskCache, LRUCache
+from .schema import BaseSchema
+
+# Last acknowledged entries uploaded for each mission, API and user. Set the
+# ACROSS_PLAN_STATE environment variable to the path of a database file to
+# persist them between processes.
+PLAN_STATES = LRUCache(
+    maxsize=64,
+    backing=(
+        DiskCache(os.environ["ACROSS_PLAN_STATE"])
+        if os.environ.get("ACROSS_PLAN_STATE")
+        else None
+    ),
+)
+
+# Request bodies smaller than this many bytes are sent uncompressed
+COMPRESS_MIN = 1024
+
+# Responses to a delta upload meaning the API does not support them
+NO_DELTA_STATUSES = [400, 404, 405, 415, 422, 501]
+
+# APIs found not to support delta uploads, by (mission, API name)
+_no_delta: set = set()
+_lock = threading.Lock()
+
+
+def entry_key(entry: dict) -> str:
+    """Identity of a plan entry, from its obsid and begin and end times."""
+    return f"{entry.get('obsid')}|{entry['begin']}|{entry['end']}"
+
+
+def entry_hash(entry: dict) -> str:
+    """Hash of the content of a plan entry."""
+    return hashlib.sha1(json.dumps(entry, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def encode_body(obj: Any, compress: bool = True) -> Tuple[bytes, dict]:
+    """Encode a request body as JSON, gzip compressed if `compress` is True
+    and it is at least `COMPRESS_MIN` bytes. Returns the body and its
+    headers."""
+    body = codec.CODEC.dumps(obj)
+    headers = {"Content-Type": "application/json"}
+    if compress and len(body) >= COMPRESS_MIN:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class ACROSSDeltaPut:
+    """
+    Mixin for plan API classes, uploading only the entries that changed since
+    the last upload.
+
+    Requires the `ACROSSBulkPut` mixin.
+
+    Methods
+    -------
+    delta_put()
+        Upload the entries that changed since the last upload.
+    """
+
+    # Provided by ACROSSBase and ACROSSBulkPut
+    entries: list
+    _mission: str
+    _api_name: str
+    _put_schema: Type[BaseSchema]
+    _bulk_payload: Callable[[], tuple]
+    _put_chunk: Callable[[dict, bytes, dict], None]
+
+    def _state_key(self) -> str:
+        return f"{self._mission}/{self._api_name}/{getattr(self, 'username', None)}"
+
+    def delta_put(self, compress: bool = True) -> dict:
+        """
+        Upload only the entries inserted, modified or deleted since the last
+        acknowledged upload.
+
+        Entries are fingerprinted by their obsid, begin and end times, plus a
+        hash of their content. Entries of the last upload that fall within
+        the time range of these entries, but are no longer present, are
+        deleted. Entries outside that range are left alone.
+
+        Changes are sent as a single PUT with `delta=True`, with a JSON body of
+        the `upsert`ed entries and the obsid, begin and end of each `delete`d
+        one. If the API does not support delta uploads, the entries within
+        the time range spanned by the changes are PUT in full instead, if the
+        PUT schema takes a `begin` and `end`, or else all the entries are.
+
+        Uploads with no previous state recorded for their mission, API and
+        user are a full PUT.
+
+        Parameters
+        ----------
+        compress : bool, optional
+            gzip compress request bodies of at least `COMPRESS_MIN` bytes, by
+            default True.
+
+        Returns
+        -------
+        dict
+            Summary of the upload: the `mode` ("full", "delta", "range" or
+            "none" if nothing changed), and the number of entries
+            `inserted`, `modified` and `deleted`.
+
+        Raises
+        ------
+        HTTPError
+            If the upload fails.
+        """
+        params, entries = self._bulk_payload()
+        summary: Dict[str, Any] = {
+            "mode": "none",
+            "inserted": 0,
+            "modified": 0,
+            "deleted": 0,
+        }
+        if not entries:
+            return summary
+        begin = min(entry["begin"] for entry in entries)
+        end = max(entry["end"] for entry in entries)
+        new = {entry_key(entry): (entry_hash(entry), entry) for entry in entries}
+
+        state_key = self._state_key()
+        old = PLAN_STATES.get(state_key)
+        if old is None:
+            self._put_entries(params, entries, compress)
+            summary.update(mode="full", inserted=len(entries))
+        else:
+            upserts = [e for k, (h, e) in new.items() if k not in old or old[k][0] != h]
+            deleted = [
+                {"obsid": obsid, "begin": b, "end": e}
+                for k, (_, b, e, obsid) in old.items()
+                if b < end and e > begin and k not in new
+            ]
+            summary["inserted"] = sum(entry_key(e) not in old for e in upserts)
+            summary["modified"] = len(upserts) - summary["inserted"]
+            summary["deleted"] = len(deleted)
+            if not upserts and not deleted:
+                return summary
+            summary["mode"] = self._put_changes(
+                params, entries, upserts, deleted, compress
+            )
+
+        # Record the acknowledged state, replacing the uploaded time range
+        state = {
+            k: v for k, v in (old or {}).items() if not (v[1] < end and v[2] > begin)
+        }
+        for k, (h, entry) in new.items():
+            state[k] = (h, entry["begin"], entry["end"], entry.get("obsid"))
+        PLAN_STATES.set(state_key, state)
+        return summary
+
+    def _put_changes(
+        self,
+        params: dict,
+        entries: list,
+        upserts: list,
+        deleted: list,
+        compress: bool = True,
+    ) -> str:
+        """Upload changes, as a delta if supported, or else by PUTting the
+        sub-range of entries they span, or all of them. Returns the mode
+        used."""
+        api = (self._mission, self._api_name)
+        if api not in _no_delta:
+            body, headers = encode_body(
+                {"upsert": upserts, "delete": deleted}, compress
+            )
+            try:
+                self._put_chunk({**params, "delta": True}, body, headers)
+                return "delta"
+            except HTTPError as e:
+                if (
+                    e.response is None
+                    or e.response.status_code not in NO_DELTA_STATUSES
+                ):
+                    raise
+                with _lock:
+                    _no_delta.add(api)
+
+        if not {"begin", "end"} <= set(self._put_schema.model_fields):
+            # A time range can't be given, so replace all the entries
+            self._put_entries(params, entries, compress)
+            return "full"
+        changed = upserts + deleted
+        lo = min(entry["begin"] for entry in changed)
+        hi = max(entry["end"] for entry in changed)
+        self._put_entries(
+            {**params, "begin": lo, "end": hi},
+            [entry for entry in entries if entry["begin"] <= hi and entry["end"] >= lo],
+            compress,
+        )
+        return "range"
+
+    def _put_entries(self, params: dict, entries: list, compress: bool = True):
+        """PUT a list of encoded entries in full."""
+        self._put_chunk(params, *encode_body({"entries": entries}, compress))
@@ -1,12 +1,18 @@
 from datetime import datetime
+from typing import Optional
+
+import numpy as np
 
 from ..across.resolve import ACROSSResolveName
+from ..base import hooks
 from ..base.common import ACROSSBase
+from ..base.deferred import ACROSSDeferred
 from ..base.daterange import ACROSSDateRange
+from ..base.ephemstore import EphemStore, ephem_store
 from ..base.schema import EphemGetSchema, EphemSchema
 
 
-class EphemBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
+class EphemBase(ACROSSDeferred, ACROSSBase, ACROSSResolveName, ACROSSDateRange):
     """
     SwiftEphem class for handling Swift ephemeris data.
 
@@ -18,6 +24,10 @@ class EphemBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
         End date and time.
     stepsize : int
         Step size in seconds.
+    deferred : bool, optional
+        Only record the parameters, deferring the GET until the results are
+        first accessed, `fetch()` is called or the query is passed to
+        `gather()`. Default is False.
 
     Attributes:
     ----------
@@ -31,6 +41,8 @@ class EphemBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
         Get schema name.
     status : JobInfo
         Job information.
+    arrays : dict
+        The ephemeris fields as NumPy arrays.
 
     Methods:
     -------
@@ -53,9 +65,109 @@ class EphemBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
     _schema = EphemSchema
     _get_schema = EphemGetSchema
 
-    def __init__(self, **kwargs):
+    def __init__(self, deferred: bool = False, **kwargs):
+        self._defer(deferred)
         for k, a in kwargs.items():
             setattr(self, k, a)
-        # As this is a GET only class, we can validate and get the data
-        if self.validate_get:
-            self.get()
+        # As this is a GET only class, we can validate and get the data,
+        # unless the GET is deferred until the results are needed
+        if not deferred:
+            self._fetched = self.validate_get() and self.get()
+
+    def get(self) -> bool:
+        """
+        Perform a 'GET' submission to ACROSS API, or read the ephemeris from
+        the shared ephemeris store if it is enabled (see
+        `across_client.base.ephemstore`).
+
+        Returns
+        -------
+        bool
+            Was the get successful?
+
+        Raises
+        ------
+        HTTPError
+            Raised if GET doesn't return a 200 response.
+        """
+        # Arrays read from the store by an earlier GET
+        self.__dict__.pop("_arrays", None)
+        store = ephem_store()
+        if store is not None:
+            params = self._get_schema.model_validate(self)
+            if store.supports(params.stepsize, params.begin, params.end):
+                return self._get_stored(
+                    store, params.stepsize, params.begin, params.end
+                )
+        return super().get()
+
+    @hooks.traced("GET")
+    def _get_stored(
+        self, store: EphemStore, stepsize: int, begin: datetime, end: datetime
+    ) -> bool:
+        """Read the ephemeris from the store, first fetching and storing any
+        days not stored yet. Fields are converted from the stored arrays to
+        the same types as an API response when first accessed."""
+        record = hooks.current()
+        if record is not None:
+            missing = store.missing(self._mission, stepsize, begin, end)
+            record.cache = "miss" if missing else "hit"
+
+        def fetch(day_begin: datetime, day_end: datetime) -> Optional[dict]:
+            # Fetch whole days from the API, so every tile is complete
+            days = type(self)(
+                begin=day_begin, end=day_end, stepsize=stepsize, deferred=True
+            )
+            if not ACROSSBase.get(days):
+                return None
+            return {field: getattr(days, field) for field in self._schema.model_fields}
+
+        if not store.fill(self._mission, stepsize, begin, end, fetch):
+            return False
+        data = store.read(self._mission, stepsize, begin, end)
+        if data is None:
+            # The API didn't return every step of the missing days
+            return super().get()
+        self.stepsize = data.pop("stepsize")
+        for k in data:
+            self.__dict__.pop(k, None)
+        self._arrays = data
+        return True
+
+    @property
+    def arrays(self) -> dict:
+        """The ephemeris fields as NumPy arrays, with `timestamp` as
+        `datetime64[us]`, and None for missing optional fields. For an
+        ephemeris read from the store, fields not yet accessed as lists are
+        read-only zero-copy views of the stored files."""
+        stored = self.__dict__.get("_arrays") or {}
+        arrays = {}
+        for field in self._schema.model_fields:
+            if field == "stepsize":
+                continue
+            if field in stored and field not in self.__dict__:
+                arrays[field] = stored[field]
+                continue
+            value = getattr(self, field)
+            if value is None:
+                arrays[field] = None
+            elif field == "timestamp":
+                arrays[field] = np.array(value, dtype="datetime64[us]")
+            else:
+                arrays[field] = np.array(value, dtype=float)
+        return arrays
+
+    def __getattr__(self, name: str):
+        # Only called for attributes that are not set. Fields read from the
+        # store are converted to lists, of datetimes for `timestamp`, as
+        # returned by the API
+        arrays = self.__dict__.get("_arrays")
+        if arrays is not None and name in arrays:
+            value = arrays[name]
+            if value is not None:
+                if name == "timestamp":
+                    value = value.astype("datetime64[us]")
+                value = value.tolist()
+            setattr(self, name, value)
+            return value
+        return super().__getattr__(name)
@@ -0,0 +1,374 @@
+"""
+Shared on-disk store of ephemerides, memory-mapped by every process.
+
+Ephemerides are stored as one NumPy `.npy` file per field, mission, stepsize
+and year, laid out on a fixed time grid, and filled in one day tile at a
+time as days are first requested. Once a day has been written it never
+changes, so every process on a host can memory-map the files read-only and
+share the same physical pages. `Ephem` queries served from the store skip
+the API request and JSON parsing entirely. Their fields are converted to
+the same types as an API response when first accessed, and their `arrays`
+are zero-copy NumPy views of the files (unless the query spans more than one
+year).
+
+Processes fetching missing days take an exclusive `flock`, so each day is
+only fetched from the API once however many processes want it at the same
+time. Writers also take an exclusive lock on the year's files, and readers a
+shared one while checking which days are present. File locking needs the POSIX `fcntl`
+module, so the store is not available on Windows.
+
+Enable the store by setting the ACROSS_EPHEM_STORE environment variable to
+a directory, or with `set_ephem_store`::
+
+    from across_client.base.ephemstore import set_ephem_store
+
+    set_ephem_store("/var/cache/across/ephem")
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .windows import EPOCH, epoch_us
+
+try:
+    import fcntl
+
+    HAVE_FCNTL = True
+except ImportError:
+    HAVE_FCNTL = False
+
+# Fields of `EphemSchema` stored, with the shape of each row's value
+FIELDS = {
+    "posvec": (3,),
+    "earthsize": (),
+    "polevec": (3,),
+    "velvec": (3,),
+    "sun": (3,),
+    "moon": (3,),
+    "latitude": (),
+    "longitude": (),
+}
+
+# Fields that may be missing (None) from an ephemeris
+OPTIONAL_FIELDS = ["polevec", "velvec"]
+
+# Timestamp of rows not yet written
+UNSET = np.datetime64(0, "us")
+
+DAY = timedelta(days=1)
+
+
+class EphemStore:
+    """
+    Directory of memory-mapped ephemeris files, shared between processes.
+
+    Parameters
+    ----------
+    path : str
+        Directory to store the ephemerides in. Created if it doesn't exist.
+
+    Methods
+    -------
+    supports(stepsize, begin, end)
+        Can a query be served from the store?
+    read(mission, stepsize, begin, end)
+        Read the ephemeris for a time range, if it is all stored.
+    missing(mission, stepsize, begin, end)
+        Time ranges of the days that are not stored yet.
+    fill(mission, stepsize, begin, end, fetch)
+        Fetch and store the days of a time range that are not stored yet.
+    write(mission, stepsize, data)
+        Store the days covered by a fetched ephemeris.
+    """
+
+    def __init__(self, path: str):
+        if not HAVE_FCNTL:
+            raise OSError("The ephemeris store needs fcntl file locking.")
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Read-only memory maps of each year, by (mission, stepsize, year)
+        self._maps: dict = {}
+        self._lock = threading.Lock()
+
+    def supports(self, stepsize: int, begin: datetime, end: datetime) -> bool:
+        """
+        Can a query be served from the store? Only stepsizes that divide a
+        day evenly, and times on that step's grid, are supported.
+        """
+        return (
+            stepsize > 0
+            and 86400 % stepsize == 0
+            and all(
+                (t - datetime(t.year, t.month, t.day)).total_seconds() % stepsize == 0
+                for t in (begin, end)
+            )
+            and begin <= end
+        )
+
+    def read(
+        self, mission: str, stepsize: int, begin: datetime, end: datetime
+    ) -> Optional[dict]:
+        """
+        Read the ephemeris for a time range, from `begin` to `end` inclusive.
+
+        Returns
+        -------
+        Optional[dict]
+            Values of the `EphemSchema` fields as NumPy arrays, or None if
+            any of the range is not stored.
+        """
+        parts = []
+        for year, lo, hi in self._spans(stepsize, begin, end):
+            maps = self._open(mission, stepsize, year)
+            if maps is None:
+                return None
+            with self._locked(mission, stepsize, year, fcntl.LOCK_SH):
+                if np.any(maps["timestamp"][lo:hi] == UNSET):
+                    return None
+            parts.append({field: array[lo:hi] for field, array in maps.items()})
+
+        if len(parts) == 1:
+            data = parts[0]
+        else:
+            data = {
+                field: np.concatenate([part[field] for part in parts])
+                for field in parts[0]
+            }
+        for field in OPTIONAL_FIELDS:
+            if len(data[field]) and np.isnan(data[field][0, 0]):
+                data[field] = None
+        data["stepsize"] = stepsize
+        return data
+
+    def missing(
+        self, mission: str, stepsize: int, begin: datetime, end: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Time ranges covering the days of a query that are not stored yet,
+        with consecutive missing days merged into one range.
+
+        Returns
+        -------
+        List[Tuple[datetime, datetime]]
+            Begin and end (inclusive) of each range of missing days.
+        """
+        step = timedelta(seconds=stepsize)
+        rows = 86400 // stepsize
+        ranges: list = []
+        day = datetime(begin.year, begin.month, begin.day)
+        while day <= end:
+            year = day.year
+            maps = self._open(mission, stepsize, year)
+            lo = (day - datetime(year, 1, 1)).days * rows
+            if maps is None or np.any(maps["timestamp"][lo : lo + rows] == UNSET):
+                if ranges and ranges[-1][1] == day - step:
+                    ranges[-1] = (ranges[-1][0], day + DAY - step)
+                else:
+                    ranges.append((day, day + DAY - step))
+            day += DAY
+        return ranges
+
+    def fill(
+        self,
+        mission: str,
+        stepsize: int,
+        begin: datetime,
+        end: datetime,
+        fetch: Callable[[datetime, datetime], Optional[dict]],
+    ) -> bool:
+        """
+        Fetch and store the days of a time range that are not stored yet.
+
+        Only one process fetches for a mission and stepsize at a time. Others
+        wait for it, and then only fetch the days it didn't store.
+
+        Parameters
+        ----------
+        mission : str
+            Mission of the ephemeris.
+        stepsize : int
+            Step size of the ephemeris in seconds.
+        begin : datetime
+            Start of the time range.
+        end : datetime
+            End of the time range (inclusive).
+        fetch : Callable[[datetime, datetime], Optional[dict]]
+            Fetches the ephemeris from a begin to an end time (inclusive),
+            returning the values of the `EphemSchema` fields, or None if the
+            fetch failed.
+
+        Returns
+        -------
+        bool
+            Were all the missing days fetched?
+        """
+        if not self.missing(mission, stepsize, begin, end):
+            return True
+        lock = self.path / mission.lower() / f"{stepsize}s" / ".fetch.lock"
+        with self._flock(lock, fcntl.LOCK_EX):
+            for day_begin, day_end in self.missing(mission, stepsize, begin, end):
+                data = fetch(day_begin, day_end)
+                if data is None:
+                    return False
+                self.write(mission, stepsize, data)
+        return True
+
+    def write(self, mission: str, stepsize: int, data: dict):
+        """
+        Store the rows of a fetched ephemeris. Rows not on the store's time
+        grid are ignored, and rows already stored are left alone.
+
+        Parameters
+        ----------
+        mission : str
+            Mission of the ephemeris.
+        stepsize : int
+            Step size of the ephemeris in seconds.
+        data : dict
+            Values of the `EphemSchema` fields.
+        """
+        timestamps = epoch_us(list(data["timestamp"]))
+        step_us = stepsize * 1_000_000
+        years = timestamps.view("datetime64[us]").astype("datetime64[Y]")
+        for year in np.unique(years):
+            in_year = years == year
+            year = int(str(year))
+            start_us = (datetime(year, 1, 1) - EPOCH) // timedelta(microseconds=1)
+            offsets = timestamps[in_year] - start_us
+            on_grid = offsets % step_us == 0
+            index = offsets[on_grid] // step_us
+            rows = np.flatnonzero(in_year)[on_grid]
+
+            self._create(mission, stepsize, year)
+            with self._locked(mission, stepsize, year, fcntl.LOCK_EX):
+                directory = self._directory(mission, stepsize, year)
+                stamps = np.load(directory / "timestamp.npy", mmap_mode="r+")
+                new = stamps[index] == UNSET
+                index, rows = index[new], rows[new]
+                if len(index) == 0:
+                    continue
+                # Write the values first, and the timestamps marking the rows
+                # as present last
+                for field in FIELDS:
+                    if data.get(field) is None:
+                        continue
+                    array = np.load(directory / f"{field}.npy", mmap_mode="r+")
+                    array[index] = np.asarray(data[field], dtype=np.float64)[rows]
+                    array.flush()
+                stamps[index] = timestamps[rows].view("datetime64[us]")
+                stamps.flush()
+
+    def _directory(self, mission: str, stepsize: int, year: int) -> Path:
+        return self.path / mission.lower() / f"{stepsize}s" / str(year)
+
+    def _spans(self, stepsize: int, begin: datetime, end: datetime) -> Iterator:
+        """Rows of each year's files covering a time range, as (year, first
+        row, last row + 1)."""
+        for year in range(begin.year, end.year + 1):
+            start = datetime(year, 1, 1)
+            lo = max(begin, start) - start
+            hi = min(end, datetime(year + 1, 1, 1) - timedelta(seconds=stepsize))
+            yield (
+                year,
+                int(lo.total_seconds()) // stepsize,
+                int((hi - start).total_seconds()) // stepsize + 1,
+            )
+
+    @contextmanager
+    def _flock(self, path: Path, operation: int):
+        """Hold a lock on a lock file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _locked(self, mission: str, stepsize: int, year: int, operation: int):
+        """Hold a lock on a year's files."""
+        return self._flock(
+            self._directory(mission, stepsize, year) / ".lock", operation
+        )
+
+    def _create(self, mission: str, stepsize: int, year: int):
+        """Create a year's empty files, if they don't exist yet."""
+        directory = self._directory(mission, stepsize, year)
+        if (directory / "timestamp.npy").exists():
+            return
+        rows = (datetime(year + 1, 1, 1) - datetime(year, 1, 1)).days * (
+            86400 // stepsize
+        )
+        with self._locked(mission, stepsize, year, fcntl.LOCK_EX):
+            if (directory / "timestamp.npy").exists():
+                return
+            # The timestamp file is created last, marking the year as ready
+            for field, shape in FIELDS.items():
+                tmp = directory / f".{field}.npy.{os.getpid()}"
+                array = np.lib.format.open_memmap(
+                    tmp, mode="w+", dtype=np.float64, shape=(rows, *shape)
+                )
+                array[:] = np.nan
+                array.flush()
+                del array
+                os.replace(tmp, directory / f"{field}.npy")
+            tmp = directory / f".timestamp.npy.{os.getpid()}"
+            stamps = np.lib.format.open_memmap(
+                tmp, mode="w+", dtype="datetime64[us]", shape=(rows,)
+            )
+            stamps.flush()
+            del stamps
+            os.replace(tmp, directory / "timestamp.npy")
+
+    def _open(self, mission: str, stepsize: int, year: int) -> Optional[dict]:
+        """Read-only memory maps of a year's files, or None if they don't
+        exist yet."""
+        key = (mission.lower(), stepsize, year)
+        with self._lock:
+            if key not in self._maps:
+                directory = self._directory(mission, stepsize, year)
+                if not (directory / "timestamp.npy").exists():
+                    return None
+                self._maps[key] = {
+                    field: np.load(directory / f"{field}.npy", mmap_mode="r")
+                    for field in ["timestamp", *FIELDS]
+                }
+            return self._maps[key]
+
+
+# Store in use, if any, opened on first use
+_store: Optional[EphemStore] = None
+_store_path: Optional[str] = os.environ.get("ACROSS_EPHEM_STORE") or None
+
+
+def set_ephem_store(path: Optional[str] = None):
+    """
+    Change the directory of the shared ephemeris store.
+
+    Parameters
+    ----------
+    path : Optional[str], optional
+        Directory to store ephemerides in, by default None (no store).
+    """
+    global _store, _store_path
+    _store = None
+    _store_path = path
+
+
+def ephem_store() -> Optional[EphemStore]:
+    """The ephemeris store, if enabled and usable."""
+    global _store, _store_path
+    if _store is None and _store_path:
+        try:
+            _store = EphemStore(_store_path)
+        except OSError:
+            # e.g. no file locking, or a read-only directory, so carry on
+            # without it
+            _store_path = None
+    return _store
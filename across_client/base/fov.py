@@ -3,11 +3,19 @@ from typing import Any
 
 from ..across.resolve import ACROSSResolveName
 from ..base.common import ACROSSBase
-from ..base.coords import ACROSSSkyCoord
+from ..base.coords import ACROSSEntriesSkyCoord, ACROSSSkyCoord
 from ..base.daterange import ACROSSDateRange
+from ..base.deferred import ACROSSDeferred
 
 
-class FOVCheckBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoord):
+class FOVCheckBase(
+    ACROSSDeferred,
+    ACROSSBase,
+    ACROSSResolveName,
+    ACROSSDateRange,
+    ACROSSSkyCoord,
+    ACROSSEntriesSkyCoord,
+):
     """
     Class representing a  FOV Check.
 
@@ -21,6 +29,10 @@ class FOVCheckBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoor
         Start date and time of the observation.
     end : datetime
         End date and time of the observation.
+    deferred : bool, optional
+        Only record the parameters, deferring the GET until the results are
+        first accessed, `fetch()` is called or the query is passed to
+        `gather()`. Default is False.
     """
 
     # Type hints
@@ -35,10 +47,12 @@ class FOVCheckBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoor
     _get_schema: Any
     _api_name = "FOVCheck"
 
-    def __init__(self, **kwargs):
-        self.entries = []
+    def __init__(self, deferred: bool = False, **kwargs):
+        self._defer(deferred)
         for k, a in kwargs.items():
             setattr(self, k, a)
-        # As this is a GET only class, we can validate and get the data
-        if self.validate_get():
-            self.get()
+        # As this is a GET only class, we can validate and get the data,
+        # unless the GET is deferred until the results are needed
+        if not deferred:
+            self.entries = []
+            self._fetched = self.validate_get() and self.get()
@@ -0,0 +1,211 @@
+"""
+Per-request instrumentation hooks for ACROSS API calls.
+
+Hooks are callables that are passed a `RequestRecord` after every
+`get`/`put`/`post`/`delete` call made by an ACROSS API class, e.g.::
+
+    from across_client.base.hooks import add_hook
+
+    @add_hook
+    def log_slow(record):
+        if record.duration > 1:
+            print(record)
+
+Hooks registered with `when="start"` are instead called as each request
+begins, before any of its fields other than the method, mission and endpoint
+are filled in.
+
+Records are only created while at least one hook is registered, so with no
+hooks registered requests are not timed or recorded at all.
+"""
+
+import hashlib
+import json
+import time
+import warnings
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Optional
+
+# Registered hooks, called when requests finish
+HOOKS: list = []
+
+# Registered hooks, called when requests start
+START_HOOKS: list = []
+
+# Record for the API call in progress in the current context
+_current: ContextVar = ContextVar("across_request_record", default=None)
+
+
+@dataclass
+class RequestRecord:
+    """
+    Structured record of a single ACROSS API request.
+
+    Attributes
+    ----------
+    method : str
+        HTTP method, e.g. "GET".
+    mission : str
+        Mission of the API class.
+    endpoint : str
+        API name, e.g. "Visibility".
+    url : Optional[str]
+        Full URL requested, including query parameters.
+    params_hash : Optional[str]
+        Short hash of the request parameters, for grouping identical queries.
+    bytes_sent : int
+        Size of the request body in bytes.
+    bytes_received : int
+        Size of the response body in bytes.
+    status : Optional[int]
+        HTTP status code of the response.
+    retries : int
+        Number of times the request was retried.
+    cache : Optional[str]
+        "hit" or "miss" if the request was served through a cache, "stale"
+        if a cached response past its time-to-live was served, or
+        "revalidated" if the API replied that the results of the last
+        identical request are unchanged.
+    coalesced : bool
+        Was the response shared from an identical request already in flight,
+        rather than requested?
+    hedged : bool
+        Was the request sent a second time, because it was slower than usual?
+    error : Optional[str]
+        Exception raised by the request, if any.
+    timings : dict
+        Time in seconds spent in each phase of the request: "validate",
+        "queue" (waiting for client-side rate limits), "connect" (until the
+        response headers arrived), "backoff" (waiting to retry), "transfer",
+        "decode" and "model_build". Responses decoded and validated in a
+        single pass have no "decode" phase, and large responses decoded
+        incrementally as they arrive are timed as "transfer".
+    started : float
+        Wall clock time the request started, as a UNIX timestamp.
+    duration : float
+        Total duration of the request in seconds.
+    """
+
+    method: str
+    mission: str
+    endpoint: str
+    url: Optional[str] = None
+    params_hash: Optional[str] = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    status: Optional[int] = None
+    retries: int = 0
+    cache: Optional[str] = None
+    coalesced: bool = False
+    hedged: bool = False
+    error: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.time)
+    duration: float = 0.0
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+    _lap: float = field(default=0.0, repr=False)
+
+    def lap(self, phase: str):
+        """Record the time since the last lap (or the start) against `phase`."""
+        now = time.perf_counter()
+        self.timings[phase] = (
+            self.timings.get(phase, 0.0) + now - (self._lap or self._start)
+        )
+        self._lap = now
+
+    def add(self, phase: str, seconds: float):
+        """Record `seconds` against `phase`, and time the next lap from now.
+        Time since the last lap not spent in `phase` isn't recorded."""
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+        self._lap = time.perf_counter()
+
+    def finish(self):
+        """Record the total duration of the request."""
+        self.duration = time.perf_counter() - self._start
+
+
+def add_hook(hook: Callable[[RequestRecord], Any], when: str = "finish") -> Callable:
+    """Register a hook to be called with the `RequestRecord` of each request.
+
+    Can be used as a decorator.
+
+    Parameters
+    ----------
+    hook : Callable[[RequestRecord], Any]
+        Function to call with the record.
+    when : str, optional
+        Call the hook when each request "finish"es (default) or "start"s.
+
+    Returns
+    -------
+    Callable
+        The hook.
+    """
+    hooks = START_HOOKS if when == "start" else HOOKS
+    if hook not in hooks:
+        hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Callable[[RequestRecord], Any]):
+    """Unregister a hook previously registered with `add_hook`."""
+    for hooks in [HOOKS, START_HOOKS]:
+        if hook in hooks:
+            hooks.remove(hook)
+
+
+def current() -> Optional[RequestRecord]:
+    """Record of the request in progress, or None if no hooks are registered."""
+    return _current.get()
+
+
+def params_hash(params: Optional[dict]) -> str:
+    """Short, stable hash of a set of request parameters."""
+    encoded = json.dumps(params or {}, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def emit(record: RequestRecord, hooks: Optional[list] = None):
+    """Pass a record to every registered hook, warning on hook errors."""
+    for hook in list(HOOKS if hooks is None else hooks):
+        try:
+            hook(record)
+        except Exception as e:
+            warnings.warn(f"Request hook {hook!r} failed: {e}")
+
+
+def traced(method: str) -> Callable:
+    """Decorator for ACROSSBase request methods, creating and emitting a
+    `RequestRecord` for each call while any hooks are registered.
+
+    Parameters
+    ----------
+    method : str
+        HTTP method of the decorated request method.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not HOOKS and not START_HOOKS:
+                return func(self, *args, **kwargs)
+            record = RequestRecord(
+                method=method, mission=self._mission, endpoint=self._api_name
+            )
+            emit(record, START_HOOKS)
+            token = _current.set(record)
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                record.error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                _current.reset(token)
+                record.finish()
+                emit(record)
+
+        return wrapper
+
+    return decorator
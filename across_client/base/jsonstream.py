@@ -0,0 +1,335 @@
+"""
+Incremental decoding of large JSON API responses.
+
+Large responses, such as year long ephemerides, are decoded as they are
+downloaded rather than after the whole body has arrived. The top level JSON
+object is split into its members, and array-valued members (`entries`,
+`posvec`, `timestamp`...) are decoded in batches of elements as the bytes
+arrive, so the raw body is never held in memory all at once.
+"""
+
+import re
+from typing import Any, Callable, Optional
+
+import requests
+import urllib3
+from pydantic import ValidationError
+
+from . import codec
+
+# Response encodings accepted: gzip and deflate, plus brotli and zstd if the
+# `brotli` and `zstandard` packages are installed
+ACCEPT_ENCODING = urllib3.util.request.ACCEPT_ENCODING
+
+# Responses larger than this many bytes, or of unknown size, are decoded
+# incrementally
+STREAM_THRESHOLD = 1 << 20
+
+# Size of the chunks read from a streamed response
+CHUNK_SIZE = 1 << 17
+
+# A complete JSON string
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+# An object member name and its colon, after any separating comma
+_KEY = re.compile(rb'[\s,]*("(?:[^"\\]|\\.)*")\s*:\s*')
+
+# Tokens that change the nesting depth, or start a string
+_TOKEN = re.compile(rb'[\[\]{}"]')
+
+# Longest run of trailing elements searched for a split point, and most
+# commas tried as split points
+_MAX_TAIL = 1 << 16
+_MAX_SPLITS = 64
+
+# Bytes to wait for before searching an array again, after failing to find a
+# split point
+_MIN_BATCH = 1 << 12
+
+
+def streamable(response: requests.Response) -> bool:
+    """Should a response be decoded incrementally?
+
+    Parameters
+    ----------
+    response : requests.Response
+        Response, with its body not yet read.
+
+    Returns
+    -------
+    bool
+        True if the response is larger than `STREAM_THRESHOLD`, or of unknown
+        size.
+    """
+    length = response.headers.get("Content-Length")
+    return length is None or int(length) > STREAM_THRESHOLD
+
+
+def _depth(data: bytes) -> int:
+    """Change in nesting depth over some JSON. Brackets inside strings are
+    counted too, so this is only a guess, to be checked by decoding."""
+    return data.count(b"[") + data.count(b"{") - data.count(b"]") - data.count(b"}")
+
+
+def _end(data: bytes, start: int = 0, depth: int = 0) -> tuple:
+    """
+    Find the bracket closing the array or object containing `start`.
+
+    Returns
+    -------
+    tuple
+        Index of the closing bracket, or None if it hasn't arrived yet, and
+        the index and nesting depth to resume the search from once more
+        data has arrived.
+    """
+    i = start
+    while True:
+        match = _TOKEN.search(data, i)
+        if match is None:
+            return None, len(data), depth
+        token = match.group()
+        if token == b'"':
+            string = _STRING.match(data, match.start())
+            if string is None:
+                return None, match.start(), depth
+            i = string.end()
+            continue
+        i = match.end()
+        if token in b"[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth < 0:
+                return match.start(), i, depth
+
+
+def _invalid_json(error: ValueError) -> bool:
+    """Was a decoding error caused by malformed JSON, rather than invalid
+    values?"""
+    if isinstance(error, ValidationError):
+        return any(e["type"] == "json_invalid" for e in error.errors())
+    return True
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for a JSON object, fed its bytes as they arrive.
+
+    Array-valued members are decoded in batches of complete elements, each
+    passed as a JSON array to `decode_array`, and the decoded batches joined.
+    Other members are decoded with the current codec once complete.
+
+    Parameters
+    ----------
+    decode_array : Callable[[str, bytes], list], optional
+        Decodes a batch of elements of the named array member, given as a
+        JSON array, returning a list. By default decoded with the current
+        codec.
+
+    Attributes
+    ----------
+    data : dict
+        The members decoded so far.
+    bytes_received : int
+        Number of bytes fed to the decoder.
+    """
+
+    def __init__(self, decode_array: Optional[Callable[[str, bytes], list]] = None):
+        self.decode_array = decode_array or (lambda key, data: codec.CODEC.loads(data))
+        self.data: dict = {}
+        self.bytes_received = 0
+        self._buf = bytearray()
+        self._state = "start"
+        # Name of the member being decoded, set once its name has been read
+        self._key: str = ""
+        # Does the array being decoded have to be decoded whole, as no safe
+        # split point between its elements could be found? If so, where and
+        # at what depth to resume searching for its end
+        self._whole = False
+        self._scan = (0, 0)
+        # Buffer length to wait for before searching the array again
+        self._wait = 0
+
+    def feed(self, chunk: bytes):
+        """Decode the next chunk of the JSON.
+
+        Raises
+        ------
+        ValueError
+            If the JSON is malformed.
+        """
+        self.bytes_received += len(chunk)
+        self._buf += chunk
+        while self._step():
+            pass
+
+    def close(self) -> dict:
+        """Finish decoding, returning the decoded object.
+
+        Raises
+        ------
+        ValueError
+            If the JSON is incomplete or malformed.
+        """
+        self._wait = 0
+        while self._step():
+            pass
+        if self._state != "done" or self._buf.strip():
+            raise ValueError("Incomplete or malformed JSON object.")
+        return self.data
+
+    def _step(self) -> bool:
+        """Decode as much of the buffer as possible in the current state.
+        Returns True if the state changed, and decoding should continue."""
+        buf = self._buf
+        if self._state == "start":
+            stripped = buf.lstrip()
+            if not stripped:
+                return False
+            if stripped[:1] != b"{":
+                raise ValueError("Expected a JSON object.")
+            del buf[: len(buf) - len(stripped) + 1]
+            self._state = "key"
+        elif self._state == "key":
+            stripped = buf.lstrip(b" \t\r\n,")
+            if stripped[:1] == b"}":
+                del buf[: len(buf) - len(stripped) + 1]
+                self._state = "done"
+                return True
+            match = _KEY.match(buf)
+            if match is None or match.end() == len(buf):
+                # Wait for the rest of the key, and the start of its value
+                if stripped and stripped[:1] != b'"':
+                    raise ValueError("Expected a JSON object member name.")
+                return False
+            self._key = codec.CODEC.loads(match.group(1))
+            del buf[: match.end()]
+            if buf[:1] == b"[":
+                del buf[:1]
+                self._state = "array"
+                self._whole = False
+                self.data[self._key] = []
+            else:
+                self._state = "value"
+        elif self._state == "value":
+            end = self._value_end(buf)
+            if end is None:
+                return False
+            self.data[self._key] = codec.CODEC.loads(bytes(buf[:end]))
+            del buf[:end]
+            self._state = "key"
+        elif self._state == "array":
+            return self._step_array()
+        else:
+            return False
+        return True
+
+    def _value_end(self, buf: bytes) -> Optional[int]:
+        """Index after the end of a non-array member value, if complete."""
+        first = buf[:1]
+        if first == b"{":
+            end = _end(buf, 1)[0]
+            return end + 1 if end is not None else None
+        if first == b'"':
+            match = _STRING.match(buf)
+            return match.end() if match is not None else None
+        # Number or literal, ended by the next delimiter
+        match = re.search(rb"[\s,}]", buf)
+        return match.start() if match is not None else None
+
+    def _step_array(self) -> bool:
+        buf = self._buf
+        if self._whole:
+            # Scan for the end of the array, from where the last scan stopped
+            end, scanned, depth = _end(buf, *self._scan)
+            self._scan = (scanned, depth)
+            return end is not None and self._end_array(end)
+
+        if len(buf) < self._wait:
+            return False
+        depth = _depth(buf)
+        if depth < 0:
+            # Check the array has ended, and not just some string with
+            # brackets in it
+            end = _end(buf)[0]
+            if end is not None:
+                return self._end_array(end)
+
+        # Split after the last complete element, before its trailing comma
+        split = len(buf)
+        for _ in range(_MAX_SPLITS):
+            split = buf.rfind(b",", 0, split)
+            if split < 0 or depth - _depth(buf[split:]) == 0:
+                break
+        else:
+            split = -1
+        if split < 0 or len(buf) - split > _MAX_TAIL:
+            if len(buf) > _MAX_TAIL:
+                # No split point in sight, so stop looking
+                self._whole = True
+                self._scan = (0, 0)
+                return True
+            # Brackets in strings may have hidden the end of the array
+            end = _end(buf)[0] if depth >= 0 else None
+            if end is not None:
+                return self._end_array(end)
+            self._wait = len(buf) + _MIN_BATCH
+            return False
+
+        try:
+            self._decode(buf[:split])
+        except ValueError as e:
+            if not _invalid_json(e):
+                raise
+            # The split must have been inside a string
+            self._whole = True
+            self._scan = (0, 0)
+            return True
+        del buf[: split + 1]
+        self._wait = 0
+        return True
+
+    def _end_array(self, end: int) -> bool:
+        """Decode the rest of the current array, which ends at `end`."""
+        self._decode(self._buf[:end])
+        del self._buf[: end + 1]
+        self._state = "key"
+        self._wait = 0
+        return True
+
+    def _decode(self, elements: bytes):
+        """Decode and record a batch of elements of the current array."""
+        if elements.strip():
+            self.data[self._key].extend(
+                self.decode_array(self._key, b"[" + elements + b"]")
+            )
+
+
+def decode(
+    response: requests.Response,
+    decode_array: Optional[Callable[[str, bytes], list]] = None,
+    tee: Optional[Callable[[bytes], Any]] = None,
+) -> "StreamDecoder":
+    """Incrementally decode a streamed JSON response.
+
+    Parameters
+    ----------
+    response : requests.Response
+        Response, requested with `stream=True` and its body not yet read.
+    decode_array : Optional[Callable[[str, bytes], list]], optional
+        Decodes batches of elements of array members, as for `StreamDecoder`.
+    tee : Optional[Callable[[bytes], Any]], optional
+        Called with each chunk of the body as it arrives, e.g. to keep a copy.
+
+    Returns
+    -------
+    StreamDecoder
+        The decoder, with the decoded object as its `data`.
+    """
+    decoder = StreamDecoder(decode_array)
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if tee is not None:
+            tee(chunk)
+        decoder.feed(chunk)
+    decoder.close()
+    return decoder
@@ -0,0 +1,388 @@
+"""
+Optional metrics registry for ACROSS API requests, with Prometheus text
+exposition.
+
+The registry is fed by request hooks (see `hooks.py`), so it costs nothing
+until enabled::
+
+    from across_client.base import metrics
+
+    registry = metrics.enable_metrics()
+    metrics.start_http_server(9464)  # Optional: serve /metrics for scraping
+    ...
+    print(registry.to_prometheus())
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from . import hooks
+from .hooks import RequestRecord
+
+# Default latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Base class for labelled metrics.
+
+    Parameters
+    ----------
+    name : str
+        Metric name.
+    documentation : str
+        Help text for the metric.
+    labelnames : tuple
+        Names of the labels of the metric.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict = {}
+        self._lock = threading.Lock()
+
+    def value(self, *labels):
+        """Current value for the given label values."""
+        return self.values.get(labels, 0)
+
+    def samples(self) -> list:
+        """Exposition lines for the metric samples."""
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {value}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+    def expose(self) -> str:
+        """Prometheus text exposition of the metric."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Histogram of observed values, with cumulative buckets.
+
+    Parameters
+    ----------
+    buckets : tuple, optional
+        Upper bounds of the buckets, by default `DEFAULT_BUCKETS`.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        with self._lock:
+            counts, total, count = self.values.get(
+                labels, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[labels] = (counts, total + value, count + 1)
+
+    def count(self, *labels) -> int:
+        """Number of observations for the given label values."""
+        return self.values.get(labels, (None, 0.0, 0))[2]
+
+    def value(self, *labels) -> float:
+        """Sum of the observations for the given label values."""
+        return self.values.get(labels, (None, 0.0, 0))[1]
+
+    def samples(self) -> list:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, bucket in zip(bounds, counts + [count]):
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {bucket}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registry of ACROSS API request metrics.
+
+    Attributes
+    ----------
+    requests : Counter
+        Requests by mission, endpoint and method.
+    errors : Counter
+        Failed requests by mission, endpoint and HTTP status code (or
+        "exception" if no response was received).
+    latency : Histogram
+        Request latency in seconds by mission, endpoint and method.
+    queued : Histogram
+        Time in seconds requests waited for client-side rate limits, by
+        mission and endpoint.
+    cache : Counter
+        Cache lookups by mission, endpoint and result ("hit", "miss", "stale"
+        or "revalidated").
+    coalesced : Counter
+        Requests answered by an identical request already in flight, by
+        mission and endpoint.
+    hedged : Counter
+        Slow requests sent a second time, by mission and endpoint.
+    in_flight : Gauge
+        Requests currently in progress by mission and endpoint.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.requests = Counter(
+            "across_requests_total",
+            "Total ACROSS API requests.",
+            ("mission", "endpoint", "method"),
+        )
+        self.errors = Counter(
+            "across_request_errors_total",
+            "Failed ACROSS API requests.",
+            ("mission", "endpoint", "status"),
+        )
+        self.latency = Histogram(
+            "across_request_duration_seconds",
+            "ACROSS API request latency.",
+            ("mission", "endpoint", "method"),
+            buckets,
+        )
+        self.queued = Histogram(
+            "across_request_queue_seconds",
+            "Time ACROSS API requests waited for client-side rate limits.",
+            ("mission", "endpoint"),
+            buckets,
+        )
+        self.cache = Counter(
+            "across_cache_requests_total",
+            "ACROSS API cache lookups.",
+            ("mission", "endpoint", "result"),
+        )
+        self.coalesced = Counter(
+            "across_coalesced_requests_total",
+            "ACROSS API requests shared from an identical request in flight.",
+            ("mission", "endpoint"),
+        )
+        self.hedged = Counter(
+            "across_hedged_requests_total",
+            "Slow ACROSS API requests sent a second time.",
+            ("mission", "endpoint"),
+        )
+        self.in_flight = Gauge(
+            "across_requests_in_flight",
+            "ACROSS API requests in progress.",
+            ("mission", "endpoint"),
+        )
+
+    @property
+    def metrics(self) -> list:
+        return [
+            self.requests,
+            self.errors,
+            self.latency,
+            self.queued,
+            self.cache,
+            self.coalesced,
+            self.hedged,
+            self.in_flight,
+        ]
+
+    def request_started(self, record: RequestRecord):
+        """Request hook, called as each request starts."""
+        self.in_flight.inc(record.mission, record.endpoint)
+
+    def request_finished(self, record: RequestRecord):
+        """Request hook, called as each request finishes."""
+        mission, endpoint = record.mission, record.endpoint
+        self.in_flight.dec(mission, endpoint)
+        self.requests.inc(mission, endpoint, record.method)
+        self.latency.observe(mission, endpoint, record.method, value=record.duration)
+        if "queue" in record.timings:
+            self.queued.observe(mission, endpoint, value=record.timings["queue"])
+        if record.error is not None and record.status is None:
+            self.errors.inc(mission, endpoint, "exception")
+        elif record.status is not None and record.status >= 400:
+            self.errors.inc(mission, endpoint, str(record.status))
+        if record.cache is not None:
+            self.cache.inc(mission, endpoint, record.cache)
+        if record.coalesced:
+            self.coalesced.inc(mission, endpoint)
+        if record.hedged:
+            self.hedged.inc(mission, endpoint)
+
+    def cache_hit_ratio(self, mission: str, endpoint: str) -> Optional[float]:
+        """Fraction of cache lookups answered without downloading the
+        response, or None if no lookups. Responses served stale, and
+        revalidated with a 304, count as hits."""
+        hits = sum(
+            self.cache.value(mission, endpoint, result)
+            for result in ("hit", "stale", "revalidated")
+        )
+        total = hits + self.cache.value(mission, endpoint, "miss")
+        return hits / total if total else None
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition of all metrics.
+
+        Returns
+        -------
+        str
+            Metrics in the Prometheus text format, including the derived
+            `across_cache_hit_ratio` gauge.
+        """
+        hit_ratio = Gauge(
+            "across_cache_hit_ratio",
+            "Fraction of ACROSS API cache lookups that were hits.",
+            ("mission", "endpoint"),
+        )
+        for mission, endpoint in {labels[:2] for labels in self.cache.values}:
+            ratio = self.cache_hit_ratio(mission, endpoint)
+            if ratio is not None:
+                hit_ratio.set(mission, endpoint, value=ratio)
+        exposed = [metric.expose() for metric in self.metrics + [hit_ratio]]
+        return "\n".join(exposed) + "\n"
+
+
+# Registry fed by the request hooks, if enabled
+REGISTRY: Optional[MetricsRegistry] = None
+
+
+def enable_metrics(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Start recording metrics for all ACROSS API requests.
+
+    Parameters
+    ----------
+    registry : Optional[MetricsRegistry], optional
+        Registry to record into, by default a new registry.
+
+    Returns
+    -------
+    MetricsRegistry
+        The registry being recorded into.
+    """
+    global REGISTRY
+    disable_metrics()
+    REGISTRY = registry or MetricsRegistry()
+    hooks.add_hook(REGISTRY.request_started, when="start")
+    hooks.add_hook(REGISTRY.request_finished)
+    return REGISTRY
+
+
+def disable_metrics():
+    """Stop recording metrics."""
+    global REGISTRY
+    if REGISTRY is not None:
+        hooks.remove_hook(REGISTRY.request_started)
+        hooks.remove_hook(REGISTRY.request_finished)
+    REGISTRY = None
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry in Prometheus text format on `/metrics`."""
+
+    registry: MetricsRegistry
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(
+    port: int = 9464,
+    addr: str = "127.0.0.1",
+    registry: Optional[MetricsRegistry] = None,
+) -> ThreadingHTTPServer:
+    """Serve metrics on `http://addr:port/metrics` from a daemon thread.
+
+    Parameters
+    ----------
+    port : int, optional
+        Port to listen on, by default 9464.
+    addr : str, optional
+        Address to listen on, by default "127.0.0.1".
+    registry : Optional[MetricsRegistry], optional
+        Registry to serve, by default the enabled registry (enabling metrics
+        if needed).
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running server. Call `shutdown()` to stop it.
+    """
+    if registry is None:
+        registry = REGISTRY or enable_metrics()
+    handler = type("Handler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -3,14 +3,23 @@ from datetime import datetime
 from across_client.base.schema import BaseSchema
 
 from ..across.resolve import ACROSSResolveName
+from ..base.bulk import ACROSSBulkPut
 from ..base.common import ACROSSBase
-from ..base.coords import ACROSSSkyCoord
+from ..base.delta import ACROSSDeltaPut
+from ..base.coords import ACROSSEntriesSkyCoord, ACROSSSkyCoord
 from ..base.daterange import ACROSSDateRange
 from ..base.user import ACROSSUser
 
 
 class PlanBase(
-    ACROSSBase, ACROSSUser, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoord
+    ACROSSBase,
+    ACROSSUser,
+    ACROSSResolveName,
+    ACROSSDateRange,
+    ACROSSSkyCoord,
+    ACROSSEntriesSkyCoord,
+    ACROSSBulkPut,
+    ACROSSDeltaPut,
 ):
     """
     SwiftPlan class represents a plan for the Swift mission.
@@ -0,0 +1,214 @@
+"""
+Client-side rate limiting of ACROSS API requests.
+
+Requests can be paced with token buckets, and the number in progress capped
+with semaphores, so large batch jobs pace themselves rather than being
+throttled by the service. Limits can be set for all requests, a mission, or
+a mission's endpoint, and a request waits for every limit that applies to
+it, so e.g. a global concurrency budget can be combined with a tighter rate
+limit for one endpoint::
+
+    from across_client.base.ratelimit import set_rate_limit
+
+    set_rate_limit(concurrency=16)
+    set_rate_limit(rate=5, burst=10, mission="Swift", endpoint="Visibility")
+
+Limits are shared by all threads, including those running queries for
+coroutines via `asyncio.to_thread` or an executor. Time spent waiting is
+timed as the "queue" phase of each `RequestRecord`. A request never waits
+past its deadline (see `across_client.base.resilience.deadline`): it raises
+`DeadlineExceeded` straight away if the limits won't be free in time.
+
+Set the ACROSS_RATE_LIMIT environment variable to a number of requests per
+second, and ACROSS_CONCURRENCY to a number of requests, to limit all
+requests.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from . import resilience
+
+
+class Limiter:
+    """
+    Token bucket and concurrency limit.
+
+    Parameters
+    ----------
+    rate : Optional[float], optional
+        Requests per second, by default no limit.
+    burst : Optional[int], optional
+        Requests that can be made at once after a pause, by default
+        `max(1, rate)`.
+    concurrency : Optional[int], optional
+        Maximum number of requests in progress at once, by default no limit.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate or 1)
+        self.concurrency = concurrency
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._semaphore = (
+            threading.BoundedSemaphore(concurrency) if concurrency else None
+        )
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait for a free concurrency slot, and then for a token.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Longest time to wait in seconds, by default no limit.
+
+        Raises
+        ------
+        DeadlineExceeded
+            If the limits can't be had within `timeout`, in which case
+            nothing is taken.
+        """
+        start = time.monotonic()
+        if self._semaphore is not None:
+            if not self._semaphore.acquire(
+                timeout=max(0.0, timeout) if timeout is not None else None
+            ):
+                raise resilience.DeadlineExceeded(
+                    "Deadline passed waiting for a free request slot."
+                )
+        if self.rate:
+            budget = None
+            if timeout is not None:
+                budget = timeout - (time.monotonic() - start)
+            wait = self._reserve(self.rate, budget)
+            if wait is None:
+                self.release()
+                raise resilience.DeadlineExceeded(
+                    "Deadline passed waiting for the rate limit."
+                )
+            time.sleep(wait)
+
+    def release(self):
+        """Free the concurrency slot taken by `acquire`."""
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def _reserve(self, rate: float, budget: Optional[float] = None) -> Optional[float]:
+        """Take a token, returning how long to wait until it is available, or
+        None without taking it if that is longer than `budget` seconds.
+        Tokens can be taken ahead of time, so waiting requests are let
+        through in turn."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / rate)
+            if budget is not None and wait > budget:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+# Limiters, by (mission, endpoint), with None matching any
+_limiters: dict = {}
+_lock = threading.Lock()
+
+
+def set_rate_limit(
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    mission: Optional[str] = None,
+    endpoint: Optional[str] = None,
+) -> Optional[Limiter]:
+    """
+    Limit the rate of requests, and the number in progress, for all
+    requests, a mission or an endpoint of a mission. Replaces any limits
+    previously set for the same requests.
+
+    Parameters
+    ----------
+    rate : Optional[float], optional
+        Requests per second, by default no limit.
+    burst : Optional[int], optional
+        Requests that can be made at once after a pause, by default
+        `max(1, rate)`.
+    concurrency : Optional[int], optional
+        Maximum number of requests in progress at once, by default no limit.
+    mission : Optional[str], optional
+        Mission the limits apply to, e.g. "Swift", by default all.
+    endpoint : Optional[str], optional
+        API name the limits apply to, e.g. "Visibility", by default all.
+
+    Returns
+    -------
+    Optional[Limiter]
+        The limiter, or None if no limits were given, removing them.
+    """
+    key = (
+        mission.lower() if mission is not None else None,
+        endpoint.lower() if endpoint is not None else None,
+    )
+    limiter = None
+    if rate or concurrency:
+        limiter = Limiter(rate, burst, concurrency)
+    with _lock:
+        _limiters.pop(key, None)
+        if limiter is not None:
+            _limiters[key] = limiter
+    return limiter
+
+
+def limiters(mission: str, endpoint: str) -> List[Limiter]:
+    """The limiters applying to an endpoint, from the broadest to the most
+    specific."""
+    mission, endpoint = mission.lower(), endpoint.lower()
+    keys = [(None, None), (mission, None), (None, endpoint), (mission, endpoint)]
+    return [_limiters[key] for key in keys if key in _limiters]
+
+
+@contextmanager
+def limit(mission: str, endpoint: str) -> Iterator[float]:
+    """
+    Wait for the limits applying to an endpoint, holding them while a request
+    is made. Waits no longer than the remaining time before the current
+    deadline (see `resilience.deadline`).
+
+    Yields
+    ------
+    float
+        Time spent waiting in seconds.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the deadline would pass before the limits are free.
+    """
+    start = time.perf_counter()
+    held: List[Limiter] = []
+    try:
+        for limiter in limiters(mission, endpoint):
+            limiter.acquire(resilience.remaining())
+            held.append(limiter)
+        yield time.perf_counter() - start
+    finally:
+        for limiter in reversed(held):
+            limiter.release()
+
+
+if os.environ.get("ACROSS_RATE_LIMIT") or os.environ.get("ACROSS_CONCURRENCY"):
+    set_rate_limit(
+        rate=float(os.environ.get("ACROSS_RATE_LIMIT") or 0) or None,
+        concurrency=int(os.environ.get("ACROSS_CONCURRENCY") or 0) or None,
+    )
@@ -0,0 +1,405 @@
+"""
+Retries and circuit breakers for ACROSS API requests.
+
+Requests that fail with a connection error, a timeout, or a transient error
+status (429, 502, 503 or 504 by default) are retried with exponential
+backoff and full jitter, waiting at least as long as any `Retry-After`
+header asks. Only requests that are safe to repeat are retried: GETs and
+PUTs, and POSTs that carry an `Idempotency-Key` header.
+
+Each mission and endpoint also has a circuit breaker. After
+`failure_threshold` consecutive failures (connection errors, timeouts and
+5xx responses) the circuit opens, and requests fail straight away with
+`CircuitOpenError` rather than adding to the load on an unhealthy service.
+After `reset_timeout` seconds a single trial request is let through, closing
+the circuit again if it succeeds.
+
+Policies can be set for all requests, a mission, or a mission's endpoint::
+
+    from across_client.base.resilience import set_retry_policy
+
+    set_retry_policy(retries=5, backoff=1.0)
+    set_retry_policy(retries=0, mission="Swift", endpoint="TOO")
+
+Set the ACROSS_RETRIES environment variable to change the default number of
+retries, or to 0 to disable them.
+
+Each attempt times out after `timeout` seconds (ACROSS_TIMEOUT, by default
+60). A call, or a batch of calls, can also be given a total time budget with
+`deadline`, which shortens the timeouts of its attempts, stops retries that
+would overrun it, and raises `DeadlineExceeded` once it has passed::
+
+    from across_client.base.resilience import deadline
+
+    with deadline(5):
+        plan = SwiftPlan(ra=ra, dec=dec, begin=begin, end=end)
+
+GETs can also be hedged, by setting `hedge=True` (or ACROSS_HEDGE=1). A GET
+still waiting for its response after the endpoint's 95th percentile latency
+is sent again, and whichever response arrives first is used, cutting the
+tail latency caused by a slow server at the cost of a few extra requests.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+import requests
+
+# Statuses of responses counted as failures by circuit breakers
+FAILURE_STATUS = 500
+
+# Number of recent latencies kept for each endpoint, and needed before GETs
+# are hedged
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+# `time.monotonic()` the current deadline passes, if any
+_deadline: ContextVar = ContextVar("across_deadline", default=None)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of making a request while its endpoint's circuit
+    breaker is open."""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when a request can't be completed before its deadline."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How requests are retried, and when their circuit breaker opens.
+
+    Attributes
+    ----------
+    retries : int
+        Maximum number of times a request is retried.
+    backoff : float
+        Base delay in seconds. Retry `n` waits a random time of up to
+        `backoff * 2**n` seconds.
+    max_backoff : float
+        Longest delay between retries in seconds, unless the API asks for
+        longer with `Retry-After`.
+    max_retry_after : float
+        Longest `Retry-After` in seconds that is waited for. Responses asking
+        for a longer wait are not retried.
+    statuses : tuple
+        HTTP statuses of responses that are retried.
+    methods : tuple
+        HTTP methods that are retried. POSTs carrying an `Idempotency-Key`
+        header are retried too.
+    failure_threshold : int
+        Consecutive failures that open the circuit breaker.
+    reset_timeout : float
+        Seconds an open circuit breaker waits before letting a trial request
+        through.
+    timeout : float
+        Seconds each attempt waits for the API to respond, unless the
+        deadline is sooner.
+    hedge : bool
+        Hedge GETs, sending them again if slower than `hedge_quantile` of the
+        endpoint's recent requests.
+    hedge_quantile : float
+        Quantile of recent latencies after which GETs are hedged.
+    """
+
+    retries: int = int(os.environ.get("ACROSS_RETRIES", 3))
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    max_retry_after: float = 60.0
+    statuses: tuple = (429, 502, 503, 504)
+    methods: tuple = ("GET", "PUT")
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    timeout: float = float(os.environ.get("ACROSS_TIMEOUT", 60))
+    hedge: bool = bool(int(os.environ.get("ACROSS_HEDGE", 0)))
+    hedge_quantile: float = 0.95
+
+    def retryable(self, method: str, headers: Optional[dict] = None) -> bool:
+        """Is a request safe to retry?"""
+        return method in self.methods or (
+            method == "POST" and "Idempotency-Key" in (headers or {})
+        )
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None):
+        """
+        Time to wait before retrying a request.
+
+        Parameters
+        ----------
+        attempt : int
+            Number of retries made so far.
+        response : Optional[requests.Response], optional
+            The failed response, if any.
+
+        Returns
+        -------
+        Optional[float]
+            Delay in seconds, or None if the API asked to wait longer than
+            `max_retry_after`, or the current deadline would pass first.
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        retry_after = (
+            _retry_after(response.headers.get("Retry-After"))
+            if response is not None
+            else None
+        )
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        left = remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header, given either as seconds
+    or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Recent latencies of an endpoint's requests."""
+
+    def __init__(self):
+        self._samples: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def observe(self, seconds: float):
+        """Record the latency of a request."""
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantile `q` of recent latencies in seconds, or None if too few
+        requests have been made to tell."""
+        samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for an endpoint, opening after consecutive failures.
+
+    Parameters
+    ----------
+    name : str
+        Name of the endpoint, used in error messages.
+
+    Attributes
+    ----------
+    failures : int
+        Number of consecutive failures.
+    opened : Optional[float]
+        `time.monotonic()` the circuit last opened, or None if closed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """State of the circuit: "closed", "open" or "half-open" (letting a
+        trial request through)."""
+        if self.opened is None:
+            return "closed"
+        return "half-open" if self._trial else "open"
+
+    def check(self, policy: RetryPolicy) -> bool:
+        """
+        Check a request may be made.
+
+        Returns
+        -------
+        bool
+            Is the request a trial, which must be followed by a call to
+            `success`, `failure` or `abandon`?
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open, or half-open with a trial request already
+            in progress.
+        """
+        with self._lock:
+            if self.opened is None:
+                return False
+            wait = self.opened + policy.reset_timeout - time.monotonic()
+            if wait <= 0 and not self._trial:
+                self._trial = True
+                return True
+        raise CircuitOpenError(
+            f"Circuit breaker open for {self.name} after {self.failures} "
+            f"failures, retrying in {max(wait, 0):.1f}s."
+        )
+
+    def success(self):
+        """Record a request that succeeded, closing the circuit."""
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+            self._trial = False
+
+    def abandon(self):
+        """Record a trial request that ended without telling whether the
+        service has recovered, letting another trial through."""
+        with self._lock:
+            self._trial = False
+
+    def failure(self, policy: RetryPolicy):
+        """Record a failed request, opening the circuit if it failed a trial
+        or there have been too many failures in a row."""
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= policy.failure_threshold:
+                self.opened = time.monotonic()
+            self._trial = False
+
+
+# Policies, by (mission, endpoint), with None matching any
+_policies: dict = {(None, None): RetryPolicy()}
+
+# Circuit breakers and latency trackers, by (mission, endpoint)
+_breakers: dict = {}
+_latencies: dict = {}
+_lock = threading.Lock()
+
+
+def set_retry_policy(
+    policy: Optional[RetryPolicy] = None,
+    mission: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    **kwargs,
+) -> RetryPolicy:
+    """
+    Set how requests are retried, for all requests, a mission or an
+    endpoint of a mission.
+
+    Parameters
+    ----------
+    policy : Optional[RetryPolicy], optional
+        The policy, by default the default policy with any `kwargs` changed.
+    mission : Optional[str], optional
+        Mission the policy applies to, e.g. "Swift", by default all.
+    endpoint : Optional[str], optional
+        API name the policy applies to, e.g. "Visibility", by default all.
+    **kwargs
+        `RetryPolicy` attributes to change.
+
+    Returns
+    -------
+    RetryPolicy
+        The policy.
+    """
+    policy = replace(policy or RetryPolicy(), **kwargs)
+    key = (
+        mission.lower() if mission is not None else None,
+        endpoint.lower() if endpoint is not None else None,
+    )
+    with _lock:
+        _policies[key] = policy
+    return policy
+
+
+def retry_policy(mission: str, endpoint: str) -> RetryPolicy:
+    """The retry policy of an endpoint."""
+    mission, endpoint = mission.lower(), endpoint.lower()
+    for key in [(mission, endpoint), (mission, None), (None, None)]:
+        policy = _policies.get(key)
+        if policy is not None:
+            return policy
+    return RetryPolicy()
+
+
+def breaker(mission: str, endpoint: str) -> CircuitBreaker:
+    """The circuit breaker of an endpoint."""
+    key = (mission.lower(), endpoint.lower())
+    with _lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(f"{mission} {endpoint}")
+        return _breakers[key]
+
+
+def latency(mission: str, endpoint: str) -> LatencyTracker:
+    """The latency tracker of an endpoint."""
+    key = (mission.lower(), endpoint.lower())
+    with _lock:
+        if key not in _latencies:
+            _latencies[key] = LatencyTracker()
+        return _latencies[key]
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Give the requests made within the block a total time budget. Nested
+    deadlines can only shorten the budget.
+
+    Parameters
+    ----------
+    seconds : float
+        Time budget in seconds.
+
+    Yields
+    ------
+    float
+        `time.monotonic()` the deadline passes.
+    """
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        end = min(end, current)
+    token = _deadline.set(end)
+    try:
+        yield end
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is none."""
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+def within_deadline(fn: Callable) -> Callable:
+    """Wrap `fn` to run under the current deadline, e.g. in a worker
+    thread, which doesn't inherit it."""
+    end = _deadline.get()
+    if end is None:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _deadline.set(end)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+
+    return wrapper
@@ -2,11 +2,13 @@ from datetime import datetime
 
 from ..across.resolve import ACROSSResolveName
 from ..base.common import ACROSSBase
+from ..base.deferred import ACROSSDeferred
 from ..base.daterange import ACROSSDateRange
 from ..base.schema import SAAGetSchema, SAASchema
+from ..base.windows import WindowCollection
 
 
-class SAABase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
+class SAABase(ACROSSDeferred, ACROSSBase, ACROSSResolveName, ACROSSDateRange):
     """
     Base class for SAA classes.
 
@@ -24,6 +26,10 @@ class SAABase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
         Flag indicating whether to use high-resolution data. Default is True.
     entries : list
         List of entries.
+    deferred : bool, optional
+        Only record the parameters, deferring the GET until the results are
+        first accessed, `fetch()` is called or the query is passed to
+        `gather()`. Default is False.
 
     Attributes:
     ----------
@@ -58,10 +64,14 @@ class SAABase(ACROSSBase, ACROSSResolveName, ACROSSDateRange):
     _api_name = "SAA"
     _schema = SAASchema
     _get_schema = SAAGetSchema
+    _entries_collection = WindowCollection
+    _cache_ttl = 3600.0
 
-    def __init__(self, **kwargs):
+    def __init__(self, deferred: bool = False, **kwargs):
+        self._defer(deferred)
         for k, a in kwargs.items():
             setattr(self, k, a)
-        # As this is a GET only class, we can validate and get the data
-        if self.validate_get():
-            self.get()
+        # As this is a GET only class, we can validate and get the data,
+        # unless the GET is deferred until the results are needed
+        if not deferred:
+            self._fetched = self.validate_get() and self.get()
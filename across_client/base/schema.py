@@ -36,9 +36,11 @@ The module includes the following schemas:
 - VisibilityConfigSchema: Schema for visibility configuration.
 - TLEConfigSchema: Schema for TLE configuration.
 - ConfigSchema: Schema for configuration.
+- ConfigGetSchema: Schema for getting configuration.
 """
 
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Any, List, Optional, Union
 
 import astropy.units as u  # type: ignore
@@ -317,6 +319,29 @@ class EphemSchema(BaseSchema):
     longitude: List[float]
     stepsize: int = 60
 
+    @model_validator(mode="before")
+    @classmethod
+    def convert_timestamp(cls, data: Any) -> Any:
+        """Convert NumPy datetime64 timestamps, e.g. as read from the
+        ephemeris store, to datetimes"""
+        timestamp = (
+            data.get("timestamp")
+            if isinstance(data, dict)
+            else getattr(data, "timestamp", None)
+        )
+        if isinstance(timestamp, np.ndarray):
+            timestamp = timestamp.astype("datetime64[us]").tolist()
+            if isinstance(data, dict):
+                data = {**data, "timestamp": timestamp}
+            else:
+                data = {
+                    field: getattr(data, field)
+                    for field in cls.model_fields
+                    if hasattr(data, field)
+                }
+                data["timestamp"] = timestamp
+        return data
+
 
 class EphemGetSchema(DateRangeSchema):
     """Schema for getting ephemeris entries"""
@@ -356,25 +381,25 @@ class InstrumentSchema(BaseSchema):
     energy_high: float
     fov: FOVSchema
 
-    @property
+    @cached_property
     def frequency_high(self):
         """Get the high frequency of the instrument"""
         return ((self.energy_high * u.keV) / h).to(u.Hz)  # type: ignore
 
-    @property
+    @cached_property
     def frequency_low(self):
         """Get the low frequency of the instrument"""
         return ((self.energy_low * u.keV) / h).to(u.Hz)  # type: ignore
 
-    @property
+    @cached_property
     def wavelength_high(self):
         """Get the high wavelength of the instrument"""
-        return c / self.frequency_low.to(u.nm)
+        return (c / self.frequency_low).to(u.nm)
 
-    @property
+    @cached_property
     def wavelength_low(self):
         """Get the low wavelength of the instrument"""
-        return c / self.frequency_high.to(u.nm)
+        return (c / self.frequency_high).to(u.nm)
 
 
 class EphemConfigSchema(BaseSchema):
@@ -421,3 +446,7 @@ class ConfigSchema(BaseSchema):
     ephem: EphemConfigSchema
     visibility: VisibilityConfigSchema
     tle: TLEConfigSchema
+
+
+class ConfigGetSchema(BaseSchema):
+    """Schema for getting configuration"""
@@ -4,10 +4,14 @@ from ..across.resolve import ACROSSResolveName
 from .common import ACROSSBase
 from .coords import ACROSSSkyCoord
 from .daterange import ACROSSDateRange
+from .deferred import ACROSSDeferred
 from .schema import VisibilityGetSchema, VisibilitySchema
+from .windows import WindowCollection
 
 
-class VisibilityBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoord):
+class VisibilityBase(
+    ACROSSDeferred, ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoord
+):
     """
     Base class for visibility classes.
 
@@ -25,6 +29,10 @@ class VisibilityBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCo
         Flag indicating whether high-resolution data is requested.
     entries : list
         List of entries.
+    deferred : bool, optional
+        Only record the parameters, deferring the GET until the results are
+        first accessed, `fetch()` is called or the query is passed to
+        `gather()`. Default is False.
 
     Attributes:
     ----------
@@ -56,10 +64,14 @@ class VisibilityBase(ACROSSBase, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCo
     _api_name = "Visibility"
     _schema = VisibilitySchema
     _get_schema = VisibilityGetSchema
+    _entries_collection = WindowCollection
+    _cache_ttl = 3600.0
 
-    def __init__(self, **kwargs):
+    def __init__(self, deferred: bool = False, **kwargs):
+        self._defer(deferred)
         for k, a in kwargs.items():
             setattr(self, k, a)
-        # As this is a GET only class, we can validate and get the data
-        if self.validate_get():
-            self.get()
+        # As this is a GET only class, we can validate and get the data,
+        # unless the GET is deferred until the results are needed
+        if not deferred:
+            self._fetched = self.validate_get() and self.get()
@@ -0,0 +1,204 @@
+import re
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Optional, Type
+
+import numpy as np
+
+from ..functions import convert_to_dt
+from .schema import BaseSchema, SAAEntry
+
+EPOCH = datetime(1970, 1, 1)
+
+# Matches a trailing timezone on an ISO8601 string
+TZ_REGEX = r"(Z|[\+-]\d{2}:?\d{2})$"
+
+
+def epoch_us(values: list) -> np.ndarray:
+    """Convert date/times to int64 microseconds since the UNIX epoch.
+
+    Parameters
+    ----------
+    values : list
+        Date/times, as datetimes or strings in any format accepted by
+        `convert_to_dt`.
+
+    Returns
+    -------
+    np.ndarray
+        int64 microseconds since 1970-01-01 00:00:00 UTC.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    first = values[0]
+    if type(first) is str and re.search(TZ_REGEX, first[10:]) is None:
+        # Fast path for timezone-less ISO strings, as returned by the API
+        try:
+            return np.array(values, dtype="datetime64[us]").astype(np.int64)
+        except ValueError:
+            pass
+    return np.array(
+        [convert_to_dt(value) for value in values], dtype="datetime64[us]"
+    ).astype(np.int64)
+
+
+class WindowCollection(Sequence):
+    """
+    Compact, array backed sequence of time windows, such as visibility
+    windows or SAA passages.
+
+    Window begin and end times are stored as int64 microseconds since the UNIX
+    epoch, and any other fields of the entry schema (e.g. the `initial` and
+    `final` reasons of a `VisWindow`) as categorical codes. Indexing returns
+    an entry schema object built on demand, and slicing returns a new
+    collection.
+
+    Parameters
+    ----------
+    begin : np.ndarray
+        Window begin times, as int64 microseconds since the UNIX epoch.
+    end : np.ndarray
+        Window end times, as int64 microseconds since the UNIX epoch.
+    entry_schema : Type[BaseSchema], optional
+        Schema of the entries, by default `SAAEntry`.
+    categoricals : dict, optional
+        Other fields of the entry schema, as a mapping of field name to a
+        tuple of (codes array, list of categories).
+
+    Attributes
+    ----------
+    begins : np.ndarray
+        Window begin times, as datetime64[us].
+    ends : np.ndarray
+        Window end times, as datetime64[us].
+    lengths : np.ndarray
+        Window lengths in days, as `SAAEntry.length`.
+    """
+
+    def __init__(
+        self,
+        begin: np.ndarray,
+        end: np.ndarray,
+        entry_schema: Type[BaseSchema] = SAAEntry,
+        categoricals: Optional[dict] = None,
+    ):
+        self._begin = begin
+        self._end = end
+        self.entry_schema = entry_schema
+        self.categoricals = categoricals or {}
+
+    @classmethod
+    def from_entries(
+        cls, entries: list, entry_schema: Type[BaseSchema] = SAAEntry
+    ) -> "WindowCollection":
+        """
+        Build a collection from entries, validating the window times.
+
+        Parameters
+        ----------
+        entries : list
+            Entries as dicts (e.g. decoded API JSON) or schema objects.
+        entry_schema : Type[BaseSchema], optional
+            Schema of the entries, by default `SAAEntry`.
+
+        Returns
+        -------
+        WindowCollection
+            The collection.
+
+        Raises
+        ------
+        ValueError
+            If a window ends before it begins, or a field is missing.
+        """
+        fields = [
+            key for key in entry_schema.model_fields if key not in ["begin", "end"]
+        ]
+        if len(entries) > 0 and not isinstance(entries[0], dict):
+            entries = [entry.__dict__ for entry in entries]
+
+        try:
+            begin = epoch_us([entry["begin"] for entry in entries])
+            end = epoch_us([entry["end"] for entry in entries])
+            categoricals = {}
+            for field in fields:
+                categories: dict = {}
+                codes = np.fromiter(
+                    (
+                        categories.setdefault(entry[field], len(categories))
+                        for entry in entries
+                    ),
+                    dtype=np.int64,
+                    count=len(entries),
+                )
+                categoricals[field] = (
+                    codes.astype(np.min_scalar_type(max(len(categories) - 1, 0))),
+                    list(categories),
+                )
+        except KeyError as e:
+            raise ValueError(f"Entries are missing field {e}.")
+
+        if np.any(end < begin):
+            raise ValueError("End date should not be before begin.")
+        return cls(begin, end, entry_schema, categoricals)
+
+    def __len__(self) -> int:
+        return len(self._begin)
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, (int, np.integer)):
+            return self.entry_schema.model_construct(
+                begin=EPOCH + timedelta(microseconds=int(self._begin[i])),
+                end=EPOCH + timedelta(microseconds=int(self._end[i])),
+                **{
+                    field: categories[codes[i]]
+                    for field, (codes, categories) in self.categoricals.items()
+                },
+            )
+        return type(self)(
+            self._begin[i],
+            self._end[i],
+            self.entry_schema,
+            {
+                field: (codes[i], categories)
+                for field, (codes, categories) in self.categoricals.items()
+            },
+        )
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Categorical fields as arrays of their values, e.g. `initial`
+        categoricals = self.__dict__.get("categoricals", {})
+        if name in categoricals:
+            codes, categories = categoricals[name]
+            return np.array(categories, dtype=object)[codes]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} {self.entry_schema.__name__})"
+
+    @property
+    def begins(self) -> np.ndarray:
+        return self._begin.view("datetime64[us]")
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self._end.view("datetime64[us]")
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return (self._end - self._begin) / 86400e6
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays of the collection in bytes."""
+        return (
+            self._begin.nbytes
+            + self._end.nbytes
+            + sum(codes.nbytes for codes, _ in self.categoricals.values())
+        )
@@ -1,3 +1,4 @@
+from .config import BurstCubeConfig, Config  # noqa:F401
 from .ephem import BurstCubeEphem, Ephem  # noqa:F401
 from .fov import BurstCubeFOVCheck, FOVCheck  # noqa:F401
 from .saa import SAA, BurstCubeSAA  # noqa:F401
@@ -8,5 +9,7 @@ from .toorequest import (
     TOORequests,
     burstcube_submit_too,
     submit_too,
+    submit_toos,
 )
 from .visibility import BurstCubeVisibility, Visibility  # noqa:F401
+from .watcher import TOOChange, TOOWatcher  # noqa:F401
@@ -0,0 +1,9 @@
+from ..base.config import ConfigBase
+
+
+class BurstCubeConfig(ConfigBase):
+    _mission = "BurstCube"
+
+
+# Alias
+Config = BurstCubeConfig
@@ -1,12 +1,16 @@
 import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Union
+from typing import Iterable, List, Optional, Union
 
 from pydantic import FilePath
 
 from ..across.resolve import ACROSSResolveName
 from ..base.common import ACROSSBase
+from ..base.coords import ACROSSEntriesSkyCoord
 from ..base.daterange import ACROSSDateRange
+from ..base.resilience import within_deadline
 from ..base.user import ACROSSUser
 from .constants import MISSION
 from .schema import (
@@ -16,6 +20,8 @@ from .schema import (
     BurstCubeTOORequestsGetSchema,
     BurstCubeTOORequestsSchema,
     BurstCubeTOOSchema,
+    TOOReason,
+    TOOStatus,
 )
 
 
@@ -96,6 +102,9 @@ class TOO(ACROSSBase, ACROSSUser, ACROSSResolveName, ACROSSDateRange):
     offset: float
 
     too_info: str
+    reason: TOOReason
+    status: TOOStatus
+    idempotency_key: Optional[str] = None
 
     # API definitions
 
@@ -119,16 +128,42 @@ class TOO(ACROSSBase, ACROSSUser, ACROSSResolveName, ACROSSDateRange):
             self.api_key = kwargs["api_key"]
 
     @classmethod
-    def submit_too(cls, **kwargs):
+    def submit_too(cls, idempotency_key: Optional[str] = None, **kwargs) -> "TOO":
         """
         Submit a TOO request.
+
+        Each call builds and submits its own TOO instance, so requests can be
+        submitted from many threads at once.
+
+        Parameters
+        ----------
+        idempotency_key : Optional[str], optional
+            Key identifying this request, sent as the `Idempotency-Key` header,
+            so that the API ignores repeated submissions of the same request.
+            By default a random key is generated.
+        **kwargs
+            TOO request parameters.
+
+        Returns
+        -------
+        TOO
+            The submitted TOO request. Retry a failed submission with its
+            `post()` method, which reuses the same idempotency key.
         """
+        too = cls()
+        too.idempotency_key = idempotency_key
         for k, a in kwargs.items():
-            if k in cls._post_schema.model_fields.keys():
-                setattr(cls, k, a)
-            setattr(cls, k, a)
-        if cls.validate_post():
-            cls.post()
+            setattr(too, k, a)
+        too.post()
+        return too
+
+    def _headers(self, method: str) -> dict:
+        if method != "POST":
+            return {}
+        if getattr(self, "idempotency_key", None) is None:
+            # Generated once, so that retries of this request reuse it
+            self.idempotency_key = uuid.uuid4().hex
+        return {"Idempotency-Key": self.idempotency_key}
 
     def put(self):
         """
@@ -166,7 +201,7 @@ class TOO(ACROSSBase, ACROSSUser, ACROSSResolveName, ACROSSDateRange):
         )
 
 
-class TOORequests(ACROSSBase, ACROSSUser):
+class TOORequests(ACROSSBase, ACROSSUser, ACROSSEntriesSkyCoord):
     """
     Represents a Targer of Opportunity (TOO) request.
 
@@ -231,6 +266,46 @@ class TOORequests(ACROSSBase, ACROSSUser):
         )
 
 
+def submit_toos(
+    requests: Iterable[dict], max_workers: int = 8
+) -> List[Union[TOO, Exception]]:
+    """
+    Submit many TOO requests concurrently, each with `TOO.submit_too`.
+
+    Submissions carry an idempotency key, so connection errors, timeouts and
+    server errors are retried by the TOO endpoint's retry policy, within any
+    current deadline (see `across_client.base.resilience`). A retry can't
+    create a duplicate request even if the original submission reached the
+    API.
+
+    Parameters
+    ----------
+    requests : Iterable[dict]
+        Parameters of each TOO request, as for `TOO.submit_too`, optionally
+        including an `idempotency_key`.
+    max_workers : int, optional
+        Maximum number of concurrent submissions, by default 8.
+
+    Returns
+    -------
+    List[Union[TOO, Exception]]
+        The submitted TOO request, or the exception raised submitting it, for
+        each request in order.
+    """
+    requests = list(requests)
+    if not requests:
+        return []
+    submit = within_deadline(lambda params: TOO.submit_too(**params))
+    results: List[Union[TOO, Exception]] = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as e:
+        for future in [e.submit(submit, params) for params in requests]:
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append(error)
+    return results
+
+
 # Alias
 BurstCubeTOO = TOO
 BurstCubeTOORequests = TOORequests
@@ -0,0 +1,256 @@
+import asyncio
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+from .schema import BurstCubeTOOSchema, TOOReason, TOOStatus
+from .toorequest import TOO, TOORequests
+
+# Statuses after which a TOO request no longer changes
+FINAL_STATUSES = [TOOStatus.rejected, TOOStatus.declined, TOOStatus.executed]
+
+
+@dataclass
+class TOOChange:
+    """
+    Change in the status or reason of a watched TOO request.
+
+    Attributes
+    ----------
+    id : str
+        The ID of the TOO request.
+    status : TOOStatus
+        The new status of the TOO request.
+    reason : TOOReason
+        The new reason for the status.
+    old_status : Optional[TOOStatus]
+        The previous status, if known.
+    old_reason : Optional[TOOReason]
+        The previous reason, if known.
+    too : BurstCubeTOOSchema
+        The TOO request, as last fetched.
+    """
+
+    id: str
+    status: TOOStatus
+    reason: TOOReason
+    old_status: Optional[TOOStatus]
+    old_reason: Optional[TOOReason]
+    too: BurstCubeTOOSchema
+
+
+class TOOWatcher:
+    """
+    Watches the status of many BurstCube TOO requests, reporting changes in
+    their `status` or `reason`.
+
+    Each poll fetches all of the user's TOO requests with a single
+    `TOORequests` query, rather than a `TOO` GET per request. Requests missing
+    from that query are fetched individually. The polling interval backs off
+    while nothing changes, and resets when something does. Requests are no
+    longer watched once they reach a final status (rejected, declined or
+    executed).
+
+    Parameters
+    ----------
+    username : str
+        The username that submitted the TOO requests.
+    api_key : str
+        The API key of the user.
+    toos : Iterable[Union[TOO, str]], optional
+        TOO requests to watch, or their IDs.
+    callback : Optional[Callable[[TOOChange], Any]], optional
+        Function called with each change.
+    min_interval : float, optional
+        Shortest time between polls in seconds, by default 10.
+    max_interval : float, optional
+        Longest time between polls in seconds, by default 300.
+    backoff : float, optional
+        Factor the interval grows by after each poll without changes, by
+        default 2.
+
+    Methods
+    -------
+    watch(too)
+        Start watching a TOO request.
+    poll()
+        Poll the watched TOO requests once, returning any changes.
+    start()
+        Poll in a background thread until `stop()` is called.
+    events()
+        Asynchronously iterate over changes.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        api_key: str,
+        toos: Iterable[Union[TOO, str]] = (),
+        callback: Optional[Callable[[TOOChange], Any]] = None,
+        min_interval: float = 10,
+        max_interval: float = 300,
+        backoff: float = 2,
+    ):
+        self.username = username
+        self.api_key = api_key
+        self.callbacks: list = [callback] if callback is not None else []
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        # Last known (status, reason) of each watched TOO request, by ID
+        self.states: dict = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for too in toos:
+            self.watch(too)
+
+    @property
+    def ids(self) -> List[str]:
+        """IDs of the watched TOO requests."""
+        return list(self.states)
+
+    def watch(self, too: Union[TOO, str]):
+        """
+        Start watching a TOO request.
+
+        Parameters
+        ----------
+        too : Union[TOO, str]
+            The TOO request, e.g. as returned by its submission, or its ID.
+            If a TOO is given, changes from its current status are reported.
+        """
+        with self._lock:
+            if isinstance(too, str):
+                self.states.setdefault(too, None)
+            else:
+                self.states[too.id] = (too.status, too.reason)
+        self.interval = self.min_interval
+
+    def unwatch(self, id: str):
+        """Stop watching a TOO request."""
+        with self._lock:
+            self.states.pop(id, None)
+
+    def add_callback(self, callback: Callable[[TOOChange], Any]) -> Callable:
+        """Register a function to be called with each change. Can be used as
+        a decorator."""
+        self.callbacks.append(callback)
+        return callback
+
+    def fetch(self) -> Dict[str, BurstCubeTOOSchema]:
+        """
+        Fetch the watched TOO requests.
+
+        Returns
+        -------
+        Dict[str, BurstCubeTOOSchema]
+            TOO requests by ID, as listed by `TOORequests`. Requests that
+            could not be fetched are left out.
+        """
+        ids = set(self.ids)
+        requests = TOORequests(username=self.username, api_key=self.api_key)
+        toos: Dict[str, BurstCubeTOOSchema] = {
+            too.id: too for too in requests.entries if too.id in ids
+        }
+        for id in ids - set(toos):
+            # Not in the listing, e.g. because of its limit
+            too = TOO(id=id, username=self.username, api_key=self.api_key)
+            if too.get():
+                toos[id] = too.schema
+        return toos
+
+    def poll(self) -> List[TOOChange]:
+        """
+        Poll the watched TOO requests once, calling the callbacks with any
+        changes and adapting the polling interval.
+
+        Returns
+        -------
+        List[TOOChange]
+            Changes since the last poll.
+        """
+        changes = []
+        for id, too in self.fetch().items():
+            with self._lock:
+                if id not in self.states:
+                    continue
+                old = self.states[id]
+                self.states[id] = (too.status, too.reason)
+                if too.status in FINAL_STATUSES:
+                    del self.states[id]
+            if old is not None and old != (too.status, too.reason):
+                changes.append(
+                    TOOChange(id, too.status, too.reason, old[0], old[1], too)
+                )
+            elif old is None and too.status in FINAL_STATUSES:
+                # Report a final status seen on the first poll, so that it
+                # isn't missed when the request stops being watched
+                changes.append(TOOChange(id, too.status, too.reason, None, None, too))
+
+        for change in changes:
+            for callback in list(self.callbacks):
+                try:
+                    callback(change)
+                except Exception as e:
+                    warnings.warn(f"TOO watcher callback {callback!r} failed: {e}")
+
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return changes
+
+    def _run(self):
+        while self.states and not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                warnings.warn(f"TOO watcher poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "TOOWatcher":
+        """Poll in a background thread, until `stop()` is called or no TOO
+        requests are left to watch."""
+        self._stop.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="too-watcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling in the background."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def events(self) -> AsyncIterator[TOOChange]:
+        """
+        Asynchronously iterate over changes, polling until no TOO requests are
+        left to watch.
+
+        Yields
+        ------
+        TOOChange
+            Each change, as it is seen.
+        """
+        loop = asyncio.get_running_loop()
+        while self.states:
+            for change in await loop.run_in_executor(None, self.poll):
+                yield change
+            if self.states:
+                await asyncio.sleep(self.interval)
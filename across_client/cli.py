@@ -0,0 +1,338 @@
+"""
+Command line interface for the ACROSS API client.
+
+Single queries are run as `across <mission> <command> [--parameter value]`,
+for example::
+
+    across swift visibility --name "Crab" --begin 2024-01-01 --length 1
+
+Target names can be resolved with `across resolve <name>`. Many queries can be
+run at once with `across batch [FILE]`, which reads one JSON object per line
+from FILE (or stdin), runs the queries concurrently and writes one NDJSON
+line per result to stdout as each query completes.
+"""
+
+import argparse
+import importlib
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, Dict, Iterator, Optional
+
+from . import constants
+from .across.resolve import Resolve
+
+# Missions supported by the client
+MISSIONS = ["swift", "burstcube", "nustar", "nicer"]
+
+# Command name -> (module, API class name, action)
+COMMANDS = {
+    "visibility": ("visibility", "Visibility", "get"),
+    "ephem": ("ephem", "Ephem", "get"),
+    "saa": ("saa", "SAA", "get"),
+    "fovcheck": ("fov", "FOVCheck", "get"),
+    "plan": ("plan", "Plan", "get"),
+    "observations": ("observations", "Observations", "get"),
+    "too": ("toorequest", "TOO", "get"),
+    "submit-too": ("toorequest", "TOO", "post"),
+    "delete-too": ("toorequest", "TOO", "delete"),
+    "toorequests": ("toorequest", "TOORequests", "get"),
+    "config": ("config", "Config", "get"),
+}
+
+# API classes that perform their GET inside `__init__`
+FETCH_ON_INIT = ["visibility", "ephem", "saa", "fovcheck", "toorequests", "config"]
+
+# Schema used to validate the arguments of each action
+ACTION_SCHEMA = {"get": "_get_schema", "post": "_post_schema", "delete": "_del_schema"}
+
+
+def api_class(mission: str, command: str) -> type:
+    """Return the API class that implements a command for a mission.
+
+    Parameters
+    ----------
+    mission : str
+        Mission name, e.g. "swift".
+    command : str
+        Command name, e.g. "visibility".
+
+    Returns
+    -------
+    type
+        The API class.
+
+    Raises
+    ------
+    ValueError
+        If the command is not available for the mission.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command '{command}'.")
+    module, name, _ = COMMANDS[command]
+    try:
+        return getattr(
+            importlib.import_module(f"across_client.{mission.lower()}.{module}"), name
+        )
+    except (ImportError, AttributeError):
+        raise ValueError(f"Command '{command}' is not available for '{mission}'.")
+
+
+def run_query(mission: Optional[str], command: str, params: dict) -> dict:
+    """Run a single ACROSS API query.
+
+    Parameters
+    ----------
+    mission : Optional[str]
+        Mission name. Not required for the `resolve` command.
+    command : str
+        Command name.
+    params : dict
+        Parameters for the API class.
+
+    Returns
+    -------
+    dict
+        JSON serializable result of the query.
+    """
+    if command == "resolve":
+        obj = Resolve(**params)
+        ok = obj.get()
+    else:
+        if mission is None:
+            raise ValueError(f"Command '{command}' requires a mission.")
+        cls = api_class(mission, command)
+        obj = cls(**params)
+        if command in FETCH_ON_INIT:
+            ok = all(hasattr(obj, key) for key in obj._schema.model_fields)
+        else:
+            ok = getattr(obj, COMMANDS[command][2])()
+
+    if not ok:
+        return {"ok": False, "error": "No data returned."}
+    return {
+        "ok": True,
+        "result": obj._schema.model_validate(obj).model_dump(mode="json"),
+    }
+
+
+def run_record(record: dict) -> dict:
+    """Run a query described by a batch record, trapping any errors.
+
+    Parameters
+    ----------
+    record : dict
+        Query record with `command`, optional `mission`, optional `tag` and
+        either a `params` dict or the parameters given inline.
+
+    Returns
+    -------
+    dict
+        Result record, ready for NDJSON output.
+    """
+    record = dict(record)
+    output = {
+        key: record.pop(key) for key in ["tag", "mission", "command"] if key in record
+    }
+    params = record.pop("params", record)
+    try:
+        # Set `name` and `length` last, as they depend on ra/dec and begin
+        params = dict(
+            sorted(params.items(), key=lambda item: item[0] in ["name", "length"])
+        )
+        output.update(
+            run_query(output.get("mission"), output.get("command", ""), params)
+        )
+    except Exception as e:
+        output.update({"ok": False, "error": f"{type(e).__name__}: {e}"})
+    return output
+
+
+def read_records(stream: IO) -> Iterator[dict]:
+    """Read query records, one JSON object per line, skipping blank lines.
+
+    Parameters
+    ----------
+    stream : IO
+        Stream to read from.
+
+    Yields
+    ------
+    dict
+        Query record. Lines that fail to parse, or aren't JSON objects, are
+        yielded as records with a `error` key so they are reported in the
+        output.
+    """
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"line": lineno, "error": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield {
+                "line": lineno,
+                "error": f"Expected a JSON object, not {type(record).__name__}.",
+            }
+            continue
+        yield record
+
+
+def result_record(future: Future, record: dict) -> dict:
+    """Result record of a query run by `run_record`, or an error record if it
+    raised anyway, so one bad query can't stop a batch."""
+    try:
+        return future.result()
+    except Exception as e:
+        output = {
+            key: record[key] for key in ["tag", "mission", "command"] if key in record
+        }
+        return {**output, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def write_record(record: dict, stream: IO = sys.stdout):
+    """Write a result record as a single NDJSON line."""
+    stream.write(json.dumps(record, default=str) + "\n")
+    stream.flush()
+
+
+def run_batch(stream: IO, workers: int = 8, output: IO = sys.stdout) -> bool:
+    """Run queries from a stream concurrently, streaming results as NDJSON.
+
+    At most `2 * workers` queries are queued at any time, so arbitrarily large
+    inputs can be fed in from a pipe.
+
+    Parameters
+    ----------
+    stream : IO
+        Stream of query records, one JSON object per line.
+    workers : int, optional
+        Number of concurrent queries, by default 8.
+    output : IO, optional
+        Stream to write results to, by default stdout.
+
+    Returns
+    -------
+    bool
+        True if every query succeeded.
+    """
+    success = True
+    # Records of the queries in progress, by future
+    pending: Dict[Future, dict] = {}
+
+    def collect():
+        nonlocal success
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = result_record(future, pending.pop(future))
+            success &= result["ok"]
+            write_record(result, output)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for record in read_records(stream):
+            if "error" in record:
+                success = False
+                write_record({"ok": False, **record}, output)
+                continue
+            pending[executor.submit(run_record, record)] = record
+            if len(pending) >= 2 * workers:
+                collect()
+        while pending:
+            collect()
+    return success
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser, with one sub-command per mission/command.
+
+    Options for each command are derived from the fields of the schema that
+    validates its arguments.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="across", description="ACROSS API command line client."
+    )
+    parser.add_argument(
+        "--api-url", default=constants.API_URL, help="Base URL of the ACROSS API."
+    )
+    subparsers = parser.add_subparsers(dest="mission", required=True)
+
+    resolve_parser = subparsers.add_parser("resolve", help="Resolve a target name.")
+    resolve_parser.add_argument("name", help="Target name.")
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Run queries from a file of JSON lines concurrently."
+    )
+    batch_parser.add_argument(
+        "file",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="File of queries, one JSON object per line (default: stdin).",
+    )
+    batch_parser.add_argument(
+        "-w", "--workers", type=int, default=8, help="Number of concurrent queries."
+    )
+
+    for mission in MISSIONS:
+        mission_parser = subparsers.add_parser(mission, help=f"{mission} queries.")
+        commands = mission_parser.add_subparsers(dest="command", required=True)
+        for command, (_, _, action) in COMMANDS.items():
+            try:
+                cls = api_class(mission, command)
+            except ValueError:
+                continue
+            command_parser = commands.add_parser(command)
+            fields = list(getattr(cls, ACTION_SCHEMA[action]).model_fields)
+            # `name` and `length` set the ra/dec and end fields, so are only
+            # offered when the action's schema takes them
+            if hasattr(cls, "name") and {"ra", "dec"} <= set(fields):
+                fields += ["name"]
+            if hasattr(cls, "length") and {"begin", "end"} <= set(fields):
+                fields += ["length"]
+            for field in fields:
+                command_parser.add_argument(
+                    f"--{field.replace('_', '-')}",
+                    dest=field,
+                    default=argparse.SUPPRESS,
+                )
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point for the `across` command.
+
+    Parameters
+    ----------
+    argv : Optional[list], optional
+        Command line arguments, by default sys.argv[1:].
+
+    Returns
+    -------
+    int
+        Exit status, 0 on success.
+    """
+    args = vars(build_parser().parse_args(argv))
+    constants.API_URL = args.pop("api_url")
+    mission = args.pop("mission")
+
+    if mission == "batch":
+        return 0 if run_batch(args["file"], workers=args["workers"]) else 1
+
+    if mission == "resolve":
+        record = {"command": "resolve", "params": args}
+    else:
+        record = {"mission": mission, "command": args.pop("command"), "params": args}
+    result = run_record(record)
+    write_record(result)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
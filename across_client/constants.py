@@ -2,7 +2,10 @@
 This module contains the constants used in the ACROSS API client.
 
 API_URL: str
-    The base URL of the ACROSS API.
+    The base URL of the ACROSS API. Can be overridden with the
+    `ACROSS_API_URL` environment variable.
 """
 
-API_URL = "https://www.swift.psu.edu/labs/api/v1/"
+import os
+
+API_URL = os.environ.get("ACROSS_API_URL", "https://www.swift.psu.edu/labs/api/v1/")
@@ -0,0 +1,9 @@
+from ..base.config import ConfigBase
+
+
+class NICERConfig(ConfigBase):
+    _mission = "NICER"
+
+
+# Alias
+Config = NICERConfig
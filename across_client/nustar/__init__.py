@@ -1,3 +1,4 @@
+from .config import Config, NuSTARConfig  # noqa:F401
 from .ephem import NuSTAREphem, Ephem  # noqa:F401
 from .saa import SAA, NuSTARSAA  # noqa:F401
 from .plan import Plan, PlanEntry, NuSTARPlan, NuSTARPlanEntry  # noqa:F401
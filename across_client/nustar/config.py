@@ -0,0 +1,9 @@
+from ..base.config import ConfigBase
+
+
+class NuSTARConfig(ConfigBase):
+    _mission = "NuSTAR"
+
+
+# Alias
+Config = NuSTARConfig
@@ -0,0 +1,9 @@
+from ..base.config import ConfigBase
+
+
+class SwiftConfig(ConfigBase):
+    _mission = "Swift"
+
+
+# Alias
+Config = SwiftConfig
@@ -2,8 +2,9 @@ from datetime import datetime
 
 from ..base.schema import PlanGetSchema
 from ..across.resolve import ACROSSResolveName
+from ..base.bulk import ACROSSBulkPut
 from ..base.common import ACROSSBase
-from ..base.coords import ACROSSSkyCoord
+from ..base.coords import ACROSSEntriesSkyCoord, ACROSSSkyCoord
 from ..base.daterange import ACROSSDateRange
 from ..base.user import ACROSSUser
 from .constants import MISSION
@@ -15,7 +16,13 @@ from .schema import (
 
 
 class SwiftObservations(
-    ACROSSBase, ACROSSUser, ACROSSResolveName, ACROSSDateRange, ACROSSSkyCoord
+    ACROSSBase,
+    ACROSSUser,
+    ACROSSResolveName,
+    ACROSSDateRange,
+    ACROSSSkyCoord,
+    ACROSSEntriesSkyCoord,
+    ACROSSBulkPut,
 ):
     """
     Class representing Swift observations.
@@ -0,0 +1,511 @@
+"""
+Micro-benchmarks for the parsing, validation and conversion hot paths of the
+ACROSS API client.
+
+HTTP responses are served from memory by replacing the `requests` transport
+adapter, so the benchmarks time the client's own response handling and not
+the network. Each benchmark is timed over several repeats, and its peak
+memory allocation is measured with `tracemalloc` in a separate run.
+
+Usage::
+
+    python benchmarks/bench.py                  # run all benchmarks
+    python benchmarks/bench.py -k ephem         # run benchmarks matching "ephem"
+    python benchmarks/bench.py --scale 0.1      # shrink all payloads 10x
+    python benchmarks/bench.py --save           # save as .benchmarks/<git rev>.json
+    python benchmarks/bench.py --compare abc123 # compare with a saved run
+"""
+
+import argparse
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional, Union
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from across_client.base import codec, common  # noqa: E402
+from across_client.base.backends import (  # noqa: E402
+    CacheBackend,
+    DiskBackend,
+    set_cache_backend,
+)
+from across_client.base.coords import coord_convert  # noqa: E402
+from across_client.base.ephemstore import set_ephem_store  # noqa: E402
+from across_client.base.schema import EphemSchema  # noqa: E402
+from across_client.burstcube.toorequest import BurstCubeTOORequests  # noqa: E402
+from across_client.functions import convert_to_dt, tablefy  # noqa: E402
+from across_client.swift.ephem import SwiftEphem  # noqa: E402
+from across_client.swift.observations import SwiftObservations  # noqa: E402
+from across_client.swift.saa import SwiftSAA  # noqa: E402
+from across_client.swift.schema import SwiftObservationsSchema  # noqa: E402
+from across_client.swift.visibility import SwiftVisibility  # noqa: E402
+
+import payloads  # noqa: E402
+from redis_stub import RedisStub  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / ".benchmarks"
+
+# Registered benchmarks: name -> setup function returning the callable to time
+BENCHMARKS: dict = {}
+
+
+def benchmark(func: Callable) -> Callable:
+    """Register a benchmark setup function."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class FakeAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter that serves canned response bodies from memory.
+
+    Parameters
+    ----------
+    routes : dict
+        Mapping of (method, API name) to (status code, encoded JSON body).
+    etag : bool, optional
+        Send ETags, and reply 304 Not Modified to conditional requests for
+        unchanged bodies, by default False.
+    """
+
+    def __init__(self, routes: dict, etag: bool = False):
+        super().__init__()
+        self.routes = routes
+        self.etag = etag
+
+    def send(self, request, **kwargs):
+        api_name = request.path_url.split("?")[0].rstrip("/").split("/")[-1]
+        status, body = self.routes[(request.method, api_name)]
+        response = requests.Response()
+        if self.etag:
+            etag = f'"{zlib.crc32(body):08x}"'
+            response.headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+        response.status_code = status
+        response.raw = io.BytesIO(body)
+        response.headers["Content-Type"] = "application/json"
+        response.headers["Content-Length"] = str(len(body))
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def serve(routes: dict, etag: bool = False):
+    """Context manager that serves `routes` for every `requests` call."""
+    adapter = FakeAdapter(
+        {
+            key: (status, json.dumps(body).encode())
+            for key, (status, body) in routes.items()
+        },
+        etag,
+    )
+    return mock.patch.object(
+        requests.adapters.HTTPAdapter,
+        "send",
+        lambda self, request, **kwargs: adapter.send(request, **kwargs),
+    )
+
+
+def scaled(n: float, scale: float) -> int:
+    return max(1, int(n * scale))
+
+
+@benchmark
+def ephem_get(scale: float) -> Callable:
+    """SwiftEphem GET response handling for a year-long ephemeris."""
+    body = payloads.ephem_payload(days=365 * scale)
+
+    def run():
+        with serve({("GET", "ephem"): (200, body)}):
+            SwiftEphem(begin="2024-01-01", end="2025-01-01")
+
+    return run
+
+
+@benchmark
+def ephem_store_get(scale: float) -> Callable:
+    """SwiftEphem GET of a year-long ephemeris from a filled ephemeris store,
+    as by a new worker process."""
+    days = max(1, round(365 * scale))
+    body = payloads.ephem_payload(days=days)
+    begin = payloads.BEGIN
+    end = begin + timedelta(days=days, seconds=-60)
+    path = tempfile.mkdtemp()
+
+    def run():
+        set_ephem_store(path)
+        try:
+            SwiftEphem(begin=begin, end=end)
+        finally:
+            set_ephem_store(None)
+
+    with serve({("GET", "ephem"): (200, body)}):
+        run()  # Fill the store
+    return run
+
+
+@benchmark
+def visibility_get(scale: float) -> Callable:
+    """SwiftVisibility GET response handling for 10k windows."""
+    body = payloads.visibility_payload(scaled(10_000, scale))
+
+    def run():
+        with serve({("GET", "visibility"): (200, body)}):
+            SwiftVisibility(ra=10, dec=20, begin="2024-01-01", end="2025-01-01")
+
+    return run
+
+
+def _cached_visibility(scale: float, backend: Union[str, CacheBackend]) -> Callable:
+    body = payloads.visibility_payload(scaled(10_000, scale))
+
+    def run():
+        set_cache_backend(backend)
+        try:
+            SwiftVisibility(ra=10, dec=20, begin="2024-01-01", end="2025-01-01")
+        finally:
+            set_cache_backend(None)
+
+    with serve({("GET", "visibility"): (200, body)}):
+        run()  # Fill the cache
+    return run
+
+
+@benchmark
+def visibility_get_disk_cached(scale: float) -> Callable:
+    """SwiftVisibility GET of 10k windows from a filled on-disk response
+    cache."""
+    return _cached_visibility(
+        scale, DiskBackend(Path(tempfile.mkdtemp()) / "cache.sqlite")
+    )
+
+
+@benchmark
+def visibility_get_redis_cached(scale: float) -> Callable:
+    """SwiftVisibility GET of 10k windows from a filled Redis response cache,
+    served by a local stand-in Redis server."""
+    return _cached_visibility(scale, RedisStub().start().url)
+
+
+@benchmark
+def saa_get(scale: float) -> Callable:
+    """SwiftSAA GET response handling for 10k passages."""
+    body = payloads.saa_payload(scaled(10_000, scale))
+
+    def run():
+        with serve({("GET", "saa"): (200, body)}):
+            SwiftSAA(begin="2024-01-01", end="2025-01-01")
+
+    return run
+
+
+@benchmark
+def observations_get(scale: float) -> Callable:
+    """SwiftObservations GET response handling for 50k rows."""
+    body = payloads.swift_observations_payload(scaled(50_000, scale))
+
+    def run():
+        with serve({("GET", "observations"): (200, body)}):
+            SwiftObservations(begin="2024-01-01", end="2025-01-01").get()
+
+    return run
+
+
+@benchmark
+def observations_get_revalidated(scale: float) -> Callable:
+    """SwiftObservations GET of 50k rows, revalidated with an ETag and
+    answered 304 Not Modified."""
+    body = payloads.swift_observations_payload(scaled(50_000, scale))
+    server = serve({("GET", "observations"): (200, body)}, etag=True)
+
+    def run():
+        with server:
+            SwiftObservations(begin="2024-01-01", end="2024-02-01").get()
+
+    # Keep the body and ETag to revalidate, however large the body is
+    with mock.patch.object(common, "REVALIDATE_MAX_BODY", 1 << 30):
+        run()
+    return run
+
+
+@benchmark
+def toorequests_get(scale: float) -> Callable:
+    """BurstCubeTOORequests GET response handling for 5k requests."""
+    body = payloads.toorequests_payload(scaled(5_000, scale))
+
+    def run():
+        with serve({("GET", "toorequests"): (200, body)}):
+            BurstCubeTOORequests(username="benchmark", api_key="benchmark")
+
+    return run
+
+
+@benchmark
+def convert_to_dt_strings(scale: float) -> Callable:
+    """convert_to_dt on 100k date/time strings of mixed formats."""
+    n = scaled(100_000, scale)
+    values = [
+        ["2024-01-01 00:00:00", "2024-01-01T12:30:00.125", "2024-01-01"][i % 3]
+        for i in range(n)
+    ]
+
+    def run():
+        for value in values:
+            convert_to_dt(value)
+
+    return run
+
+
+@benchmark
+def coord_convert_values(scale: float) -> Callable:
+    """coord_convert on 100k coordinates given as floats, ints and strings."""
+    n = scaled(100_000, scale)
+    values = [[123.456, 12, "45.5"][i % 3] for i in range(n)]
+
+    def run():
+        for value in values:
+            coord_convert(value)
+
+    return run
+
+
+def _observations(scale: float) -> SwiftObservations:
+    body = payloads.swift_observations_payload(scaled(50_000, scale))
+    with serve({("GET", "observations"): (200, body)}):
+        obs = SwiftObservations(begin="2024-01-01", end="2025-01-01")
+        obs.get()
+    obs.username = "benchmark"
+    obs.api_key = "benchmark"
+    return obs
+
+
+@benchmark
+def observations_table(scale: float) -> Callable:
+    """`_table` and `tablefy` HTML rendering of 50k Swift observations."""
+    obs = _observations(scale)
+
+    def run():
+        header, table = obs._table
+        tablefy(table, header)
+
+    return run
+
+
+@benchmark
+def observations_put_payload(scale: float) -> Callable:
+    """PUT payload validation and `model_dump` of 50k Swift observations."""
+    obs = _observations(scale)
+
+    def run():
+        obs._put_schema.model_validate(obs).model_dump(include={"entries"}, mode="json")
+
+    return run
+
+
+def _decoders() -> dict:
+    """Ways of decoding and validating a response body, by name."""
+    decoders = {
+        "stdlib": lambda schema, body: schema.model_validate(json.loads(body)),
+        "codec": codec.CODEC.validate,
+    }
+    if codec.HAVE_ORJSON:
+        decoders["orjson"] = lambda schema, body: schema.model_validate(
+            codec.orjson.loads(body)
+        )
+    return decoders
+
+
+def _encoders() -> dict:
+    """Ways of encoding the entries of a validated schema, by name."""
+    encoders = {
+        "stdlib": lambda model: json.dumps(
+            model.model_dump(include={"entries"}, mode="json")
+        ).encode(),
+        "codec": lambda model: codec.CODEC.dump(model, include={"entries"}),
+    }
+    if codec.HAVE_ORJSON:
+        encoders["orjson"] = lambda model: codec.orjson.dumps(
+            model.model_dump(include={"entries"})
+        )
+    return encoders
+
+
+def _register_decode(name: str, schema: type, payload: Callable, doc: str):
+    for decoder_name, decoder in _decoders().items():
+
+        def setup(scale: float, decoder: Callable = decoder) -> Callable:
+            body = json.dumps(payload(scale)).encode()
+            return lambda: decoder(schema, body)
+
+        setup.__doc__ = f"{doc}, decoded with {decoder_name}."
+        BENCHMARKS[f"{name}_decode_{decoder_name}"] = setup
+
+
+_register_decode(
+    "ephem",
+    EphemSchema,
+    lambda scale: payloads.ephem_payload(days=30 * scale),
+    "EphemSchema for a 30 day ephemeris",
+)
+_register_decode(
+    "observations",
+    SwiftObservationsSchema,
+    lambda scale: payloads.swift_observations_payload(scaled(50_000, scale)),
+    "SwiftObservationsSchema for 50k rows",
+)
+
+for _name, _encoder in _encoders().items():
+
+    def _setup(scale: float, encoder: Callable = _encoder) -> Callable:
+        obs = _observations(scale)
+        model = obs._put_schema.model_validate(obs)
+        return lambda: encoder(model)
+
+    _setup.__doc__ = f"Encoding of 50k Swift observations with {_name}."
+    BENCHMARKS[f"observations_encode_{_name}"] = _setup
+
+
+def time_benchmark(run: Callable, repeat: int) -> list:
+    """Time `repeat` runs of a benchmark, returning the times in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def peak_memory(run: Callable) -> int:
+    """Peak memory allocated by a single run of a benchmark, in bytes."""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision() -> str:
+    """Short git revision of the working tree, or "unknown"."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_results(name: str) -> dict:
+    """Load saved results, given a file path or a saved run name."""
+    path = Path(name)
+    if not path.exists():
+        path = RESULTS_DIR / f"{name}.json"
+    return json.loads(path.read_text())["results"]
+
+
+def run_benchmarks(
+    pattern: Optional[str] = None,
+    scale: float = 1.0,
+    repeat: int = 5,
+    memory: bool = True,
+) -> dict:
+    """Run the registered benchmarks.
+
+    Parameters
+    ----------
+    pattern : Optional[str], optional
+        Only run benchmarks whose name contains this string.
+    scale : float, optional
+        Scale factor for payload sizes, by default 1.0.
+    repeat : int, optional
+        Number of timed runs per benchmark, by default 5.
+    memory : bool, optional
+        Measure peak memory, by default True.
+
+    Returns
+    -------
+    dict
+        Results keyed by benchmark name.
+    """
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern is not None and pattern not in name:
+            continue
+        run = setup(scale)
+        run()  # Warm up
+        times = time_benchmark(run, repeat)
+        results[name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "peak_memory": peak_memory(run) if memory else None,
+        }
+        print(format_result(name, results[name]), flush=True)
+    return results
+
+
+def format_result(name: str, result: dict, baseline: Optional[dict] = None) -> str:
+    line = f"{name:<28} min {result['min'] * 1000:10.2f} ms  median {result['median'] * 1000:10.2f} ms"
+    if result["peak_memory"] is not None:
+        line += f"  peak {result['peak_memory'] / 2**20:9.2f} MiB"
+    if baseline is not None:
+        line += f"  x{baseline['min'] / result['min']:.2f} speed"
+        if result["peak_memory"] and baseline.get("peak_memory"):
+            line += f"  x{baseline['peak_memory'] / result['peak_memory']:.2f} memory"
+    return line
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="Only run matching benchmarks.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Payload scale.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs.")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip peak memory measurement."
+    )
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const=git_revision(),
+        help="Save results under this name (default: git revision).",
+    )
+    parser.add_argument("--compare", help="Saved run name or file to compare with.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.pattern, args.scale, args.repeat, not args.no_memory)
+
+    if args.compare is not None:
+        baseline = load_results(args.compare)
+        print(f"\nCompared with {args.compare} (>1 is better):")
+        for name, result in results.items():
+            if name in baseline:
+                print(format_result(name, result, baseline[name]))
+
+    if args.save is not None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{args.save}.json"
+        path.write_text(
+            json.dumps(
+                {"revision": git_revision(), "scale": args.scale, "results": results},
+                indent=2,
+            )
+        )
+        print(f"\nSaved results to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
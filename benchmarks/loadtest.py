@@ -0,0 +1,281 @@
+"""
+End-to-end load test of the ACROSS API client against a stand-in server.
+
+Worker threads drive the client's real `get`/`put`/`post`/`delete` paths in
+a loop for a fixed duration, picking operations at random according to their
+weights, and the throughput and p50/p95/p99 latency of each operation is
+reported. By default a stub server (see `stub_server.py`) is started
+in-process; as it then shares the GIL with the client, use `--url` to point
+at a separately started stub server for more accurate numbers.
+
+Usage::
+
+    python benchmarks/loadtest.py --threads 16 --duration 30 --latency 0.02
+    python benchmarks/loadtest.py --mix visibility_get=3,too_post=1 --error-rate 0.05
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000/ --profile
+    python benchmarks/loadtest.py --phases
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import random
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from across_client import constants  # noqa: E402
+from across_client.base import hooks  # noqa: E402
+from across_client.burstcube.toorequest import TOO  # noqa: E402
+from across_client.swift.plan import SwiftPlan, SwiftPlanEntry  # noqa: E402
+from across_client.swift.visibility import SwiftVisibility  # noqa: E402
+
+import payloads  # noqa: E402
+from stub_server import StubConfig, StubServer  # noqa: E402
+
+USER = {"username": "loadtest", "api_key": "loadtest"}
+
+
+def plan_entries(n: int) -> list:
+    """Swift plan entries to upload in Plan PUTs."""
+    return [
+        SwiftPlanEntry(**entry)
+        for entry in payloads.swift_observations_payload(n)["entries"]
+    ]
+
+
+def operations(plan_size: int) -> dict:
+    """Load test operations, keyed by name. Each returns True on success."""
+    entries = plan_entries(plan_size)
+
+    def visibility_get():
+        vis = SwiftVisibility(ra=10, dec=20, begin="2024-01-01", end="2024-01-02")
+        return hasattr(vis, "entries")
+
+    def plan_get():
+        return SwiftPlan(begin="2024-01-01", end="2024-01-02").get()
+
+    def plan_put():
+        return SwiftPlan(entries=entries, **USER).put()
+
+    def too_post():
+        too = TOO(
+            trigger_mission="Fermi",
+            trigger_instrument="GBM",
+            trigger_id=f"bn{random.randrange(10**9):09d}",
+            trigger_time="2024-01-01 00:00:00",
+            ra=random.uniform(0, 360),
+            dec=random.uniform(-90, 90),
+            **USER,
+        )
+        return too.post()
+
+    def too_get():
+        return TOO(id="0" * 32, **USER).get()
+
+    def too_delete():
+        return TOO(id="0" * 32, **USER).delete()
+
+    return {
+        "visibility_get": visibility_get,
+        "plan_get": plan_get,
+        "plan_put": plan_put,
+        "too_post": too_post,
+        "too_get": too_get,
+        "too_delete": too_delete,
+    }
+
+
+def parse_mix(mix: str) -> dict:
+    """Parse an operation mix like "visibility_get=3,too_post=1"."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def worker(
+    ops: dict, weights: dict, stop: float, profile: Optional[cProfile.Profile]
+) -> list:
+    """Run randomly chosen operations until `stop`, returning the samples."""
+    names = list(weights)
+    probabilities = [weights[name] for name in names]
+    samples = []
+    if profile is not None:
+        profile.enable()
+    try:
+        while time.perf_counter() < stop:
+            name = random.choices(names, probabilities)[0]
+            start = time.perf_counter()
+            try:
+                ok = bool(ops[name]())
+            except Exception:
+                ok = False
+            samples.append((name, time.perf_counter() - start, ok))
+    finally:
+        if profile is not None:
+            profile.disable()
+    return samples
+
+
+def run_load(
+    ops: dict,
+    weights: dict,
+    threads: int,
+    duration: float,
+    profile: bool = False,
+) -> tuple:
+    """Drive `ops` from `threads` threads for `duration` seconds.
+
+    Returns
+    -------
+    tuple
+        The samples as (operation, latency, ok) tuples, the elapsed time and
+        the merged profile statistics (or None).
+    """
+    profiles = [cProfile.Profile() if profile else None for _ in range(threads)]
+    stop = time.perf_counter() + duration
+    start = time.perf_counter()
+    # Silence the client's warnings and error prints for failed requests
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter("ignore")
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [
+                executor.submit(worker, ops, weights, stop, prof) for prof in profiles
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - start
+
+    stats = None
+    if profile:
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+    return samples, elapsed, stats
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Throughput, error count and latency percentiles per operation."""
+    summary = {}
+    for name in sorted({sample[0] for sample in samples}):
+        latencies = np.array([s[1] for s in samples if s[0] == name])
+        errors = sum(1 for s in samples if s[0] == name and not s[2])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        summary[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+    return summary
+
+
+def summarize_phases(records: list) -> dict:
+    """Mean time in ms spent in each request phase, per method and endpoint."""
+    phases: Dict[str, List[dict]] = {}
+    for record in records:
+        key = f"{record.method} {record.endpoint}"
+        phases.setdefault(key, []).append(record.timings)
+    return {
+        key: {
+            phase: 1000 * sum(t.get(phase, 0) for t in timings) / len(timings)
+            for phase in ["validate", "connect", "transfer", "decode", "model_build"]
+        }
+        for key, timings in sorted(phases.items())
+    }
+
+
+def print_phases(phases: dict):
+    names = ["validate", "connect", "transfer", "decode", "model_build"]
+    print(f"\n{'mean ms per request':<22}" + "".join(f"{n:>12}" for n in names))
+    for key, row in phases.items():
+        print(f"{key:<22}" + "".join(f"{row[n]:>12.2f}" for n in names))
+
+
+def print_summary(summary: dict, elapsed: float, threads: int):
+    print(f"{threads} threads, {elapsed:.1f} s")
+    print(
+        f"{'operation':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for name, row in summary.items():
+        print(
+            f"{name:<16}{row['requests']:>10}{row['errors']:>8}"
+            f"{row['throughput']:>10.1f}{row['p50_ms']:>10.2f}"
+            f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+        )
+    total = sum(row["requests"] for row in summary.values())
+    print(f"{'total':<16}{total:>10}{'':>8}{total / elapsed:>10.1f}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds.")
+    parser.add_argument(
+        "--mix",
+        default="visibility_get=1,plan_put=1,too_post=1",
+        help="Comma separated operation=weight list.",
+    )
+    parser.add_argument("--url", help="Use an already running server.")
+    parser.add_argument("--latency", type=float, default=0, help="Stub latency (s).")
+    parser.add_argument("--jitter", type=float, default=0, help="Stub jitter (s).")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--size", type=int, default=100, help="Stub payload size.")
+    parser.add_argument("--plan-size", type=int, default=100, help="PUT entries.")
+    parser.add_argument("--profile", action="store_true", help="Profile the client.")
+    parser.add_argument(
+        "--phases", action="store_true", help="Report time spent per request phase."
+    )
+    parser.add_argument("--json", action="store_true", help="Output JSON summary.")
+    args = parser.parse_args(argv)
+
+    ops = operations(args.plan_size)
+    weights = parse_mix(args.mix)
+    unknown = set(weights) - set(ops)
+    if unknown:
+        parser.error(f"Unknown operations {sorted(unknown)}, choose from {list(ops)}")
+
+    with contextlib.ExitStack() as stack:
+        if args.url is None:
+            config = StubConfig(
+                args.latency, args.jitter, args.error_rate, size=args.size
+            )
+            constants.API_URL = stack.enter_context(StubServer(config)).url
+        else:
+            constants.API_URL = args.url
+        records: list = []
+        if args.phases:
+            stack.callback(hooks.remove_hook, hooks.add_hook(records.append))
+        samples, elapsed, stats = run_load(
+            ops, weights, args.threads, args.duration, args.profile
+        )
+
+    summary = summarize(samples, elapsed)
+    phases = summarize_phases(records)
+    if args.json:
+        print(json.dumps({"operations": summary, "phases": phases}, indent=2))
+    else:
+        print_summary(summary, elapsed, args.threads)
+        if args.phases:
+            print_phases(phases)
+    if stats is not None:
+        stats.sort_stats("cumulative").print_stats(25)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
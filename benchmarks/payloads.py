@@ -0,0 +1,170 @@
+"""
+Synthetic, realistically sized ACROSS API payloads for benchmarking.
+
+Each function returns a JSON compatible dict in the shape returned by the
+ACROSS API for the corresponding schema.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BEGIN = datetime(2024, 1, 1)
+
+
+def _isoformat(times) -> list:
+    return [t.strftime("%Y-%m-%d %H:%M:%S") for t in times]
+
+
+def ephem_payload(days: float = 365, stepsize: int = 60) -> dict:
+    """Ephemeris covering `days` days, in the shape of `EphemSchema`."""
+    n = int(days * 86400 / stepsize)
+    rng = np.random.default_rng(1)
+    timestamp = [BEGIN + timedelta(seconds=i * stepsize) for i in range(n)]
+
+    def vec():
+        return np.round(rng.normal(size=(n, 3)) * 7000, 3).tolist()
+
+    return {
+        "timestamp": _isoformat(timestamp),
+        "posvec": vec(),
+        "earthsize": np.round(rng.uniform(60, 70, n), 4).tolist(),
+        "velvec": vec(),
+        "sun": vec(),
+        "moon": vec(),
+        "latitude": np.round(rng.uniform(-28.5, 28.5, n), 4).tolist(),
+        "longitude": np.round(rng.uniform(0, 360, n), 4).tolist(),
+        "stepsize": stepsize,
+    }
+
+
+def visibility_payload(windows: int = 10_000) -> dict:
+    """Visibility windows in the shape of `VisibilitySchema`."""
+    reasons = ["Earth Limb", "Sun", "Moon", "SAA", "Pole", "Window"]
+    entries = []
+    for i in range(windows):
+        begin = BEGIN + timedelta(seconds=i * 5760)
+        entries.append(
+            {
+                "begin": begin.strftime("%Y-%m-%d %H:%M:%S"),
+                "end": (begin + timedelta(seconds=2400)).strftime("%Y-%m-%d %H:%M:%S"),
+                "initial": reasons[i % len(reasons)],
+                "final": reasons[(i + 1) % len(reasons)],
+            }
+        )
+    return {"entries": entries}
+
+
+def saa_payload(passages: int = 10_000) -> dict:
+    """SAA passages in the shape of `SAASchema`."""
+    return {
+        "entries": [
+            {"begin": entry["begin"], "end": entry["end"]}
+            for entry in visibility_payload(passages)["entries"]
+        ]
+    }
+
+
+def swift_observations_payload(rows: int = 50_000) -> dict:
+    """Swift observations in the shape of `SwiftObservationsSchema`."""
+    rng = np.random.default_rng(2)
+    ra = rng.uniform(0, 360, rows)
+    dec = rng.uniform(-90, 90, rows)
+    entries = []
+    for i in range(rows):
+        begin = BEGIN + timedelta(seconds=i * 1800)
+        entries.append(
+            {
+                "begin": begin.strftime("%Y-%m-%d %H:%M:%S"),
+                "end": (begin + timedelta(seconds=1500)).strftime("%Y-%m-%d %H:%M:%S"),
+                "ra": round(float(ra[i]), 5),
+                "dec": round(float(dec[i]), 5),
+                "targname": f"Target {i % 997}",
+                "exposure": 1500,
+                "slew": 120,
+                "roll": round(float(ra[i] / 2), 2),
+                "obsid": f"{i:08d}{i % 1000:03d}",
+                "targetid": i,
+                "segment": i % 1000,
+                "xrtmode": 7,
+                "uvotmode": 0x30ED,
+                "batmode": 0,
+                "merit": 100,
+            }
+        )
+    return {"entries": entries}
+
+
+def toorequests_payload(requests: int = 5_000) -> dict:
+    """BurstCube TOO requests in the shape of `BurstCubeTOORequestsSchema`."""
+    rng = np.random.default_rng(3)
+    entries = []
+    for i in range(requests):
+        trigger_time = BEGIN + timedelta(seconds=i * 600)
+        entries.append(
+            {
+                "id": f"{i:032x}",
+                "username": "benchmark",
+                "timestamp": (trigger_time + timedelta(seconds=30)).isoformat(),
+                "trigger_mission": "Fermi",
+                "trigger_instrument": "GBM",
+                "trigger_id": f"bn{i:09d}",
+                "trigger_time": trigger_time.isoformat(),
+                "trigger_duration": round(float(rng.uniform(0.1, 100)), 3),
+                "classification": "GRB",
+                "justification": "Short GRB",
+                "ra": round(float(rng.uniform(0, 360)), 4),
+                "dec": round(float(rng.uniform(-90, 90)), 4),
+                "error": 5.0,
+                "begin": trigger_time.isoformat(),
+                "end": (trigger_time + timedelta(seconds=200)).isoformat(),
+                "exposure": 200,
+                "offset": -50,
+                "reason": "None",
+                "status": "Requested",
+                "too_info": "",
+            }
+        )
+    return {"entries": entries}
+
+
+def config_payload() -> dict:
+    """A mission configuration in the shape of `ConfigSchema`."""
+    return {
+        "mission": {
+            "name": "Stub Mission",
+            "shortname": "Stub",
+            "agency": "NASA",
+            "type": "Astrophysics",
+            "pi": "A. Stub",
+            "description": "Stand-in mission for benchmarks.",
+            "website": "https://example.org/",
+        },
+        "instruments": [
+            {
+                "name": "X-ray Telescope",
+                "shortname": "XRT",
+                "description": "Stand-in X-ray instrument.",
+                "website": "https://example.org/xrt",
+                "energy_low": 0.3,
+                "energy_high": 10.0,
+                "fov": {"fovtype": "circular", "fovarea": 0.15, "fovparam": 0.2},
+            }
+        ],
+        "ephem": {"parallax": True, "apparent": True, "velocity": False},
+        "visibility": {
+            "earth_cons": True,
+            "moon_cons": True,
+            "sun_cons": True,
+            "ram_cons": False,
+            "pole_cons": False,
+            "saa_cons": True,
+            "earthoccult": 28.0,
+            "moonoccult": 22.0,
+            "sunoccult": 46.0,
+            "sunextra": 1.0,
+            "earthextra": 5.0,
+            "moonextra": 1.0,
+        },
+        "tle": {"tle_bad": 4.0, "tle_name": "STUB"},
+    }
@@ -0,0 +1,231 @@
+"""
+Local stand-in for a Redis server, for testing and load testing the client's
+shared response cache without a real Redis.
+
+The server speaks enough of the Redis protocol (RESP) for `RedisBackend`:
+PING, AUTH, SELECT, GET, SET (with EX/PX/NX/XX), DEL, EXISTS, SCAN, DBSIZE,
+FLUSHDB and QUIT. It can be run standalone::
+
+    python benchmarks/redis_stub.py --port 6379
+
+and the client pointed at it with `ACROSS_CACHE=redis://127.0.0.1:6379/0`, or
+started in-process with `RedisStub`.
+"""
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Any, Optional
+
+
+class RedisError(Exception):
+    """Error replied to a command."""
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+    """Handler for a client connection, replying to its commands."""
+
+    server: "RedisTCPServer"
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.db = 0
+        self.authenticated = self.server.password is None
+        while True:
+            try:
+                args = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            try:
+                reply = self.execute(args[0].upper().decode(), args[1:])
+            except RedisError as e:
+                self.wfile.write(b"-ERR %s\r\n" % str(e).encode())
+            else:
+                self.wfile.write(encode_reply(reply))
+            if args[0].upper() == b"QUIT":
+                return
+
+    def read_command(self) -> Optional[list]:
+        """Read a command, as an array of bulk strings."""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if line[:1] != b"*":
+            # Inline command
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def execute(self, command: str, args: list) -> Any:
+        server = self.server
+        with server.lock:
+            server.commands += 1
+            data = server.dbs.setdefault(self.db, {})
+            if command == "PING":
+                return Status("PONG")
+            if command == "QUIT":
+                return Status("OK")
+            if command == "AUTH":
+                if server.password is not None and args[-1].decode() != server.password:
+                    raise RedisError("invalid password")
+                self.authenticated = True
+                return Status("OK")
+            if not self.authenticated:
+                raise RedisError("NOAUTH Authentication required.")
+            if command == "SELECT":
+                self.db = int(args[0])
+                return Status("OK")
+            if command == "GET":
+                return server.get(data, args[0])
+            if command == "SET":
+                return server.set(data, args[0], args[1], args[2:])
+            if command == "DEL":
+                return sum(data.pop(key, None) is not None for key in args)
+            if command == "EXISTS":
+                return sum(server.get(data, key) is not None for key in args)
+            if command == "DBSIZE":
+                return len(data)
+            if command == "FLUSHDB":
+                data.clear()
+                return Status("OK")
+            if command == "SCAN":
+                return server.scan(data, args)
+        raise RedisError(f"unknown command '{command}'")
+
+
+class Status(str):
+    """Simple string reply."""
+
+
+def encode_reply(reply: Any) -> bytes:
+    """Encode a reply in RESP."""
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Status):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(encode_reply(r) for r in reply)
+    if isinstance(reply, str):
+        reply = reply.encode()
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+class RedisTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple, password: Optional[str] = None):
+        super().__init__(address, RedisHandler)
+        self.password = password
+        # Values and expiry times (or None), by key, of each database
+        self.dbs: dict = {}
+        self.commands = 0
+        self.lock = threading.Lock()
+
+    def get(self, data: dict, key: bytes) -> Optional[bytes]:
+        value = data.get(key)
+        if value is None:
+            return None
+        if value[1] is not None and value[1] <= time.time():
+            del data[key]
+            return None
+        return value[0]
+
+    def set(self, data: dict, key: bytes, value: bytes, options: list) -> Any:
+        expires = None
+        options = [option.upper() for option in options]
+        for i, option in enumerate(options):
+            if option == b"EX":
+                expires = time.time() + int(options[i + 1])
+            elif option == b"PX":
+                expires = time.time() + int(options[i + 1]) / 1000
+        exists = self.get(data, key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        data[key] = (value, expires)
+        return Status("OK")
+
+    def scan(self, data: dict, args: list) -> list:
+        cursor = int(args[0])
+        pattern, count = "*", 10
+        for i in range(1, len(args) - 1, 2):
+            if args[i].upper() == b"MATCH":
+                pattern = args[i + 1].decode()
+            elif args[i].upper() == b"COUNT":
+                count = int(args[i + 1])
+        keys = sorted(data)[cursor : cursor + count]
+        following = cursor + count if cursor + count < len(data) else 0
+        matched = [key for key in keys if fnmatch.fnmatchcase(key.decode(), pattern)]
+        return [str(following).encode(), matched]
+
+
+class RedisStub:
+    """Stand-in Redis server running in a background thread.
+
+    Parameters
+    ----------
+    host : str, optional
+        Host to bind to, by default "127.0.0.1".
+    port : int, optional
+        Port to bind to, by default 0 (any free port).
+    password : Optional[str], optional
+        Password clients must authenticate with, by default none.
+
+    Examples
+    --------
+    >>> with RedisStub() as redis:
+    ...     set_cache_backend(redis.url)
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, password: Optional[str] = None
+    ):
+        self.server = RedisTCPServer((host, port), password)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.socket.getsockname()[:2]
+        auth = f":{self.server.password}@" if self.server.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def start(self) -> "RedisStub":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "RedisStub":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Stand-in Redis server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--password")
+    args = parser.parse_args(argv)
+    server = RedisTCPServer((args.host, args.port), args.password)
+    print(f"Serving Redis protocol on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Local stand-in for the ACROSS API, for load testing the client.
+
+The server implements the endpoint shapes of the client's `*Schema` classes,
+serving synthetic payloads from `payloads.py`, with configurable response
+latency and error injection. It can be run standalone::
+
+    python benchmarks/stub_server.py --port 8000 --latency 0.02 --error-rate 0.01
+
+and the client pointed at it with `ACROSS_API_URL=http://127.0.0.1:8000/`, or
+started in-process with `StubServer`.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import payloads
+
+
+class StubConfig:
+    """Behaviour of the stub server.
+
+    Parameters
+    ----------
+    latency : float, optional
+        Mean added latency per request in seconds, by default 0.
+    jitter : float, optional
+        Uniform random jitter added to the latency in seconds, by default 0.
+    error_rate : float, optional
+        Fraction of requests that fail, by default 0.
+    error_status : int, optional
+        HTTP status code returned for injected errors, by default 503.
+    size : int, optional
+        Number of entries in list payloads, by default 100.
+    job_time : float, optional
+        Time in seconds that jobs take to complete, by default 0.5.
+    compress : bool, optional
+        gzip compress response bodies larger than 1 kB for clients that
+        accept it, by default False.
+    etag : bool, optional
+        Send an ETag with GET responses, replying 304 Not Modified to
+        conditional GETs for an unchanged body, by default False.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        size: int = 100,
+        job_time: float = 0.5,
+        compress: bool = False,
+        etag: bool = False,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.size = size
+        self.job_time = job_time
+        self.compress = compress
+        self.etag = etag
+
+
+def get_bodies(size: int) -> dict:
+    """Encoded GET response bodies for each API name."""
+    toos = payloads.toorequests_payload(size)
+    bodies = {
+        "resolve": {"ra": 83.63308, "dec": 22.0145, "resolver": "stub"},
+        "visibility": payloads.visibility_payload(size),
+        "saa": payloads.saa_payload(size),
+        "ephem": payloads.ephem_payload(days=size / 1440),
+        "fovcheck": {
+            "entries": [
+                {
+                    "time": entry["begin"],
+                    "ra": 10.0,
+                    "dec": 20.0,
+                    "roll": 0.0,
+                    "observing": True,
+                    "infov": i % 2 == 0,
+                }
+                for i, entry in enumerate(payloads.saa_payload(size)["entries"])
+            ]
+        },
+        "plan": payloads.swift_observations_payload(size),
+        "observations": payloads.swift_observations_payload(size),
+        "toorequests": toos,
+        "too": toos["entries"][0],
+        "config": payloads.config_payload(),
+    }
+    return {key: json.dumps(value).encode() for key, value in bodies.items()}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the ACROSS API endpoint shapes."""
+
+    server: "StubHTTPServer"
+    protocol_version = "HTTP/1.1"
+    # Send headers and body together, avoiding delayed-ACK stalls
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def route(self) -> tuple:
+        """Return the API name, optional id and query parameters."""
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if len(parts) >= 2 and parts[-2].lower() == "too":
+            return "too", parts[-1], params
+        return parts[-1].lower(), None, params
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def respond(self, status: int, body: bytes, headers: dict = {}):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if (
+            self.server.config.compress
+            and len(body) > 1024
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        ):
+            # Compress each distinct body once
+            with self.server.lock:
+                if body not in self.server.gzipped:
+                    self.server.gzipped[body] = gzip.compress(body, compresslevel=1)
+            body = self.server.gzipped[body]
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def respond_get(self, body: bytes):
+        """Respond to a GET, or with 304 Not Modified if ETags are enabled
+        and the client already has the body."""
+        if not self.server.config.etag:
+            self.respond(200, body)
+            return
+        etag = f'"{zlib.crc32(body):08x}-{len(body):x}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.respond(200, body, {"ETag": etag})
+
+    def inject(self) -> bool:
+        """Apply latency and error injection, returning True on injected error."""
+        config = self.server.config
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < config.error_rate:
+            self.read_body()
+            detail = json.dumps({"detail": "Injected error"}).encode()
+            self.respond(config.error_status, detail)
+            return True
+        return False
+
+    def job(self, jobnumber: int) -> dict:
+        """Job record, with its status and result as of now."""
+        job = dict(self.server.jobs[jobnumber])
+        if time.time() - job["began"] >= self.server.config.job_time:
+            job["status"] = "complete"
+        else:
+            job["result"] = None
+        job["began"] = datetime.fromtimestamp(job["began"], timezone.utc).isoformat()
+        return job
+
+    def do_GET(self):
+        if self.inject():
+            return
+        api_name, _, params = self.route()
+        if "job" in params and api_name in self.server.bodies:
+            # Submit the query as a job, completing after `job_time`
+            with self.server.lock:
+                jobnumber = len(self.server.jobs) + 1
+                now = datetime.now(timezone.utc).isoformat()
+                self.server.jobs[jobnumber] = {
+                    "jobnumber": jobnumber,
+                    "reqtype": api_name,
+                    "apiversion": "v1",
+                    "began": time.time(),
+                    "created": now,
+                    "expires": "2100-01-01T00:00:00+00:00",
+                    "params": json.dumps(params),
+                    "result": self.server.bodies[api_name].decode(),
+                    "status": "running",
+                }
+            self.respond(202, json.dumps(self.job(jobnumber)).encode())
+        elif api_name == "job":
+            if int(params["jobnumber"]) in self.server.jobs:
+                job = self.job(int(params["jobnumber"]))
+                self.respond(200, json.dumps(job).encode())
+            else:
+                self.respond(404, json.dumps({"detail": "Job not found"}).encode())
+        elif api_name == "jobs":
+            # Job listings leave out the results
+            jobs = [
+                dict(self.job(jobnumber), result=None)
+                for jobnumber, job in list(self.server.jobs.items())
+                if job["reqtype"] == params.get("reqtype")
+            ]
+            self.respond(200, json.dumps({"entries": jobs}).encode())
+        elif api_name in self.server.bodies:
+            self.respond_get(self.server.bodies[api_name])
+        else:
+            self.respond(404, json.dumps({"detail": "Not found"}).encode())
+
+    def do_PUT(self):
+        if self.inject():
+            return
+        body = self.read_body()
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        api_name, _, _ = self.route()
+        if api_name == "too":
+            self.respond(201, self.server.bodies["too"])
+        else:
+            # Plan/Observations PUTs echo back the uploaded entries
+            self.respond(201, body or b'{"entries": []}')
+
+    def do_POST(self):
+        if self.inject():
+            return
+        self.read_body()
+        _, _, params = self.route()
+        key = self.headers.get("Idempotency-Key")
+        with self.server.lock:
+            if key is not None and key in self.server.submitted:
+                # Repeated submission, so return the original request
+                self.respond(201, self.server.submitted[key])
+                return
+        too = dict(params)
+        too.update(
+            {
+                "id": uuid.uuid4().hex,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "status": "Requested",
+                "reason": "None",
+                "too_info": "",
+            }
+        )
+        body = json.dumps(too).encode()
+        if key is not None:
+            with self.server.lock:
+                body = self.server.submitted.setdefault(key, body)
+        self.respond(201, body)
+
+    def do_DELETE(self):
+        if self.inject():
+            return
+        self.respond(200, self.server.bodies["too"])
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, config: StubConfig):
+        super().__init__(address, StubHandler)
+        self.config = config
+        self.bodies = get_bodies(config.size)
+        self.jobs: dict = {}
+        # TOO submissions by idempotency key
+        self.submitted: dict = {}
+        # Compressed response bodies, by uncompressed body
+        self.gzipped: dict = {}
+        self.lock = threading.Lock()
+
+
+class StubServer:
+    """Stub ACROSS API server running in a background thread.
+
+    Parameters
+    ----------
+    config : Optional[StubConfig], optional
+        Server behaviour, by default no latency or errors.
+    host : str, optional
+        Host to bind to, by default "127.0.0.1".
+    port : int, optional
+        Port to bind to, by default 0 (any free port).
+
+    Examples
+    --------
+    >>> with StubServer(StubConfig(latency=0.01)) as server:
+    ...     constants.API_URL = server.url
+    """
+
+    def __init__(
+        self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port=0
+    ):
+        self.httpd = StubHTTPServer((host, port), config or StubConfig())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.socket.getsockname()[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Stub ACROSS API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--etag", action="store_true")
+    args = parser.parse_args(argv)
+    config = StubConfig(
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.error_status,
+        args.size,
+        compress=args.compress,
+        etag=args.etag,
+    )
+    server = StubHTTPServer((args.host, args.port), config)
+    print(f"Serving stub ACROSS API on http://{args.host}:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
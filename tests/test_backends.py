@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from across_client.base import backends
+from across_client.base.backends import CacheBackend, DiskBackend, MemoryBackend
+from across_client.base.schema import EphemSchema
+
+
+class DictBackend(CacheBackend):
+    def __init__(self):
+        self.data: dict = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+
+def test_incomplete_backend_fails_on_construction():
+    class NoClear(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl=None):
+            pass
+
+        def delete(self, key):
+            pass
+
+    with pytest.raises(TypeError, match="clear"):
+        NoClear()
+
+
+@pytest.mark.parametrize("kind", ["memory", "disk"])
+def test_backend_round_trip(kind, tmp_path):
+    backend = MemoryBackend() if kind == "memory" else DiskBackend(tmp_path / "c.db")
+    backend.set("a", b"1")
+    backend.set("b", b"2", ttl=0.05)
+    assert (backend.get("a"), backend.get("b")) == (b"1", b"2")
+    time.sleep(0.1)
+    assert backend.get("b") is None
+    backend.delete("a")
+    assert backend.get("a") is None
+    backend.set("c", b"3")
+    backend.clear()
+    assert backend.get("c") is None
+
+
+def test_custom_backend_stores_responses():
+    backend = DictBackend()
+    assert backends.set_cache_backend(backend) is backend
+    try:
+        body = b'{"stepsize": 60}' * 100
+        backends.store("key", EphemSchema, body, ttl=60)
+        assert len(backend.data["key"]) < len(body)
+        cached = backends.load("key", EphemSchema)
+        assert cached is not None and cached[0] == body
+    finally:
+        backends.set_cache_backend(None)
@@ -0,0 +1,56 @@
+import gzip
+import json
+import threading
+
+from across_client.base.bulk import ACROSSBulkPut
+
+
+class Upload(ACROSSBulkPut):
+    """Uploads entries, failing the first attempt at the chunks in `fail`."""
+
+    def __init__(self, n: int, fail: set = set()):
+        self.entries = [{"i": i, "pad": "x" * (i % 7)} for i in range(n)]
+        self.fail = set(fail)
+        self.received: dict = {}
+        self._lock = threading.Lock()
+
+    def _bulk_payload(self) -> tuple:
+        return {"username": "u"}, self.entries
+
+    def _put_chunk(self, params: dict, body: bytes, headers: dict):
+        if headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        entries = json.loads(body)["entries"]
+        with self._lock:
+            if entries[0]["i"] in self.fail:
+                self.fail.discard(entries[0]["i"])
+                raise ConnectionError("dropped")
+            self.received[entries[0]["i"]] = entries
+
+
+def test_chunks_cover_entries_in_order():
+    obj = Upload(95)
+    upload = obj.bulk_put(chunk_size=10, max_workers=3)
+    assert upload.ok
+    assert [len(chunk) for chunk in upload.chunks] == [10] * 9 + [5]
+    received = [e for start in sorted(obj.received) for e in obj.received[start]]
+    assert received == obj.entries
+
+
+def test_max_bytes_limits_chunks():
+    obj = Upload(40)
+    upload = obj.bulk_put(chunk_size=1000, max_bytes=200, compress=False)
+    assert upload.ok and len(upload.chunks) > 1
+    for chunk in upload.chunks:
+        body = json.dumps(obj.entries[chunk.start : chunk.stop], separators=(",", ":"))
+        assert len(chunk) == 1 or len(body) <= 200 + 2
+
+
+def test_retry_sends_only_failed_chunks():
+    obj = Upload(30, fail={10, 20})
+    upload = obj.bulk_put(chunk_size=10)
+    assert not upload.ok
+    assert [chunk.start for chunk in upload.failed] == [10, 20]
+    assert upload.failed[0].error == "ConnectionError: dropped"
+    assert upload.retry().ok
+    assert [chunk.attempts for chunk in upload.chunks] == [1, 2, 2]
@@ -0,0 +1,64 @@
+import io
+import json
+
+from across_client import cli
+
+
+def fake_query(mission, command, params):
+    if params.get("fail"):
+        raise ValueError("bad query")
+    return {"ok": True, "result": params}
+
+
+def run(lines, monkeypatch, run_record=None):
+    monkeypatch.setattr(cli, "run_query", fake_query)
+    if run_record is not None:
+        monkeypatch.setattr(cli, "run_record", run_record)
+    output = io.StringIO()
+    ok = cli.run_batch(io.StringIO("\n".join(lines) + "\n"), 2, output)
+    return ok, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_batch_reports_bad_lines(monkeypatch):
+    ok, results = run(
+        [
+            '{"tag": 1, "command": "plan", "ra": 1}',
+            '"x"',
+            "[1, 2]",
+            "{bad",
+            "",
+            '{"tag": 2, "command": "plan", "fail": true}',
+            '{"tag": 3, "command": "plan", "params": 5}',
+            '{"tag": 4, "command": "plan", "params": {"ra": 2}}',
+        ],
+        monkeypatch,
+    )
+    assert not ok
+    errors = {r["line"]: r["error"] for r in results if "line" in r}
+    assert errors[2] == "Expected a JSON object, not str."
+    assert errors[3] == "Expected a JSON object, not list."
+    assert errors[4].startswith("Invalid JSON")
+    tagged = {r["tag"]: r for r in results if "tag" in r}
+    assert tagged[1] == {"tag": 1, "command": "plan", "ok": True, "result": {"ra": 1}}
+    assert tagged[2]["error"] == "ValueError: bad query"
+    assert not tagged[3]["ok"]
+    assert tagged[4]["result"] == {"ra": 2}
+    assert len(results) == 7
+
+
+def test_batch_survives_failing_worker(monkeypatch):
+    def run_record(record):
+        if record["tag"] == 1:
+            raise RuntimeError("worker died")
+        return {"tag": record["tag"], "ok": True}
+
+    lines = [json.dumps({"tag": tag, "command": "plan"}) for tag in range(6)]
+    ok, results = run(lines, monkeypatch, run_record)
+    assert not ok
+    assert len(results) == 6
+    assert {
+        "tag": 1,
+        "command": "plan",
+        "ok": False,
+        "error": "RuntimeError: worker died",
+    } in results
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from across_client.base.coords import ACROSSEntriesSkyCoord
+
+
+class Entries(ACROSSEntriesSkyCoord):
+    def __init__(self, coords):
+        self.entries = [SimpleNamespace(ra=ra, dec=dec) for ra, dec in coords]
+
+
+def test_entries_skycoord_cached():
+    obj = Entries([(10, 20), (30, -40)])
+    assert obj.entries_skycoord is obj.entries_skycoord
+    assert list(obj.entries_skycoord.ra.deg) == [10, 30]
+
+
+def test_entries_skycoord_in_place_edits():
+    obj = Entries([(10, 20), (30, -40)])
+    first = obj.entries_skycoord
+    obj.entries[1].ra = 50
+    assert list(obj.entries_skycoord.ra.deg) == [10, 50]
+    obj.entries[0] = SimpleNamespace(ra=1, dec=2)
+    assert list(obj.entries_skycoord.dec.deg) == [2, -40]
+    obj.entries.append(SimpleNamespace(ra=None, dec=None))
+    assert np.isnan(obj.entries_skycoord.ra.deg[2])
+    assert obj.entries_skycoord is not first
+
+
+def test_entries_skycoord_empty():
+    assert Entries([]).entries_skycoord is None
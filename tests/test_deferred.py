@@ -0,0 +1,93 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from across_client import constants
+from across_client.base import common, deferred, resilience
+from across_client.base.common import session
+from across_client.swift.saa import SwiftSAA
+
+BODY = json.dumps(
+    {"entries": [{"begin": "2024-01-01 01:00:00", "end": "2024-01-01 01:20:00"}]}
+).encode()
+
+
+class Adapter(requests.adapters.HTTPAdapter):
+    """Transport adapter serving one SAA passage, counting the requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(BODY)
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = Adapter()
+    monkeypatch.setattr(constants, "API_URL", "http://across.test/")
+    session().mount("http://across.test/", adapter)
+    yield adapter
+    session().adapters.pop("http://across.test/")
+
+
+def test_introspection_does_not_fetch(adapter):
+    saa = SwiftSAA(begin="2024-01-01", end="2024-01-02", deferred=True)
+    assert repr(saa).startswith("SwiftSAA(begin=2024-01-01,end=2024-01-02")
+    assert saa.parameters == {"begin": "2024-01-01", "end": "2024-01-02"}
+    assert not hasattr(saa, "missing")
+    assert not hasattr(saa, "__wrapped__")
+    assert not hasattr(saa, "_private")
+    assert "begin" in dir(saa)
+    assert adapter.requests == 0 and saa.pending
+
+    assert len(saa.entries) == 1
+    assert adapter.requests == 1 and not saa.pending
+    assert repr(saa).startswith("SwiftSAA(entries=")
+
+
+def test_coordinates_resolve_name(adapter, monkeypatch):
+    names = []
+
+    def resolve_many(targets):
+        names.extend(targets)
+        return {name: SimpleNamespace(ra=83.6, dec=22.0) for name in targets}
+
+    monkeypatch.setattr(deferred, "resolve_many", resolve_many)
+    saa = SwiftSAA(name="Crab", begin="2024-01-01", end="2024-01-02", deferred=True)
+    assert "name=Crab" in repr(saa)
+    assert names == []
+    assert (saa.ra, saa.dec) == (83.6, 22.0)
+    assert names == ["Crab"]
+    # Resolving the name doesn't fetch the results
+    assert adapter.requests == 0 and saa.pending
+    saa.fetch()
+    assert names == ["Crab"] and adapter.requests == 1
+
+
+def test_gather_sends_identical_queries_once(adapter, monkeypatch):
+    # Shared by the fetching threads
+    shared = requests.Session()
+    shared.mount("http://across.test/", adapter)
+    monkeypatch.setattr(common, "session", lambda: shared)
+    monkeypatch.setattr(resilience, "_breakers", {})
+    queries = [
+        SwiftSAA(begin="2024-01-01", end="2024-01-02", deferred=True),
+        SwiftSAA(begin="2024-01-01", end="2024-01-02", deferred=True),
+        SwiftSAA(begin="2024-01-02", end="2024-01-03", deferred=True),
+    ]
+    assert deferred.gather(queries) == [True, True, True]
+    assert adapter.requests == 2
+    assert all(not saa.pending and len(saa.entries) == 1 for saa in queries)
+    assert list(queries[0].entries) == list(queries[1].entries)
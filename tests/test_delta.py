@@ -0,0 +1,123 @@
+import gzip
+import json
+from datetime import datetime
+from typing import List
+
+import pytest
+import requests
+from requests.exceptions import HTTPError
+
+from across_client.base import delta
+from across_client.base.delta import ACROSSDeltaPut
+from across_client.base.schema import BaseSchema
+
+
+class PutSchema(BaseSchema):
+    entries: List[dict]
+
+
+class RangePutSchema(PutSchema):
+    begin: datetime
+    end: datetime
+
+
+class Plan(ACROSSDeltaPut):
+    _mission = "Test"
+    _api_name = "Plan"
+    _put_schema = PutSchema
+    username = "u"
+
+    def __init__(self, entries: list, reject_delta: bool = False):
+        self.entries = entries
+        self.reject_delta = reject_delta
+        self.puts: list = []
+
+    def _bulk_payload(self) -> tuple:
+        return {"username": self.username}, self.entries
+
+    def _put_chunk(self, params: dict, body: bytes, headers: dict):
+        if headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.puts.append((params, json.loads(body), headers))
+        if params.get("delta") and self.reject_delta:
+            response = requests.Response()
+            response.status_code = 405
+            raise HTTPError(response=response)
+
+
+def entries(n: int, note: str = "") -> list:
+    return [
+        {
+            "obsid": i,
+            "begin": f"2024-01-01T{i:02d}:00:00",
+            "end": f"2024-01-01T{i:02d}:30:00",
+            "note": note,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    yield
+    delta.PLAN_STATES.clear()
+    delta._no_delta.clear()
+
+
+def test_full_then_delta():
+    plan = Plan(entries(3))
+    assert plan.delta_put()["mode"] == "full"
+    params, body, headers = plan.puts[-1]
+    assert params == {"username": "u"}
+    assert len(body["entries"]) == 3
+    # Small bodies aren't compressed
+    assert "Content-Encoding" not in headers
+
+    # Drop the middle entry, which is within the range of the others
+    plan.entries = entries(3)[::2]
+    plan.entries[0]["note"] = "changed"
+    summary = plan.delta_put()
+    assert summary == {"mode": "delta", "inserted": 0, "modified": 1, "deleted": 1}
+    params, body, _ = plan.puts[-1]
+    assert params == {"username": "u", "delta": True}
+    assert [e["obsid"] for e in body["upsert"]] == [0]
+    assert [e["obsid"] for e in body["delete"]] == [1]
+    assert plan.delta_put()["mode"] == "none"
+
+
+def test_large_bodies_compressed():
+    plan = Plan(entries(20, "x" * 100))
+    plan.delta_put()
+    assert plan.puts[-1][2]["Content-Encoding"] == "gzip"
+    delta.PLAN_STATES.clear()
+    plan.delta_put(compress=False)
+    assert "Content-Encoding" not in plan.puts[-1][2]
+
+
+def test_rejected_delta_without_range_puts_all():
+    plan = Plan(entries(4), reject_delta=True)
+    plan.delta_put()
+    plan.entries[1]["note"] = "changed"
+    assert plan.delta_put()["mode"] == "full"
+    params, body, _ = plan.puts[-1]
+    # No time range parameters the PUT schema doesn't take
+    assert params == {"username": "u"}
+    assert len(body["entries"]) == 4
+
+
+def test_rejected_delta_puts_range(monkeypatch):
+    monkeypatch.setattr(Plan, "_put_schema", RangePutSchema)
+    plan = Plan(entries(4), reject_delta=True)
+    plan.delta_put()
+    plan.entries[1]["note"] = "changed"
+    assert plan.delta_put()["mode"] == "range"
+    params, body, _ = plan.puts[-1]
+    assert (params["begin"], params["end"]) == (
+        "2024-01-01T01:00:00",
+        "2024-01-01T01:30:00",
+    )
+    assert [e["obsid"] for e in body["entries"]] == [1]
+    # Known not to take deltas, so goes straight to the range
+    plan.entries[2]["note"] = "changed"
+    plan.delta_put()
+    assert "delta" not in plan.puts[-1][0]
@@ -0,0 +1,89 @@
+import io
+import json
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+import requests
+
+from across_client import constants
+from across_client.base.common import session
+from across_client.base.ephemstore import set_ephem_store
+from across_client.swift.ephem import SwiftEphem
+
+BEGIN = datetime(2024, 1, 1)
+END = datetime(2024, 1, 1, 2)
+
+
+class Adapter(requests.adapters.HTTPAdapter):
+    """Transport adapter computing a fake ephemeris for the requested times."""
+
+    def send(self, request, **kwargs):
+        params = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        begin = datetime.fromisoformat(params["begin"])
+        end = datetime.fromisoformat(params["end"])
+        stepsize = int(params["stepsize"])
+        steps = int((end - begin).total_seconds()) // stepsize + 1
+        times = [begin + timedelta(seconds=i * stepsize) for i in range(steps)]
+        seconds = [(t - BEGIN).total_seconds() for t in times]
+        body = json.dumps(
+            {
+                "timestamp": [t.isoformat() for t in times],
+                "posvec": [[s, 1.0, 2.0] for s in seconds],
+                "earthsize": [s / 10 for s in seconds],
+                "sun": [[1.0, s, 0.0] for s in seconds],
+                "moon": [[0.0, 0.0, s] for s in seconds],
+                "latitude": [s / 100 for s in seconds],
+                "longitude": [s / 1000 for s in seconds],
+                "stepsize": stepsize,
+            }
+        ).encode()
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(body)
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setattr(constants, "API_URL", "http://across.test/")
+    session().mount("http://across.test/", Adapter())
+    yield
+    session().adapters.pop("http://across.test/")
+    set_ephem_store(None)
+
+
+def test_stored_ephem_matches_api(adapter, tmp_path):
+    fetched = SwiftEphem(begin=BEGIN, end=END)
+    set_ephem_store(str(tmp_path))
+    SwiftEphem(begin=BEGIN, end=END)  # Fill the store
+    stored = SwiftEphem(begin=BEGIN, end=END)
+    assert "_arrays" in stored.__dict__
+
+    for field in ["timestamp", "posvec", "earthsize", "polevec", "latitude"]:
+        assert type(getattr(stored, field)) is type(getattr(fetched, field))
+        assert getattr(stored, field) == getattr(fetched, field)
+    assert type(stored.timestamp[0]) is datetime
+    assert stored.timestamp[-1].isoformat() == END.isoformat()
+    assert stored.stepsize == fetched.stepsize
+
+    arrays, fetched_arrays = stored.arrays, fetched.arrays
+    assert arrays["timestamp"].dtype == np.dtype("datetime64[us]")
+    # Zero-copy views of the store, for fields not accessed as lists
+    fresh = SwiftEphem(begin=BEGIN, end=END)
+    assert not fresh.arrays["posvec"].flags.writeable
+    assert arrays["polevec"] is None
+    for field, array in fetched_arrays.items():
+        if array is None:
+            assert arrays[field] is None
+        else:
+            assert array.dtype == arrays[field].dtype
+            assert np.array_equal(array, arrays[field])
+
+    # Results can be changed, as for an API response
+    stored.latitude.append(1.0)
+    assert len(stored.arrays["latitude"]) == len(arrays["latitude"]) + 1
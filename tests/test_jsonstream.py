@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from across_client.base.jsonstream import StreamDecoder
+
+DOC = {
+    "entries": [{"a": i, "s": "x]}" + str(i) + ',"', "n": [i, [i]]} for i in range(50)],
+    "empty": [],
+    "name": 'a "quoted" [name]',
+    "nested": {"arr": [1, 2, {"b": "}"}]},
+    "number": -1.5e3,
+    "flag": None,
+    "unicode": "é",
+}
+
+
+def feed(data: bytes, size: int, **kwargs) -> dict:
+    decoder = StreamDecoder(**kwargs)
+    for i in range(0, len(data), size):
+        decoder.feed(data[i : i + size])
+    return decoder.close()
+
+
+@pytest.mark.parametrize("indent", [None, 1])
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+def test_decodes_any_chunking(indent, size):
+    data = json.dumps(DOC, indent=indent, ensure_ascii=False).encode()
+    assert feed(data, size) == json.loads(data)
+
+
+def test_arrays_decoded_in_batches():
+    batches = []
+
+    def decode_array(name, data):
+        batches.append(name)
+        return json.loads(data)
+
+    data = json.dumps(DOC).encode()
+    assert feed(data, 256, decode_array=decode_array) == DOC
+    assert batches.count("entries") > 1
+
+
+@pytest.mark.parametrize("data", [b'{"a": [1, 2', b'{"a": 1}}', b'{"a": [1,, 2]}'])
+def test_malformed_json_raises(data):
+    with pytest.raises(ValueError):
+        feed(data, 3)
@@ -0,0 +1,114 @@
+import io
+import time
+
+import pytest
+import requests
+
+from across_client.base import ratelimit, resilience
+from across_client.base.common import ACROSSBase, session
+
+URL = "http://across.test/Test/Ping"
+
+
+class Ping(ACROSSBase):
+    _mission = "Test"
+    _api_name = "Ping"
+
+
+class Adapter(requests.adapters.HTTPAdapter):
+    """Transport adapter replying with a queue of status codes, or raising
+    the exceptions in it."""
+
+    def __init__(self):
+        super().__init__()
+        self.replies: list = []
+
+    def send(self, request, **kwargs):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        response = requests.Response()
+        response.status_code = reply
+        response.raw = io.BytesIO(b"{}")
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def adapter():
+    adapter = Adapter()
+    session().mount("http://across.test/", adapter)
+    resilience.set_retry_policy(
+        mission="Test", retries=0, failure_threshold=1, reset_timeout=0.05
+    )
+    yield adapter
+    session().adapters.pop("http://across.test/")
+    resilience._policies.pop(("test", None), None)
+    resilience._breakers.pop(("test", "ping"), None)
+    ratelimit.set_rate_limit(mission="Test")
+
+
+def open_circuit(adapter: Adapter) -> resilience.CircuitBreaker:
+    breaker = resilience.breaker("Test", "Ping")
+    adapter.replies.append(503)
+    assert Ping()._request("GET", URL).status_code == 503
+    assert breaker.state == "open"
+    with pytest.raises(resilience.CircuitOpenError):
+        Ping()._request("GET", URL)
+    time.sleep(0.06)
+    return breaker
+
+
+def test_deadline_timeout_frees_trial(adapter):
+    breaker = open_circuit(adapter)
+    adapter.replies.append(requests.ReadTimeout())
+    with pytest.raises(resilience.DeadlineExceeded):
+        with resilience.deadline(1):
+            Ping()._request("GET", URL)
+    # The trial was freed without counting a failure, so the next request is
+    # let through as a new trial, and closes the circuit
+    assert breaker.state == "open"
+    assert breaker.failures == 1
+    adapter.replies.append(200)
+    assert Ping()._request("GET", URL).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_passed_deadline_frees_trial(adapter):
+    breaker = open_circuit(adapter)
+    with pytest.raises(resilience.DeadlineExceeded):
+        with resilience.deadline(0):
+            Ping()._request("GET", URL)
+    assert breaker.state == "open"
+    adapter.replies.append(200)
+    assert Ping()._request("GET", URL).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_rate_limit_wait_respects_deadline(adapter):
+    breaker = open_circuit(adapter)
+    limiter = ratelimit.set_rate_limit(rate=1, burst=1, mission="Test")
+    assert limiter is not None
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(resilience.DeadlineExceeded):
+        with resilience.deadline(0.2):
+            Ping()._request("GET", URL)
+    # Raised at once, rather than after waiting out the deadline
+    assert time.monotonic() - start < 0.1
+    assert breaker.state == "open"
+    adapter.replies.append(200)
+    assert Ping()._request("GET", URL).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_concurrency_wait_respects_deadline():
+    limiter = ratelimit.Limiter(concurrency=1)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(resilience.DeadlineExceeded):
+        limiter.acquire(timeout=0.05)
+    assert 0.05 <= time.monotonic() - start < 0.5
+    limiter.release()
+    limiter.acquire(timeout=0)
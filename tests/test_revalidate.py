@@ -0,0 +1,101 @@
+import io
+import json
+import time
+
+import pytest
+import requests
+
+from across_client import constants
+from across_client.across.schema import ResolveGetSchema, ResolveSchema
+from across_client.base import backends, common
+from across_client.base.common import ACROSSBase, session
+
+BODY = json.dumps({"ra": 1.5, "dec": -2.5, "resolver": "test"}).encode()
+
+
+class Target(ACROSSBase):
+    ra: float
+    dec: float
+    resolver: str
+
+    _mission = "Test"
+    _api_name = "Target"
+    _schema = ResolveSchema
+    _get_schema = ResolveGetSchema
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Adapter(requests.adapters.HTTPAdapter):
+    """Transport adapter serving `BODY` with an ETag, and replying 304 Not
+    Modified to conditional requests for it."""
+
+    def __init__(self):
+        super().__init__()
+        self.statuses: list = []
+
+    def send(self, request, **kwargs):
+        status, body = 200, BODY
+        if request.headers.get("If-None-Match") == '"v1"':
+            status, body = 304, b""
+        self.statuses.append(status)
+        response = requests.Response()
+        response.status_code = status
+        response.raw = io.BytesIO(body)
+        response.headers["ETag"] = '"v1"'
+        response.headers["Content-Type"] = "application/json"
+        response.headers["Content-Length"] = str(len(body))
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = Adapter()
+    monkeypatch.setattr(constants, "API_URL", "http://across.test/")
+    session().mount("http://across.test/", adapter)
+    common._revalidate.clear()
+    yield adapter
+    session().adapters.pop("http://across.test/")
+    common._revalidate.clear()
+    backends.set_cache_backend(None)
+
+
+def fetch() -> Target:
+    target = Target("crab")
+    assert target.get()
+    assert (target.ra, target.dec, target.resolver) == (1.5, -2.5, "test")
+    return target
+
+
+def test_revalidated_from_memory(adapter):
+    assert fetch().freshness.source == "api"
+    assert fetch().freshness.source == "revalidated"
+    assert adapter.statuses == [200, 304]
+
+
+def test_large_body_not_kept(adapter, monkeypatch):
+    monkeypatch.setattr(common, "REVALIDATE_MAX_BODY", len(BODY) - 1)
+    fetch()
+    fetch()
+    assert adapter.statuses == [200, 200]
+
+
+def test_revalidated_from_cache(adapter, monkeypatch):
+    monkeypatch.setattr(Target, "_cache_ttl", 0.5)
+    backends.set_cache_backend("memory")
+    fetch()
+    assert fetch().freshness.source == "cache"
+    assert adapter.statuses == [200]
+    # Only the validators are kept in memory
+    assert len(common._revalidate) == 1
+    assert list(common._revalidate._data.values())[0][0][2] is None
+
+    # Once expired, a 304 caches the response for another time-to-live
+    time.sleep(0.6)
+    assert fetch().freshness.source == "revalidated"
+    assert adapter.statuses == [200, 304]
+    assert fetch().freshness.source == "cache"
+    assert adapter.statuses == [200, 304]
@@ -0,0 +1,85 @@
+import io
+import json
+import threading
+
+import pytest
+import requests
+
+from across_client import constants
+from across_client.base import common, resilience
+from across_client.burstcube import submit_toos
+
+
+class Adapter(requests.adapters.HTTPAdapter):
+    """Transport adapter accepting TOO requests, failing the first attempt of
+    each with 503 Service Unavailable."""
+
+    def __init__(self):
+        super().__init__()
+        self.keys: list = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        with self._lock:
+            retry = key in self.keys
+            self.keys.append(key)
+        response = requests.Response()
+        if retry:
+            response.status_code = 201
+            body = {"id": key, "username": "u", "too_info": ""}
+            response.raw = io.BytesIO(json.dumps(body).encode())
+        else:
+            response.status_code = 503
+            response.raw = io.BytesIO(b"{}")
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = Adapter()
+    monkeypatch.setattr(constants, "API_URL", "http://across.test/")
+    # Shared by the submitting threads
+    shared = requests.Session()
+    shared.mount("http://across.test/", adapter)
+    monkeypatch.setattr(common, "session", lambda: shared)
+    yield adapter
+    resilience._policies.pop(("burstcube", "too"), None)
+    resilience._breakers.pop(("burstcube", "too"), None)
+
+
+def too_request(i: int, **kwargs) -> dict:
+    return dict(
+        username="u",
+        api_key="k",
+        trigger_mission="Fermi",
+        trigger_instrument="GBM",
+        trigger_id=f"bn{i}",
+        trigger_time="2024-01-01 00:00:00",
+        **kwargs,
+    )
+
+
+def test_retried_by_policy_with_same_key(adapter):
+    resilience.set_retry_policy(
+        mission="BurstCube", endpoint="TOO", retries=1, backoff=0.01
+    )
+    results = submit_toos(
+        [too_request(0, idempotency_key="mine"), too_request(1)], max_workers=1
+    )
+    assert [too.id for too in results] == ["mine", adapter.keys[2]]
+    assert adapter.keys[:2] == ["mine", "mine"]
+    assert adapter.keys[2] == adapter.keys[3] != "mine"
+
+
+def test_not_retried_past_deadline(adapter):
+    resilience.set_retry_policy(
+        mission="BurstCube", endpoint="TOO", retries=1, backoff=60, max_backoff=60
+    )
+    with resilience.deadline(0.5):
+        results = submit_toos([too_request(0)])
+    assert isinstance(results[0], requests.HTTPError)
+    assert len(adapter.keys) == 1